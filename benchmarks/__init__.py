@@ -0,0 +1 @@
+"""Benchmarks comparing the performance of different serializers."""
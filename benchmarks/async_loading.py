@@ -0,0 +1,117 @@
+"""
+Compare loading many artifacts one after another with loading them concurrently through deserialize_many.
+
+Each read is delayed to simulate the latency of fetching the artifact from remote storage.
+
+Usage: python -m benchmarks.async_loading [--artifacts N] [--latency-ms N] [--max-concurrency N]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, BinaryIO
+
+from dagger_contrib.serializer import AsJSON, deserialize_many
+
+
+class RemoteReader:
+    """Reader that waits for a fixed latency before the first read, like a reader for an object in remote storage."""
+
+    def __init__(self, path: str, latency: float):
+        self._path = path
+        self._latency = latency
+        self._file: Any = None
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to 'size' bytes, waiting for the latency on the first call."""
+        if self._file is None:
+            time.sleep(self._latency)
+            self._file = open(self._path, "rb")
+
+        return self._file.read(size)
+
+    def close(self):
+        """Close the underlying file."""
+        if self._file is not None:
+            self._file.close()
+
+
+def write_artifacts(directory: str, artifacts: int) -> list:
+    """Write a few JSON artifacts of a similar size, returning their paths."""
+    serializer = AsJSON()
+    paths = []
+    for i in range(artifacts):
+        path = os.path.join(directory, f"artifact-{i}.json")
+        with open(path, "wb") as writer:
+            serializer.serialize(
+                [{"artifact": i, "row": row, "value": row / 3} for row in range(5000)],
+                writer,
+            )
+        paths.append(path)
+
+    return paths
+
+
+def load_sequentially(paths: list, latency: float) -> list:
+    """Load each artifact after the previous one, like a node does by default."""
+    serializer = AsJSON()
+    values = []
+    for path in paths:
+        reader: BinaryIO = RemoteReader(path, latency)  # type: ignore
+        values.append(serializer.deserialize(reader))
+        reader.close()
+
+    return values
+
+
+def load_concurrently(paths: list, latency: float, max_concurrency: int) -> list:
+    """Load all artifacts concurrently, with at most 'max_concurrency' of them in flight."""
+    serializer = AsJSON()
+    readers = [RemoteReader(path, latency) for path in paths]
+    values = asyncio.run(
+        deserialize_many(
+            [(serializer, reader) for reader in readers],
+            max_concurrency=max_concurrency,
+        )
+    )
+    for reader in readers:
+        reader.close()
+
+    return values
+
+
+def main():
+    """Run the benchmark and print the time each strategy takes."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--artifacts", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_artifacts(tmp, args.artifacts)
+
+        start = time.perf_counter()
+        sequential = load_sequentially(paths, latency)
+        sequential_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent = load_concurrently(paths, latency, args.max_concurrency)
+        concurrent_time = time.perf_counter() - start
+
+    assert sequential == concurrent
+
+    print(f"{'strategy':<40}{'time (s)':>10}")
+    print(f"{'sequential':<40}{sequential_time:>10.3f}")
+    print(
+        f"{f'deserialize_many(max_concurrency={args.max_concurrency})':<40}{concurrent_time:>10.3f}"
+    )
+    print(f"speedup: {sequential_time / concurrent_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
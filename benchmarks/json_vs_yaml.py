@@ -0,0 +1,96 @@
+"""
+Compare the time it takes AsJSON and AsYAML to serialize and deserialize a large, machine-generated payload.
+
+Usage: python -m benchmarks.json_vs_yaml [--records N] [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from dagger_contrib.serializer import AsJSON, AsYAML
+
+
+def build_payload(records: int) -> List[Dict[str, Any]]:
+    """Build a list of records resembling the payloads that are usually exchanged between nodes."""
+    return [
+        {
+            "id": i,
+            "name": f"record-{i}",
+            "score": i / 7,
+            "active": i % 2 == 0,
+            "tags": ["a", "b", "c"][: i % 4],
+            "attributes": {"x": i, "y": -i, "label": None},
+        }
+        for i in range(records)
+    ]
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    """Return the fastest of 'repeat' runs of 'fn', in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def measure(serializer: Any, payload: Any, repeat: int) -> Dict[str, float]:
+    """Measure the serialization and deserialization time of a serializer through a local file, and the size of its output."""
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, f"payload.{serializer.extension}")
+
+        def serialize():
+            with open(filename, "wb") as writer:
+                serializer.serialize(payload, writer)
+
+        def deserialize():
+            with open(filename, "rb") as reader:
+                value = serializer.deserialize(reader)
+
+            # Consume lazy iterators, so that they are measured fairly
+            return value if isinstance(value, list) else list(value)
+
+        return {
+            "serialize": best_of(repeat, serialize),
+            "deserialize": best_of(repeat, deserialize),
+            "size": os.path.getsize(filename),
+        }
+
+
+def main():
+    """Run the benchmark and print a table with the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    payload = build_payload(args.records)
+    serializers = {
+        "AsYAML": AsYAML(),
+        "AsJSON(backend='json')": AsJSON(backend="json"),
+        "AsJSON(backend='orjson')": AsJSON(backend="orjson"),
+        "AsJSON(lines=True)": AsJSON(lines=True),
+    }
+
+    print(
+        f"{'serializer':<28}{'serialize (s)':>15}{'deserialize (s)':>17}{'size (MB)':>12}"
+    )
+    for name, serializer in serializers.items():
+        try:
+            result = measure(serializer, payload, args.repeat)
+        except ImportError as e:
+            print(f"{name:<28}skipped ({e})")
+            continue
+
+        print(
+            f"{name:<28}{result['serialize']:>15.3f}{result['deserialize']:>17.3f}{result['size'] / 1e6:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare the time Dask serializers spend staging files on disk and in memory with the time they spend computing and packaging them.
+
+Usage: python -m benchmarks.staging [--rows N] [--partitions N] [--scratch-dir DIR]
+"""
+
+import argparse
+import io
+import tempfile
+from typing import Any
+
+from dagger_contrib.serializer.dask.dataframe import AsCSV, AsParquet
+from dagger_contrib.serializer.path import AsTar
+
+
+def build_dataframe(rows: int, partitions: int) -> Any:
+    """Build a Dask DataFrame with numeric and string columns."""
+    import numpy as np
+    import pandas as pd
+    from dask.dataframe import from_pandas
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "value": rng.random(rows),
+            "label": rng.choice(["alpha", "beta", "gamma", "delta"], rows),
+        }
+    )
+    return from_pandas(df, npartitions=partitions)
+
+
+def main():
+    """Run the benchmark and print a table with the metrics of each serialization."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--partitions", type=int, default=8)
+    parser.add_argument("--scratch-dir", default=None)
+    args = parser.parse_args()
+
+    df = build_dataframe(args.rows, args.partitions).persist()
+    print(
+        f"{'serializer':<32}{'staged in':<14}{'stage (s)':>11}{'write (s)':>11}{'package (s)':>13}{'cleanup (s)':>13}{'MB':>8}"
+    )
+
+    for cls in [AsCSV, AsParquet]:
+        for memory_budget in [None, "8GB"]:
+            metrics = []
+            with tempfile.TemporaryDirectory() as tmp:
+                serializer = cls(
+                    path_serializer=AsTar(output_dir=tmp, compression=None),
+                    scratch_dir=args.scratch_dir,
+                    memory_budget=memory_budget,
+                    metrics_callback=metrics.append,
+                )
+                serializer.serialize(df, io.BytesIO())
+
+            (m,) = metrics
+            name = f"{cls.__name__}(memory_budget={memory_budget!r})"
+            write = "-" if m.write_seconds is None else f"{m.write_seconds:.3f}"
+            print(
+                f"{name:<32}{'memory' if m.in_memory else 'disk':<14}{m.stage_seconds:>11.3f}{write:>11}{m.package_seconds:>13.3f}{m.cleanup_seconds:>13.3f}{m.staged_bytes / 1e6:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
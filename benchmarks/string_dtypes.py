@@ -0,0 +1,86 @@
+"""
+Compare the load time and memory usage of text-heavy DataFrames deserialized with each string dtype.
+
+Usage: python -m benchmarks.string_dtypes [--rows N] [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict
+
+from dagger_contrib.serializer.pandas.dataframe import AsCSV, AsParquet
+
+
+def build_dataframe(rows: int) -> Any:
+    """Build a DataFrame dominated by strings: free text, identifiers and a low-cardinality label."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    words = np.array(["lorem", "ipsum", "dolor", "sit", "amet", "consectetur"])
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "uuid": [f"{i:032x}" for i in rng.integers(0, 2**63, rows)],
+            "text": [" ".join(sentence) for sentence in rng.choice(words, (rows, 8))],
+            "country": rng.choice(["ES", "FR", "DE", "IT", "PT", "NL"], rows),
+        }
+    )
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    """Return the fastest of 'repeat' runs of 'fn', in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def measure(serializer: Any, df: Any, repeat: int) -> Dict[str, float]:
+    """Measure the deserialization time of a serializer through a local file, and the in-memory size of the result."""
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, f"dataframe.{serializer.extension}")
+        with open(filename, "wb") as writer:
+            serializer.serialize(df, writer)
+
+        def deserialize():
+            with open(filename, "rb") as reader:
+                return serializer.deserialize(reader)
+
+        return {
+            "deserialize": best_of(repeat, deserialize),
+            "memory": deserialize().memory_usage(index=True, deep=True).sum(),
+        }
+
+
+def main():
+    """Run the benchmark and print a table with the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = build_dataframe(args.rows)
+    print(
+        f"{'serializer':<40}{'deserialize (s)':>17}{'memory (MB)':>14}{'memory saved':>14}"
+    )
+
+    for cls in [AsParquet, AsCSV]:
+        baseline = None
+        for string_dtype in [None, "pyarrow", "category"]:
+            name = f"{cls.__name__}(string_dtype={string_dtype!r})"
+            result = measure(cls(string_dtype=string_dtype), df, args.repeat)
+            baseline = baseline or result["memory"]
+
+            print(
+                f"{name:<40}{result['deserialize']:>17.3f}{result['memory'] / 1e6:>14.1f}{1 - result['memory'] / baseline:>14.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
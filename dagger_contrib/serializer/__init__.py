@@ -1,3 +1,32 @@
 """Extra implementations of the dagger.Serializer protocol."""
 
-from dagger_contrib.serializer.as_yaml import AsYAML  # noqa
+from typing import TYPE_CHECKING
+
+from dagger_contrib.serializer._lazy import lazy_exports
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dagger_contrib.serializer.as_bundle import AsBundle  # noqa
+    from dagger_contrib.serializer.as_json import AsJSON  # noqa
+    from dagger_contrib.serializer.as_yaml import AsYAML  # noqa
+    from dagger_contrib.serializer.asynchronous import (  # noqa
+        AsyncSerializer,
+        deserialize_many,
+    )
+
+__all__ = ["AsBundle", "AsJSON", "AsYAML", "AsyncSerializer", "deserialize_many"]
+
+__getattr__, __dir__ = lazy_exports(
+    globals(),
+    {
+        "AsBundle": "dagger_contrib.serializer.as_bundle:AsBundle",
+        "AsJSON": "dagger_contrib.serializer.as_json:AsJSON",
+        "AsYAML": "dagger_contrib.serializer.as_yaml:AsYAML",
+        "AsyncSerializer": "dagger_contrib.serializer.asynchronous:AsyncSerializer",
+        "deserialize_many": "dagger_contrib.serializer.asynchronous:deserialize_many",
+        "arrow": "dagger_contrib.serializer.arrow",
+        "dask": "dagger_contrib.serializer.dask",
+        "numpy": "dagger_contrib.serializer.numpy",
+        "pandas": "dagger_contrib.serializer.pandas",
+        "path": "dagger_contrib.serializer.path",
+    },
+)
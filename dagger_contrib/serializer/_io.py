@@ -0,0 +1,184 @@
+"""Binary stream adapters shared by several serializers."""
+
+import io
+import os
+import stat
+from typing import BinaryIO, Optional
+
+
+class OffsetReader(io.RawIOBase):
+    """
+    Seekable, read-only view over a binary stream that starts at the stream's current position.
+
+    Formats such as Parquet store absolute offsets and seek relative to the start of the file.
+    This view allows them to be read after a prefix (e.g. a header) has already been consumed.
+    """
+
+    def __init__(self, reader: BinaryIO):
+        """Initialize a view over 'reader' starting at its current position. 'reader' must be seekable."""
+        self._reader = reader
+        self._base = reader.tell()
+
+    def readable(self) -> bool:
+        """Return whether the stream can be read from."""
+        return True
+
+    def seekable(self) -> bool:
+        """Return whether the stream supports random access."""
+        return True
+
+    def readinto(self, buffer) -> int:
+        """Read bytes into a pre-allocated, writable bytes-like object."""
+        data = self._reader.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Change the stream position to the given offset, relative to the start of the view."""
+        if whence == io.SEEK_SET:
+            position = self._reader.seek(self._base + offset)
+        else:
+            position = self._reader.seek(offset, whence)
+
+        return position - self._base
+
+    def tell(self) -> int:
+        """Return the current position, relative to the start of the view."""
+        return self._reader.tell() - self._base
+
+
+class RangeReader(io.RawIOBase):
+    """
+    Seekable, read-only view over a range of bytes of a seekable binary stream.
+
+    Archives that know the offset of each of their members use it to expose a single member
+    as a file of its own, without reading the rest of the archive.
+    """
+
+    def __init__(self, reader: BinaryIO, start: int, size: int):
+        """Initialize a view over the 'size' bytes of 'reader' that start at offset 'start'."""
+        self._reader = reader
+        self._start = start
+        self._size = size
+        self._position = 0
+
+    def readable(self) -> bool:
+        """Return whether the stream can be read from."""
+        return True
+
+    def seekable(self) -> bool:
+        """Return whether the stream supports random access."""
+        return True
+
+    def readinto(self, buffer) -> int:
+        """Read bytes into a pre-allocated, writable bytes-like object, up to the end of the range."""
+        size = min(len(buffer), self._size - self._position)
+        if size <= 0:
+            return 0
+
+        self._reader.seek(self._start + self._position)
+        data = self._reader.read(size)
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Change the stream position to the given offset, relative to the start of the range."""
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        else:
+            position = self._size + offset
+
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+
+        self._position = position
+        return position
+
+    def tell(self) -> int:
+        """Return the current position, relative to the start of the range."""
+        return self._position
+
+    def close(self):
+        """Close the view and the underlying stream."""
+        if not self.closed:
+            self._reader.close()
+
+        super().close()
+
+
+class CountingWriter(io.RawIOBase):
+    """
+    Write-only view over a binary stream that reports positions relative to where the view was created.
+
+    Formats such as Parquet record the offsets returned by 'tell()' in their metadata.
+    This view makes those offsets independent of any prefix already written to the stream.
+    """
+
+    def __init__(self, writer: BinaryIO):
+        """Initialize a view over 'writer' starting at its current position."""
+        self._writer = writer
+        self._written = 0
+
+    def writable(self) -> bool:
+        """Return whether the stream can be written to."""
+        return True
+
+    def write(self, data) -> int:
+        """Write the given bytes-like object to the underlying stream."""
+        self._writer.write(data)
+        size = memoryview(data).nbytes
+        self._written += size
+        return size
+
+    def tell(self) -> int:
+        """Return the number of bytes written through this view."""
+        return self._written
+
+    def flush(self):
+        """Flush the underlying stream, unless it has already been closed."""
+        if not getattr(self._writer, "closed", False):
+            self._writer.flush()
+
+
+def local_path(stream: BinaryIO) -> Optional[str]:
+    """
+    Return the path of the regular file backing 'stream', if any.
+
+    The path is only returned when the stream is positioned at the beginning of the file,
+    so that reading the file from its path yields exactly what reading the stream would.
+    """
+    try:
+        fd = stream.fileno()
+        name = stream.name
+        if not isinstance(name, str) or stream.tell() != 0:
+            return None
+
+        file_stat = os.fstat(fd)
+        if not stat.S_ISREG(file_stat.st_mode):
+            return None
+
+        # Make sure the name still points to the same file (e.g. it may be relative to a different working directory)
+        if not os.path.samestat(file_stat, os.stat(name)):
+            return None
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return None
+
+    return name
+
+
+def reopen(stream: BinaryIO) -> BinaryIO:
+    """
+    Return a new stream over the contents of 'stream' that remains readable after 'stream' is closed.
+
+    Serializers that deserialize into lazy iterators need such a stream, because dagger closes
+    the reader as soon as deserialization returns. Local files are opened again from their path,
+    and any other stream is buffered in memory.
+    """
+    path = local_path(stream)
+    if path is not None:
+        return open(path, "rb")
+
+    return io.BytesIO(stream.read())
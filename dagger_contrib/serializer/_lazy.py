@@ -0,0 +1,50 @@
+"""Utilities to expose the public names of a package without importing its submodules eagerly (PEP 562)."""
+
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(
+    namespace: Dict[str, Any],
+    exports: Dict[str, str],
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Build the module-level '__getattr__' and '__dir__' functions of a package whose exports are resolved on first access.
+
+    Parameters
+    ----------
+    namespace: dict
+        The global namespace of the package exposing the names (i.e. globals()).
+
+    exports: dict of str to str
+        A mapping from the public name to the location it should be resolved from.
+        Locations are expressed as "module.path:attribute" for objects defined inside a module,
+        or as "module.path" to expose a whole module or subpackage.
+
+    Returns
+    -------
+    A tuple (__getattr__, __dir__) to be assigned at the module level of the package.
+    """
+    package = namespace["__name__"]
+
+    def __getattr__(name: str) -> Any:
+        try:
+            location = exports[name]
+        except KeyError:
+            raise AttributeError(
+                f"module '{package}' has no attribute '{name}'"
+            ) from None
+
+        module_name, _, attribute = location.partition(":")
+        value = importlib.import_module(module_name)
+        if attribute:
+            value = getattr(value, attribute)
+
+        # Cache the value so that subsequent lookups bypass __getattr__ entirely
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
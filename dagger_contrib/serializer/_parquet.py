@@ -0,0 +1,34 @@
+"""Helpers to interpret the Pandas metadata that pyarrow stores in the schema of Parquet files."""
+
+from typing import Any, List, Optional
+
+
+def data_columns(schema: Any) -> List[str]:
+    """Return the names of the columns of an Arrow schema, except for those that store the index of a Pandas DataFrame."""
+    index_columns = (schema.pandas_metadata or {}).get("index_columns", [])
+    return [name for name in schema.names if name not in index_columns]
+
+
+def pandas_range_index(schema: Any) -> Optional[Any]:
+    """
+    Return the RangeIndex described by the Pandas metadata of an Arrow schema, if any.
+
+    A RangeIndex is only stored as metadata, instead of as a column, so readers that
+    load a file in several pieces must restore the index of each piece from it.
+    """
+    import pandas as pd
+
+    index_columns = (schema.pandas_metadata or {}).get("index_columns", [])
+    if len(index_columns) != 1 or not isinstance(index_columns[0], dict):
+        return None
+
+    index = index_columns[0]
+    if index.get("kind") != "range":
+        return None
+
+    return pd.RangeIndex(
+        index["start"],
+        index["stop"],
+        index["step"],
+        name=index.get("name"),
+    )
@@ -0,0 +1,52 @@
+"""Helpers to deserialize string columns into compact Pandas dtypes."""
+
+from typing import Any, Optional
+
+# Accepted values of the 'string_dtype' option of the DataFrame serializers
+STRING_DTYPES = [None, "pyarrow", "category"]
+
+
+def arrow_to_pandas_kwargs(string_dtype: Optional[str]) -> dict:
+    """
+    Return the keyword arguments for pyarrow.Table.to_pandas that build string columns with the given dtype.
+
+    The columns are built straight from the Arrow buffers, without creating a Python object per value:
+    - "pyarrow" wraps the Arrow arrays in a "string[pyarrow]" extension array.
+    - "category" dictionary-encodes the arrays and builds a categorical out of the dictionary.
+    """
+    if string_dtype is None:
+        return {}
+
+    if string_dtype == "category":
+        return {"strings_to_categorical": True}
+
+    import pandas as pd
+    import pyarrow as pa
+
+    dtype = pd.StringDtype("pyarrow")
+    return {"types_mapper": {pa.string(): dtype, pa.large_string(): dtype}.get}
+
+
+def convert_strings(df: Any, string_dtype: Optional[str]) -> Any:
+    """
+    Convert the object columns of a DataFrame parsed from text (e.g. a CSV) into the given string dtype.
+
+    Parsers only produce object columns for strings, so all of them are converted, one at a time.
+    """
+    if string_dtype is None:
+        return df
+
+    import pandas as pd
+
+    dtype = pd.StringDtype("pyarrow") if string_dtype == "pyarrow" else "category"
+    columns = [
+        name for name, column_dtype in df.dtypes.items() if column_dtype == object
+    ]
+    if not columns:
+        return df
+
+    df = df.copy(deep=False)
+    for name in columns:
+        df[name] = df[name].astype(dtype)
+
+    return df
@@ -0,0 +1,17 @@
+"""Collection of serializers for Apache Arrow data (https://arrow.apache.org/docs/python/)."""
+
+from typing import TYPE_CHECKING
+
+from dagger_contrib.serializer._lazy import lazy_exports
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dagger_contrib.serializer.arrow.as_ipc_stream import AsIPCStream  # noqa
+
+__all__ = ["AsIPCStream"]
+
+__getattr__, __dir__ = lazy_exports(
+    globals(),
+    {
+        "AsIPCStream": "dagger_contrib.serializer.arrow.as_ipc_stream:AsIPCStream",
+    },
+)
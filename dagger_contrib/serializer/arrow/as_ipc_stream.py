@@ -0,0 +1,144 @@
+"""Serialize streams of record batches in the Arrow IPC streaming format (https://arrow.apache.org/docs/format/Columnar.html#ipc-streaming-format)."""
+
+import sys
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple
+
+from dagger import DeserializationError, SerializationError
+
+from dagger_contrib.serializer._io import local_path
+
+
+class AsIPCStream:
+    """
+    Serializer implementation that writes an iterator of chunks as an Arrow IPC stream.
+
+    Chunks may be pyarrow.RecordBatch, pyarrow.Table or pd.DataFrame objects, and they
+    are written to the writer one by one as the iterator produces them, so the whole
+    stream never needs to be held in memory. All chunks must share the schema of the first one.
+
+    Deserialization returns an iterator that yields the chunks one by one, and each chunk is only
+    read when the iterator reaches it. When the reader is backed by a local file, the file is
+    memory-mapped, so the iterator can be consumed after the reader is closed. Other readers are
+    read incrementally, so they must remain open until the iterator is exhausted.
+
+    See Also
+    --------
+    - https://arrow.apache.org/docs/python/ipc.html#using-streams
+    - https://arrow.apache.org/docs/format/Columnar.html#ipc-streaming-format
+    """
+
+    extension = "arrows"
+
+    def __init__(
+        self,
+        to_pandas: bool = False,
+        preserve_index: bool = True,
+        compression: Optional[str] = None,
+    ):
+        """
+        Initialize a serializer that serializes iterators of chunks as Arrow IPC streams.
+
+        Parameters
+        ----------
+        to_pandas: bool, default=False
+            Whether to yield each chunk as a pd.DataFrame when deserializing, instead of as a pyarrow.RecordBatch.
+
+        preserve_index: bool, default=True
+            Whether to store the index of the pd.DataFrame chunks as a column, so that it can be restored.
+
+        compression: str, optional
+            The compression codec for the buffers of each chunk, which may be one of the following values: {"lz4", "zstd", None}
+        """
+        assert compression in ["lz4", "zstd", None]
+
+        self._to_pandas = to_pandas
+        self._preserve_index = preserve_index
+        self._compression = compression
+
+    def serialize(self, value: Any, writer: BinaryIO):
+        """Serialize the chunks produced by an iterator as an Arrow IPC stream, writing each one as soon as it is produced."""
+        import pyarrow as pa
+
+        if isinstance(value, (pa.RecordBatch, pa.Table)) or _is_dataframe(value):
+            # A single chunk is a stream of one chunk
+            value = [value]
+
+        try:
+            chunks = iter(value)
+        except TypeError:
+            raise SerializationError(
+                f"This serializer only works with iterators of pyarrow.RecordBatch, pyarrow.Table or pd.DataFrame objects. You are trying to serialize a value of type '{type(value).__name__}'"
+            )
+
+        options = pa.ipc.IpcWriteOptions(compression=self._compression)
+        stream, schema = None, None
+        try:
+            for chunk in chunks:
+                chunk_schema, batches = self._to_batches(chunk, schema)
+                if stream is None:
+                    schema = chunk_schema
+                    stream = pa.ipc.new_stream(writer, schema, options=options)
+
+                for batch in batches:
+                    stream.write_batch(batch)
+
+            if stream is None:
+                # An empty iterator still produces a valid (empty) stream
+                stream = pa.ipc.new_stream(writer, pa.schema([]), options=options)
+        except (pa.ArrowException, KeyError) as e:
+            raise SerializationError(e)
+        finally:
+            if stream is not None:
+                stream.close()
+
+    def deserialize(self, reader: BinaryIO) -> Iterator[Any]:
+        """Deserialize an Arrow IPC stream into an iterator of chunks."""
+        import pyarrow as pa
+
+        path = local_path(reader)
+
+        try:
+            # Local files may be closed as soon as this method returns, so the iterator maps its own view of them
+            source = pa.memory_map(path) if path else pa.PythonFile(reader, mode="r")
+            stream = pa.ipc.open_stream(source)
+        except (pa.ArrowException, OSError) as e:
+            raise DeserializationError(e)
+
+        return self._read_batches(stream)
+
+    def _to_batches(self, chunk: Any, schema: Any) -> Tuple[Any, List[Any]]:
+        """Convert a chunk into a list of record batches, returning them along with their schema."""
+        import pyarrow as pa
+
+        if isinstance(chunk, pa.RecordBatch):
+            return chunk.schema, [chunk]
+        elif isinstance(chunk, pa.Table):
+            # Tables with no rows have no batches, but they still define a schema
+            return chunk.schema, chunk.to_batches()
+        elif _is_dataframe(chunk):
+            # Converting with the schema of the stream keeps types consistent across chunks (e.g. all-null columns)
+            batch = pa.RecordBatch.from_pandas(
+                chunk,
+                schema=schema,
+                preserve_index=self._preserve_index,
+            )
+            return batch.schema, [batch]
+
+        raise SerializationError(
+            f"This serializer only works with iterators of pyarrow.RecordBatch, pyarrow.Table or pd.DataFrame objects. One of the chunks is of type '{type(chunk).__name__}'"
+        )
+
+    def _read_batches(self, stream: Any) -> Iterator[Any]:
+        import pyarrow as pa
+
+        try:
+            for batch in stream:
+                yield batch.to_pandas() if self._to_pandas else batch
+        except (pa.ArrowException, OSError) as e:
+            raise DeserializationError(e)
+
+
+def _is_dataframe(value: Any) -> bool:
+    # A DataFrame can only exist if pandas has been imported, so there is no need to import it here
+    pandas = sys.modules.get("pandas")
+    return pandas is not None and isinstance(value, pandas.DataFrame)
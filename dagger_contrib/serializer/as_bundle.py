@@ -0,0 +1,131 @@
+"""Serialize mappings of many (small) values into a single indexed archive."""
+
+import zipfile
+from typing import TYPE_CHECKING, Any, BinaryIO, Iterator, Mapping
+
+from dagger import DeserializationError, SerializationError
+
+from dagger_contrib.serializer._io import CountingWriter, reopen
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dagger import Serializer
+
+
+class AsBundle:
+    """
+    Serializer implementation that packs a mapping of names to values into a single zip archive.
+
+    Each value is serialized by the inner serializer into its own member of the archive.
+    The central directory of the archive acts as an index, so deserialization returns a lazy,
+    read-only mapping (a Bundle) that seeks straight to a member and deserializes it only when it is accessed.
+
+    Since the inner serializer usually compresses its output already, members are stored
+    without compression by default.
+    """
+
+    extension = "bundle.zip"
+
+    COMPRESSION_CONSTANTS = {
+        "stored": zipfile.ZIP_STORED,
+        "deflated": zipfile.ZIP_DEFLATED,
+    }
+
+    def __init__(
+        self,
+        serializer: "Serializer",
+        compression: str = "stored",
+    ):
+        """
+        Initialize a serializer that bundles many values into a single archive.
+
+        Parameters
+        ----------
+        serializer: Serializer
+            The serializer to serialize (and deserialize) each of the values with (e.g. AsYAML).
+
+        compression: str, default="stored"
+            Whether to compress each member of the archive.
+            Accepted values are {"stored", "deflated"}.
+        """
+        assert compression in self.COMPRESSION_CONSTANTS.keys()
+
+        self._serializer = serializer
+        self._compression = compression
+
+    def serialize(self, value: Any, writer: BinaryIO):
+        """Serialize each value in a mapping into its own member of a zip archive."""
+        if not isinstance(value, Mapping) or not all(isinstance(k, str) for k in value):
+            raise SerializationError(
+                f"This serializer only works with mappings of strings to values. You are trying to serialize a value of type '{type(value).__name__}'"
+            )
+
+        with zipfile.ZipFile(
+            writer,
+            mode="w",
+            compression=self.COMPRESSION_CONSTANTS[self._compression],
+            allowZip64=True,
+        ) as zip_:
+            for name, entry in value.items():
+                # The size of each member is not known in advance, so we must assume it may need ZIP64 extensions
+                with zip_.open(name, mode="w", force_zip64=True) as member:
+                    # Some serializers need to know the position they are writing at (e.g. Parquet)
+                    self._serializer.serialize(entry, CountingWriter(member))  # type: ignore
+
+    def deserialize(self, reader: BinaryIO) -> "Bundle":
+        """Deserialize a zip archive into a lazy mapping that deserializes each value when it is accessed."""
+        # The reader is closed as soon as this method returns, but members are read afterwards
+        source = reopen(reader)
+
+        try:
+            return Bundle(zipfile.ZipFile(source), self._serializer)
+        except zipfile.BadZipFile as e:
+            source.close()
+            raise DeserializationError(e)
+
+
+class Bundle(Mapping):
+    """
+    Read-only mapping over the members of a bundle, which are deserialized when they are accessed.
+
+    Each access deserializes the member again, so values that are accessed repeatedly should be stored by the caller.
+    The bundle keeps the archive open until it is closed (or used as a context manager).
+    """
+
+    def __init__(self, zip_: zipfile.ZipFile, serializer: "Serializer"):
+        """Initialize a bundle over an open zip archive."""
+        self._zip = zip_
+        self._serializer = serializer
+        self._names = [info.filename for info in zip_.infolist()]
+
+    def __getitem__(self, name: str) -> Any:
+        """Deserialize the value stored under 'name'."""
+        try:
+            info = self._zip.getinfo(name)
+        except KeyError:
+            raise KeyError(name)
+
+        with self._zip.open(info) as member:
+            return self._serializer.deserialize(member)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the names of the values in the bundle."""
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        """Return the number of values in the bundle."""
+        return len(self._names)
+
+    def close(self):
+        """Close the underlying archive."""
+        fp = self._zip.fp
+        self._zip.close()
+        if fp is not None:
+            fp.close()
+
+    def __enter__(self) -> "Bundle":
+        """Use the bundle as a context manager that closes it on exit."""
+        return self
+
+    def __exit__(self, *args):
+        """Close the bundle."""
+        self.close()
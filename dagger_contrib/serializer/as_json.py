@@ -0,0 +1,144 @@
+"""Implementation of a JSON serializer (https://www.json.org/)."""
+
+import importlib.util
+from typing import Any, BinaryIO, Iterator
+
+from dagger import DeserializationError, SerializationError
+
+from dagger_contrib.serializer._io import reopen
+
+
+class AsJSON:
+    """
+    Serializer implementation that uses JSON to marshal/unmarshal Python data structures.
+
+    Values are encoded as compact UTF-8 JSON. When orjson (https://github.com/ijl/orjson) is installed,
+    it is used to encode and decode values, which is significantly faster than the standard library.
+    Note that orjson also supports a few types that the standard library does not (e.g. datetimes or dataclasses).
+
+    In JSON Lines mode (https://jsonlines.org/), the serializer accepts any iterable and writes each
+    of its items on a separate line as they are produced. Deserialization then returns an iterator
+    that only decodes each line when it reaches it.
+    """
+
+    BACKENDS = ["auto", "orjson", "json"]
+
+    def __init__(
+        self,
+        lines: bool = False,
+        backend: str = "auto",
+    ):
+        """
+        Initialize a JSON serializer.
+
+        Parameters
+        ----------
+        lines: bool, default=False
+            Whether to serialize iterables in the JSON Lines format, and deserialize them lazily into an iterator.
+
+        backend: str, default="auto"
+            The library to encode and decode JSON with. "auto" uses orjson if it is installed, and the standard library otherwise.
+            Accepted values are {"auto", "orjson", "json"}.
+        """
+        assert backend in self.BACKENDS
+
+        self._lines = lines
+        self._backend = backend
+
+    def serialize(self, value: Any, writer: BinaryIO):
+        """Serialize a value into a compact JSON object (or a series of JSON lines), encoded using utf-8."""
+        dumps = self._dumps()
+
+        if not self._lines:
+            writer.write(dumps(value))
+            return
+
+        if isinstance(value, (str, bytes, dict)):
+            raise SerializationError(
+                f"In JSON Lines mode, this serializer only works with iterables of values. You are trying to serialize a value of type '{type(value).__name__}'"
+            )
+
+        try:
+            items = iter(value)
+        except TypeError:
+            raise SerializationError(
+                f"In JSON Lines mode, this serializer only works with iterables of values. You are trying to serialize a value of type '{type(value).__name__}'"
+            )
+
+        for item in items:
+            writer.write(dumps(item) + b"\n")
+
+    def deserialize(self, reader: BinaryIO) -> Any:
+        """Deserialize a utf-8-encoded JSON object into the value it represents, or a series of JSON lines into an iterator over their values."""
+        loads = self._loads()
+
+        if self._lines:
+            return _iterate_lines(reopen(reader), loads)
+
+        try:
+            return loads(reader.read())
+        except ValueError as e:
+            raise DeserializationError(e)
+
+    @property
+    def extension(self) -> str:
+        """Extension to use for files generated by this serializer."""
+        return "jsonl" if self._lines else "json"
+
+    def _uses_orjson(self) -> bool:
+        if self._backend == "orjson":
+            return True
+
+        return (
+            self._backend == "auto" and importlib.util.find_spec("orjson") is not None
+        )
+
+    def _dumps(self):
+        if self._uses_orjson():
+            import orjson
+
+            def dumps(value: Any) -> bytes:
+                try:
+                    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+                except orjson.JSONEncodeError as e:
+                    raise SerializationError(e)
+
+        else:
+            import json
+
+            encoder = json.JSONEncoder(
+                ensure_ascii=False,
+                allow_nan=False,
+                separators=(",", ":"),
+            )
+
+            def dumps(value: Any) -> bytes:
+                try:
+                    return encoder.encode(value).encode("utf-8")
+                except (TypeError, ValueError) as e:
+                    raise SerializationError(e)
+
+        return dumps
+
+    def _loads(self):
+        if self._uses_orjson():
+            import orjson
+
+            return orjson.loads
+
+        import json
+
+        return json.loads
+
+
+def _iterate_lines(source: BinaryIO, loads) -> Iterator[Any]:
+    """Yield the value encoded in each (non-empty) line of 'source', decoding them one by one."""
+    with source:
+        for number, line in enumerate(source, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                yield loads(line)
+            except ValueError as e:
+                raise DeserializationError(f"Line {number} is not valid JSON: {e}")
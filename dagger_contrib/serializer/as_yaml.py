@@ -1,19 +1,29 @@
 """Implementation of a YAML serializer (https://yaml.org/spec/)."""
 
 import io
-from typing import Any, BinaryIO, Optional
+from typing import Any, BinaryIO, Iterator, Optional
 
 from dagger import DeserializationError, SerializationError
 
+from dagger_contrib.serializer._io import reopen
+
 
 class AsYAML:
-    """Serializer implementation that uses YAML to marshal/unmarshal Python data structures."""
+    """
+    Serializer implementation that uses YAML to marshal/unmarshal Python data structures.
+
+    In lazy mode, deserialization returns an iterator over the items of the top-level sequence
+    (or over the key/value pairs of the top-level mapping) of the document. Each item is composed
+    and constructed from the parser's events only when the iterator reaches it, so the memory
+    used stays proportional to a single item rather than to the whole document.
+    """
 
     extension = "yaml"
 
     def __init__(
         self,
         indent: Optional[int] = None,
+        lazy: bool = False,
     ):
         """
         Initialize a YAML serializer.
@@ -22,8 +32,13 @@ class AsYAML:
         ----------
         indent: int, optional
             Set the indentation level for YAML keys.
+
+        lazy: bool, default=False
+            Whether to deserialize the document into an iterator over the items of its top-level sequence,
+            or over the (key, value) pairs of its top-level mapping, instead of into the value it represents.
         """
         self._indent = indent
+        self._lazy = lazy
 
     def serialize(self, value: Any, writer: BinaryIO):
         """Serialize a value into a YAML object, encoded into binary format using utf-8."""
@@ -40,10 +55,80 @@ class AsYAML:
             raise SerializationError(e)
 
     def deserialize(self, reader: BinaryIO) -> Any:
-        """Deserialize a utf-8-encoded yaml object into the value it represents."""
+        """Deserialize a utf-8-encoded yaml object into the value it represents, or into an iterator over its items in lazy mode."""
         import yaml
 
+        if self._lazy:
+            return self._deserialize_lazily(reader)
+
         try:
             return yaml.safe_load(reader)
         except yaml.YAMLError as e:
             raise DeserializationError(e)
+
+    def _deserialize_lazily(self, reader: BinaryIO) -> Iterator[Any]:
+        import yaml
+
+        source = reopen(reader)
+        loader = yaml.SafeLoader(source)
+
+        try:
+            # Parse the prologue eagerly, so that documents that cannot be iterated over are rejected right away
+            loader.get_event()  # StreamStartEvent
+            if loader.check_event(yaml.StreamEndEvent):
+                _close(loader, source)
+                return iter([])
+
+            loader.get_event()  # DocumentStartEvent
+            if loader.check_event(yaml.SequenceStartEvent):
+                end_event, pairs = yaml.SequenceEndEvent, False
+            elif loader.check_event(yaml.MappingStartEvent):
+                end_event, pairs = yaml.MappingEndEvent, True
+            else:
+                raise DeserializationError(
+                    "Lazy deserialization is only supported for documents whose top-level value is a sequence or a mapping"
+                )
+
+            loader.get_event()
+        except (yaml.YAMLError, DeserializationError) as e:
+            _close(loader, source)
+            if isinstance(e, DeserializationError):
+                raise
+
+            raise DeserializationError(e)
+
+        return _iterate(loader, source, end_event, pairs)
+
+
+def _iterate(loader, source: BinaryIO, end_event: Any, pairs: bool) -> Iterator[Any]:
+    """Yield the items of the collection the loader is positioned in, constructing them one by one."""
+    import yaml
+
+    try:
+        while not loader.check_event(end_event):
+            if pairs:
+                key = _construct_next(loader)
+                yield key, _construct_next(loader)
+            else:
+                yield _construct_next(loader)
+
+        loader.get_event()  # SequenceEndEvent or MappingEndEvent
+        loader.get_event()  # DocumentEndEvent
+        if not loader.check_event(yaml.StreamEndEvent):
+            raise DeserializationError(
+                "Lazy deserialization expects a single document in the stream"
+            )
+    except yaml.YAMLError as e:
+        raise DeserializationError(e)
+    finally:
+        _close(loader, source)
+
+
+def _construct_next(loader) -> Any:
+    # Anchors are kept by the composer, so items can still refer to anchors defined in previous items
+    return loader.construct_document(loader.compose_node(None, None))
+
+
+def _close(loader, source: BinaryIO):
+    loader.dispose()
+    source.close()
@@ -0,0 +1,175 @@
+"""Asynchronous (asyncio) adapters for the dagger.Serializer protocol."""
+
+import asyncio
+import functools
+import inspect
+import os
+import tempfile
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Any, BinaryIO, Iterable, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dagger import Serializer
+
+
+class AsyncSerializer:
+    """
+    Adapter that exposes an asyncio-native API over any implementation of the dagger.Serializer protocol.
+
+    Serialization and deserialization run in an executor, so that many artifacts can be
+    transferred and decoded concurrently without blocking the event loop. By default, they run
+    in the event loop's default thread pool, which overlaps I/O and any decoding that releases the GIL.
+    For CPU-bound serializers, a concurrent.futures.ProcessPoolExecutor may be used instead, as long as
+    values are passed as path names (the serializer and the results must also be picklable).
+
+    Besides regular binary streams and path names, the adapter accepts asynchronous streams:
+    readers with a coroutine 'read' method (e.g. asyncio.StreamReader) and writers with a
+    coroutine 'write' method or a 'drain' method (e.g. asyncio.StreamWriter). Their contents are
+    spooled through a temporary file, so that the serializer can still work with a local file.
+    """
+
+    # Size of the blocks transferred from/to asynchronous streams
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(
+        self,
+        serializer: "Serializer",
+        executor: Optional[Executor] = None,
+    ):
+        """
+        Initialize an asynchronous adapter for a serializer.
+
+        Parameters
+        ----------
+        serializer: Serializer
+            The (synchronous) serializer to adapt.
+
+        executor: concurrent.futures.Executor, optional
+            The executor to serialize and deserialize values in. Defaults to the event loop's default executor.
+        """
+        self._serializer = serializer
+        self._executor = executor
+
+    @property
+    def extension(self) -> str:
+        """Extension to use for files generated by the adapted serializer."""
+        return self._serializer.extension
+
+    async def serialize(
+        self, value: Any, writer: Union[str, os.PathLike, BinaryIO, Any]
+    ):
+        """Serialize a value into a path name, a binary stream or an asynchronous writer."""
+        if isinstance(writer, (str, os.PathLike)):
+            return await self._run(_serialize_to_path, self._serializer, value, writer)
+
+        if not _is_async_writer(writer):
+            return await self._run(self._serializer.serialize, value, writer)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f"value.{self.extension}")
+            await self._run(_serialize_to_path, self._serializer, value, path)
+
+            with open(path, "rb") as f:
+                while True:
+                    chunk = await self._run(f.read, self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+
+                    result = writer.write(chunk)
+                    if inspect.isawaitable(result):
+                        await result
+                    if hasattr(writer, "drain"):
+                        await writer.drain()
+
+    async def deserialize(self, reader: Union[str, os.PathLike, BinaryIO, Any]) -> Any:
+        """Deserialize a value from a path name, a binary stream or an asynchronous reader."""
+        if isinstance(reader, (str, os.PathLike)):
+            return await self._run(_deserialize_from_path, self._serializer, reader)
+
+        if not _is_async_reader(reader):
+            return await self._run(self._serializer.deserialize, reader)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f"value.{self.extension}")
+
+            with open(path, "wb") as f:
+                while True:
+                    chunk = await reader.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+
+                    await self._run(f.write, chunk)
+
+            # The file is removed on return, so values that keep reading from it (e.g. lazy iterators,
+            # memory maps or Dask DataFrames) must already hold their own handle to it or mapping of it.
+            # Serializers that only record its path (e.g. to read it from Dask tasks) cannot be used here.
+            return await self._run(_deserialize_from_path, self._serializer, path)
+
+    async def _run(self, fn, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+
+
+async def deserialize_many(
+    sources: Iterable[Tuple["Serializer", Union[str, os.PathLike, BinaryIO, Any]]],
+    max_concurrency: int = 8,
+    executor: Optional[Executor] = None,
+) -> List[Any]:
+    """
+    Deserialize many values concurrently.
+
+    Parameters
+    ----------
+    sources: iterable of (Serializer, source) tuples
+        The serializer to deserialize each value with, along with the path name,
+        binary stream or asynchronous reader to deserialize it from.
+
+    max_concurrency: int, default=8
+        The maximum number of values to deserialize at the same time.
+
+    executor: concurrent.futures.Executor, optional
+        The executor to deserialize the values in. Defaults to the event loop's default executor.
+
+    Returns
+    -------
+    The deserialized values, in the same order as the sources.
+    If any of them fails, the first error is raised.
+    """
+    assert max_concurrency > 0
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def deserialize(serializer: "Serializer", source: Any) -> Any:
+        async with semaphore:
+            return await AsyncSerializer(serializer, executor).deserialize(source)
+
+    return await asyncio.gather(
+        *(deserialize(serializer, source) for serializer, source in sources)
+    )
+
+
+def _is_async_reader(reader: Any) -> bool:
+    return inspect.iscoroutinefunction(getattr(reader, "read", None))
+
+
+def _is_async_writer(writer: Any) -> bool:
+    return inspect.iscoroutinefunction(getattr(writer, "write", None)) or hasattr(
+        writer, "drain"
+    )
+
+
+# The following functions are defined at the module level, so that they can be sent to a process pool
+
+
+def _serialize_to_path(
+    serializer: "Serializer", value: Any, path: Union[str, os.PathLike]
+):
+    with open(path, "wb") as writer:
+        serializer.serialize(value, writer)
+
+
+def _deserialize_from_path(
+    serializer: "Serializer", path: Union[str, os.PathLike]
+) -> Any:
+    with open(path, "rb") as reader:
+        return serializer.deserialize(reader)
@@ -1 +1,10 @@
 """Collection of serializers for Dask data structures (https://docs.dask.org/en/latest/dataframe-api.html)."""
+
+from dagger_contrib.serializer._lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(
+    globals(),
+    {
+        "dataframe": "dagger_contrib.serializer.dask.dataframe",
+    },
+)
@@ -1,4 +1,23 @@
 """Collection of serializers for Dask DataFrames (https://docs.dask.org/en/latest/generated/dask.dataframe.DataFrame.html#dask.dataframe.DataFrame)."""
 
-from dagger_contrib.serializer.dask.dataframe.as_csv import AsCSV  # noqa
-from dagger_contrib.serializer.dask.dataframe.as_parquet import AsParquet  # noqa
+from typing import TYPE_CHECKING
+
+from dagger_contrib.serializer._lazy import lazy_exports
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dagger_contrib.serializer.dask.dataframe._staging import (  # noqa
+        StagingMetrics,
+    )
+    from dagger_contrib.serializer.dask.dataframe.as_csv import AsCSV  # noqa
+    from dagger_contrib.serializer.dask.dataframe.as_parquet import AsParquet  # noqa
+
+__all__ = ["AsCSV", "AsParquet", "StagingMetrics"]
+
+__getattr__, __dir__ = lazy_exports(
+    globals(),
+    {
+        "AsCSV": "dagger_contrib.serializer.dask.dataframe.as_csv:AsCSV",
+        "AsParquet": "dagger_contrib.serializer.dask.dataframe.as_parquet:AsParquet",
+        "StagingMetrics": "dagger_contrib.serializer.dask.dataframe._staging:StagingMetrics",
+    },
+)
@@ -0,0 +1,179 @@
+"""Rebalance the partitions of Dask DataFrames before they are written."""
+
+import bisect
+import math
+from typing import Any, List, Optional, Tuple, Union
+
+
+def rebalance(
+    df: Any,
+    partition_size: Optional[Union[int, str]] = None,
+    partition_rows: Optional[int] = None,
+) -> Any:
+    """
+    Rebalance a Dask DataFrame into evenly sized partitions that are close to a target size.
+
+    Rows keep their original order, so the index of the resulting DataFrame
+    remains sorted if it was sorted in the original one.
+
+    Parameters
+    ----------
+    df: dask.dataframe.DataFrame
+        The DataFrame to rebalance.
+
+    partition_size: int or str, optional
+        The target in-memory size of each partition, in bytes (e.g. 100_000_000 or "100MB").
+
+    partition_rows: int, optional
+        The target number of rows of each partition.
+
+    Returns
+    -------
+    The rebalanced DataFrame, or the original one if no target was specified.
+    Computing the number of rows (and size) of each partition requires a pass over the data,
+    and known divisions are carried forward by looking up the index value each new partition
+    starts at, so expensive DataFrames should be persisted before they are rebalanced.
+    """
+    assert partition_size is None or partition_rows is None
+
+    if partition_size is None and partition_rows is None:
+        return df
+
+    from dask.utils import parse_bytes
+
+    if partition_rows is None:
+        stats = df.map_partitions(
+            _partition_stats,
+            meta={"rows": "int64", "bytes": "int64"},
+        ).compute()
+        total_rows = int(stats["rows"].sum())
+        bytes_per_row = stats["bytes"].sum() / total_rows if total_rows else 1
+        target_bytes = parse_bytes(partition_size)
+        partition_rows = max(1, int(target_bytes // max(bytes_per_row, 1)))
+    else:
+        stats = df.map_partitions(len).compute().to_frame("rows")
+        total_rows = int(stats["rows"].sum())
+
+    assert partition_rows > 0
+
+    npartitions = max(1, math.ceil(total_rows / partition_rows))
+    return _split_rows(df, stats["rows"].tolist(), npartitions)
+
+
+def _partition_stats(partition) -> Any:
+    import pandas as pd
+
+    return pd.DataFrame(
+        {
+            "rows": [len(partition)],
+            "bytes": [int(partition.memory_usage(index=True, deep=True).sum())],
+        }
+    )
+
+
+def _split_rows(df: Any, lengths: List[int], npartitions: int) -> Any:
+    """Build a DataFrame with 'npartitions' partitions of (almost) the same number of rows out of the original partitions."""
+    from dask import delayed
+    from dask.dataframe import from_delayed
+
+    total_rows = sum(lengths)
+    partitions = df.to_delayed()
+
+    # Global row offset at which each original partition starts
+    offsets = [0]
+    for length in lengths:
+        offsets.append(offsets[-1] + length)
+
+    # Both the new and the original partitions are in row order, so they are merged in a single sweep
+    new_partitions, starts = [], []
+    first = 0
+    for i in range(npartitions):
+        start = total_rows * i // npartitions
+        end = total_rows * (i + 1) // npartitions
+        starts.append(start)
+
+        while first < len(lengths) and offsets[first + 1] <= start:
+            first += 1
+
+        slices: List[Tuple[Any, int, int]] = []
+        j = first
+        while j < len(lengths) and offsets[j] < end:
+            if lengths[j] > 0:
+                slices.append(
+                    (
+                        partitions[j],
+                        max(start, offsets[j]) - offsets[j],
+                        min(end, offsets[j + 1]) - offsets[j],
+                    )
+                )
+            j += 1
+
+        new_partitions.append(delayed(_concat_slices)(slices, df._meta))
+
+    divisions = (
+        _carried_divisions(df, partitions, offsets, starts)
+        if df.known_divisions
+        else None
+    )
+    return from_delayed(
+        new_partitions, meta=df._meta, divisions=divisions, verify_meta=False
+    )
+
+
+def _carried_divisions(
+    df: Any, partitions: List[Any], offsets: List[int], starts: List[int]
+) -> Optional[Tuple[Any, ...]]:
+    """
+    Return the divisions of the partitions that start at the given rows of a DataFrame with known divisions.
+
+    New partitions that start where an original one does keep its division. The others start at
+    the index value of their first row, which is looked up along with the value of the row before it,
+    since a run of equal index values split across two partitions cannot be described by divisions.
+
+    Returns
+    -------
+    The divisions, or None if they cannot be carried forward.
+    """
+    import dask
+
+    divisions = [df.divisions[0]] + [None] * (len(starts) - 1) + [df.divisions[-1]]
+    lookups = {}
+    for i, start in enumerate(starts[1:], 1):
+        # Last original partition that starts at (or before) the row, skipping empty ones
+        j = bisect.bisect_right(offsets, start) - 1
+        if offsets[j] == start:
+            divisions[i] = df.divisions[j]
+        else:
+            lookups[i] = [
+                _index_value(partitions, offsets, start - 1),
+                _index_value(partitions, offsets, start),
+            ]
+
+    (values,) = dask.compute(lookups)
+    for i, (previous, value) in values.items():
+        if previous == value:
+            return None
+
+        divisions[i] = value
+
+    return tuple(divisions)
+
+
+def _index_value(partitions: List[Any], offsets: List[int], row: int) -> Any:
+    from dask import delayed
+
+    j = bisect.bisect_right(offsets, row) - 1
+    return delayed(_at)(partitions[j], row - offsets[j])
+
+
+def _at(partition: Any, position: int) -> Any:
+    return partition.index[position]
+
+
+def _concat_slices(slices: List[Tuple[Any, int, int]], meta: Any) -> Any:
+    import pandas as pd
+
+    if not slices:
+        return meta
+
+    return pd.concat([partition.iloc[start:end] for partition, start, end in slices])
@@ -0,0 +1,173 @@
+"""Stage the files of Dask DataFrames in a scratch directory before a path serializer packages them."""
+
+import errno
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+
+@dataclass(frozen=True)
+class StagingMetrics:
+    """
+    Where and for how long a DataFrame was staged before being packaged into an artifact.
+
+    Dask computes each partition and writes it as part of the same task, so 'stage_seconds'
+    accounts for both. 'write_seconds' isolates the time the tasks spent writing files (added up
+    across tasks, which may run in parallel), when the serializer can measure it.
+    """
+
+    directory: str
+    in_memory: bool
+    estimated_bytes: Optional[int]
+    staged_bytes: int
+    stage_seconds: float
+    write_seconds: Optional[float]
+    package_seconds: float
+    cleanup_seconds: float
+    fell_back_to_disk: bool = False
+
+
+class Staging:
+    """
+    Choose the directory the files of a DataFrame are staged in, and measure each step of the serialization.
+
+    With a memory budget, the files are staged in a RAM-backed filesystem when the in-memory size of the
+    DataFrame (estimated from its first partition) fits in the budget and in the free space of that filesystem.
+    If the filesystem fills up anyway, staging starts over in the scratch directory.
+    """
+
+    MEMORY_DIR = "/dev/shm"
+
+    def __init__(
+        self,
+        scratch_dir: Optional[str] = None,
+        memory_budget: Optional[Union[int, str]] = None,
+        metrics_callback: Optional[Callable[[StagingMetrics], None]] = None,
+    ):
+        """
+        Initialize the staging options of a serializer.
+
+        Parameters
+        ----------
+        scratch_dir: str, optional
+            The directory to stage files in. By default, the temporary directory of the system.
+
+        memory_budget: int or str, optional
+            The maximum number of bytes (e.g. 2_000_000_000 or "2GB") to stage in memory.
+            By default, files are never staged in memory.
+
+        metrics_callback: callable, optional
+            A function that receives the StagingMetrics of each serialization.
+        """
+        self._scratch_dir = scratch_dir
+        self._memory_budget = memory_budget
+        self._metrics_callback = metrics_callback
+
+    def run(
+        self,
+        df: Any,
+        write: Callable[[Any, str], Optional[float]],
+        package: Callable[[str], None],
+    ):
+        """
+        Stage a DataFrame with 'write', which returns the time spent writing files if it measures it, and 'package' the result.
+
+        'write' receives the DataFrame along with the directory, since the partition computed to estimate its size
+        is passed on instead of being computed again. Nothing is passed to 'package' until staging has succeeded,
+        so staging can start over in a different directory.
+        """
+        estimated_bytes = None
+        directories: List[Optional[str]] = [self._scratch_dir]
+        if self._memory_budget is not None:
+            estimated_bytes, df = _estimate_bytes(df)
+            if self._fits_in_memory(estimated_bytes):
+                directories.insert(0, self.MEMORY_DIR)
+
+        for attempt, directory in enumerate(directories):
+            tmp = tempfile.mkdtemp(dir=directory)
+            try:
+                start = time.perf_counter()
+                try:
+                    write_seconds = write(df, tmp)
+                except OSError as e:
+                    if attempt == len(directories) - 1 or not _is_out_of_space(e):
+                        raise
+                    continue
+                stage_seconds = time.perf_counter() - start
+                staged_bytes = _disk_usage(tmp)
+
+                start = time.perf_counter()
+                package(tmp)
+                package_seconds = time.perf_counter() - start
+            finally:
+                start = time.perf_counter()
+                shutil.rmtree(tmp, ignore_errors=True)
+                cleanup_seconds = time.perf_counter() - start
+
+            if self._metrics_callback is not None:
+                self._metrics_callback(
+                    StagingMetrics(
+                        directory=os.path.dirname(tmp),
+                        in_memory=directory == self.MEMORY_DIR,
+                        estimated_bytes=estimated_bytes,
+                        staged_bytes=staged_bytes,
+                        stage_seconds=stage_seconds,
+                        write_seconds=write_seconds,
+                        package_seconds=package_seconds,
+                        cleanup_seconds=cleanup_seconds,
+                        fell_back_to_disk=attempt > 0,
+                    )
+                )
+            return
+
+    def _fits_in_memory(self, estimated_bytes: int) -> bool:
+        from dask.utils import parse_bytes
+
+        if not os.path.isdir(self.MEMORY_DIR):
+            return False
+
+        return estimated_bytes <= min(
+            parse_bytes(self._memory_budget),
+            shutil.disk_usage(self.MEMORY_DIR).free,
+        )
+
+
+def _estimate_bytes(df: Any) -> Tuple[int, Any]:
+    """
+    Estimate the in-memory size of a DataFrame by extrapolating that of its first partition, which is computed for the purpose.
+
+    Returns
+    -------
+    A tuple with the estimate and an equivalent DataFrame whose first partition is the one that was computed.
+    """
+    from dask import delayed
+    from dask.dataframe import from_delayed
+
+    if df.npartitions == 0:
+        return 0, df
+
+    partitions = df.to_delayed()
+    first_partition = partitions[0].compute()
+    partitions[0] = delayed(first_partition)
+    return (
+        int(first_partition.memory_usage(index=True, deep=True).sum()) * df.npartitions,
+        from_delayed(
+            partitions, meta=df._meta, divisions=df.divisions, verify_meta=False
+        ),
+    )
+
+
+def _is_out_of_space(e: OSError) -> bool:
+    # Some writers (e.g. pyarrow) raise OSErrors without an errno, but with the message of the original error
+    return e.errno == errno.ENOSPC or os.strerror(errno.ENOSPC) in str(e)
+
+
+def _disk_usage(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path)
+        for name in files
+    )
@@ -1,16 +1,29 @@
 """Serialize DataFrames as CSVs."""
 
+import json
 import os
-import tempfile
-from typing import Any, BinaryIO, Optional
+import time
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, List, Optional, Union
 
-from dagger import DeserializationError, SerializationError, Serializer
+from dagger import DeserializationError, SerializationError
+
+from dagger_contrib.serializer._strings import STRING_DTYPES, convert_strings
+from dagger_contrib.serializer.dask.dataframe._partitioning import rebalance
+from dagger_contrib.serializer.dask.dataframe._staging import Staging, StagingMetrics
+from dagger_contrib.serializer.inspection import Summary, read_member
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dagger import Serializer
 
 
 class AsCSV:
     """
     Serializer implementation that uses CSV to serialize Dask DataFrames.
 
+    Along with the CSV files, the serializer records the name and type of the index and,
+    when the index is sorted across partitions, its divisions. This allows deserialization
+    to restore the index of each partition independently, without shuffling the data.
+
     See Also
     --------
     - https://docs.dask.org/en/latest/generated/dask.dataframe.DataFrame.to_csv.html#dask.dataframe.DataFrame.to_csv
@@ -19,6 +32,9 @@ class AsCSV:
 
     GLOB_PATTERN = "df-*.csv"
 
+    # Sidecar file describing the index of the DataFrame and how it was partitioned
+    METADATA_FILENAME = "_index.json"
+
     # Some compression algorithms do not support breaking apart files
     # Official message:
     # > Please ensure that each individual file can fit in memory and
@@ -31,8 +47,14 @@ class AsCSV:
 
     def __init__(
         self,
-        path_serializer: Serializer,
+        path_serializer: "Serializer",
         compression: Optional[str] = None,
+        partition_size: Optional[Union[int, str]] = None,
+        partition_rows: Optional[int] = None,
+        string_dtype: Optional[str] = None,
+        scratch_dir: Optional[str] = None,
+        memory_budget: Optional[Union[int, str]] = None,
+        metrics_callback: Optional[Callable[[StagingMetrics], None]] = None,
     ):
         """
         Initialize a serializer that serializes DataFrame values as CSVs.
@@ -45,9 +67,43 @@ class AsCSV:
 
         compression: str, optional
             The compression mode to use for each CSV file, which may be one of the following values: {"gzip", "bz2", "xz", None}
+
+        partition_size: int or str, optional
+            Rebalance the DataFrame before writing it, so that each partition (and thus each CSV file)
+            holds roughly this many bytes of in-memory data (e.g. 100_000_000 or "100MB").
+
+        partition_rows: int, optional
+            Rebalance the DataFrame before writing it, so that each partition (and thus each CSV file)
+            holds roughly this many rows. It cannot be combined with partition_size.
+
+        string_dtype: str, optional
+            The dtype to deserialize string columns into: {None, "pyarrow", "category"}.
+            None keeps the NumPy object columns the parser produces. Otherwise, each partition converts them
+            into "string[pyarrow]" or categorical columns as soon as it is parsed. The categories of each
+            partition are not known in advance.
+
+        scratch_dir: str, optional
+            The directory to write the CSV files in before the path serializer packages them.
+            By default, the temporary directory of the system.
+
+        memory_budget: int or str, optional
+            Write the CSV files in a RAM-backed filesystem (/dev/shm) instead, when the in-memory size of the
+            DataFrame (estimated from its first partition) is below this many bytes (e.g. "2GB") and fits in it.
+            The serializer falls back to the scratch directory if it does not.
+
+        metrics_callback: callable, optional
+            A function that receives the StagingMetrics of each serialization: where the files were written,
+            and how long computing and writing them, packaging them and removing them took.
         """
+        assert partition_size is None or partition_rows is None
+        assert string_dtype in STRING_DTYPES
+
         self._compression = compression
         self._path_serializer = path_serializer
+        self._partition_size = partition_size
+        self._partition_rows = partition_rows
+        self._string_dtype = string_dtype
+        self._staging = Staging(scratch_dir, memory_budget, metrics_callback)
 
     def serialize(self, value: Any, writer: BinaryIO):
         """Serialize a Dask DataFrame as a series of CSV files packaged and compressed by the provided path serializer."""
@@ -58,28 +114,71 @@ class AsCSV:
                 f"This serializer only works with values of type dask.dataframe.DataFrame. You are trying to serialize a value of type '{type(value).__name__}'"
             )
 
-        with tempfile.TemporaryDirectory() as tmp:
-            value.to_csv(
-                os.path.join(tmp, self.GLOB_PATTERN),
-                compression=self._compression,
+        value = rebalance(
+            value,
+            partition_size=self._partition_size,
+            partition_rows=self._partition_rows,
+        )
+
+        self._staging.run(
+            value,
+            write=self._write,
+            package=lambda tmp: self._path_serializer.serialize(tmp, writer),
+        )
+
+    def _write(self, value: Any, tmp: str) -> float:
+        """Write the partitions of a DataFrame and their metadata into a directory, and return the time spent writing the files."""
+        import dask
+
+        # Writing each partition and collecting the statistics of its index
+        # as part of the same task means the DataFrame is only computed once
+        digits = len(str(max(value.npartitions - 1, 0)))
+        writes = [
+            dask.delayed(_write_partition, pure=False)(
+                partition,
+                os.path.join(
+                    tmp,
+                    self.GLOB_PATTERN.replace("*", str(i).zfill(digits)),
+                ),
+                self._compression,
             )
-            self._path_serializer.serialize(tmp, writer)
+            for i, partition in enumerate(value.to_delayed())
+        ]
+        (partition_stats,) = dask.compute(writes)
+
+        with open(os.path.join(tmp, self.METADATA_FILENAME), "w") as f:
+            json.dump(_index_metadata(value, partition_stats), f)
+
+        return sum(stats["write_seconds"] for stats in partition_stats)
 
     def deserialize(self, reader: BinaryIO) -> Any:
         """Deserialize the content of 'reader' into a Dask DataFrame backed by a series of CSV files."""
-        from dask.dataframe import read_csv
+        from dask.dataframe import from_delayed, read_csv
         from pandas.errors import EmptyDataError
 
         path = self._path_serializer.deserialize(reader)
+        metadata = _read_metadata(os.path.join(path, self.METADATA_FILENAME))
+        divisions = _restore_divisions(metadata)
 
         try:
-            return read_csv(
+            df = read_csv(
                 os.path.join(path, self.GLOB_PATTERN),
                 compression=self._compression,
-                blocksize=self.BLOCKSIZE_BY_COMPRESSION.get(
-                    self._compression or "", "default"
+                # Index values that look like numbers (e.g. "10") must not be parsed into numbers
+                dtype=(
+                    {0: "object"}
+                    if metadata is not None and metadata["index"].get("strings")
+                    else None
+                ),
+                # Known divisions map to files, so we must read each file into a single partition
+                blocksize=(
+                    None
+                    if divisions is not None
+                    else self.BLOCKSIZE_BY_COMPRESSION.get(
+                        self._compression or "", "default"
+                    )
                 ),
-            ).set_index("Unnamed: 0")
+            )
         except EmptyDataError as e:
             raise DeserializationError(e)
         except UnicodeDecodeError as e:
@@ -87,7 +186,178 @@ class AsCSV:
                 f"We could not deserialize the CSV artifact. This may be happening because the file was originally serialized with a particular compression mode, but you're trying to deserialize it with compression=None. The original error is: {str(e)}"
             ) from e
 
+        if metadata is None:
+            # Artifacts serialized by previous versions do not record how their index was partitioned
+            return _convert_strings(df.set_index("Unnamed: 0"), self._string_dtype)
+
+        # Setting the index on each partition independently avoids a shuffle
+        index_args = (
+            df.columns[0],
+            metadata["index"]["name"],
+            metadata["index"]["dtype"],
+        )
+        df = df.map_partitions(
+            _restore_index,
+            *index_args,
+            meta=_restore_index(df._meta, *index_args),
+        )
+        df = _convert_strings(df, self._string_dtype)
+
+        if divisions is None:
+            return df
+
+        return from_delayed(
+            df.to_delayed(),
+            meta=df._meta,
+            divisions=divisions,
+            verify_meta=False,
+        )
+
+    def inspect(self, reader: BinaryIO) -> Summary:
+        """
+        Summarize the artifact from the metadata recorded along with the CSV files, without parsing any of them.
+
+        When the path serializer supports reading single members (e.g. AsTar or AsZip),
+        only the metadata file is read from the artifact.
+
+        Returns
+        -------
+        A summary with the number of partitions and the number of rows of each one.
+        """
+        try:
+            metadata = json.loads(
+                read_member(self._path_serializer, reader, self.METADATA_FILENAME)
+            )
+        except KeyError:
+            raise DeserializationError(
+                f"The artifact does not contain a '{self.METADATA_FILENAME}' file. It may have been serialized by a previous version of this serializer"
+            )
+
+        partition_rows = metadata["partition_rows"]
+        return Summary(
+            format="csv",
+            rows=sum(partition_rows),
+            partitions=len(partition_rows),
+            partition_rows=partition_rows,
+        )
+
     @property
     def extension(self) -> str:
         """Extension to use for files generated by this serializer."""
         return self._path_serializer.extension
+
+
+def _write_partition(partition, path: str, compression: Optional[str]) -> dict:
+    """Write a partition as a CSV file and return the time it took, along with the statistics of its index."""
+    from pandas.api.types import infer_dtype
+
+    start = time.perf_counter()
+    partition.to_csv(path, compression=compression)
+    write_seconds = time.perf_counter() - start
+
+    index = partition.index
+    strings = infer_dtype(index, skipna=True) in ["string", "empty"]
+    try:
+        monotonic = len(index) > 0 and bool(index.is_monotonic_increasing)
+    except TypeError:
+        # Indexes with values that cannot be compared (e.g. of mixed types) are not sorted
+        monotonic = False
+
+    if not monotonic:
+        return {
+            "rows": len(index),
+            "write_seconds": write_seconds,
+            "strings": strings,
+            "monotonic": False,
+        }
+
+    return {
+        "rows": len(index),
+        "write_seconds": write_seconds,
+        "strings": strings,
+        "min": index[0],
+        "max": index[-1],
+        "monotonic": True,
+    }
+
+
+def _index_metadata(df, partition_stats: List[dict]) -> dict:
+    """Describe the index of a DataFrame and, if it is sorted across partitions, its divisions."""
+    import pandas as pd
+
+    metadata = {
+        "index": {
+            "name": df.index.name,
+            "dtype": str(df.index.dtype),
+            # Whether the values of the index are strings, which the CSV parser would otherwise convert
+            "strings": all(stats["strings"] for stats in partition_stats),
+        },
+        "partition_rows": [stats["rows"] for stats in partition_stats],
+        "divisions": None,
+    }
+
+    sorted_ = all(stats["rows"] > 0 and stats["monotonic"] for stats in partition_stats)
+    if sorted_:
+        try:
+            sorted_ = all(
+                previous["max"] < next_["min"]
+                for previous, next_ in zip(partition_stats, partition_stats[1:])
+            )
+        except TypeError:
+            # Partitions whose indexes hold values of different types are not sorted across each other
+            sorted_ = False
+
+    if sorted_:
+        divisions = [stats["min"] for stats in partition_stats]
+        divisions.append(partition_stats[-1]["max"])
+        try:
+            metadata["divisions"] = json.loads(
+                pd.Series(divisions).to_json(
+                    orient="values", date_format="iso", date_unit="ns"
+                )
+            )
+        except (TypeError, ValueError, OverflowError):
+            # Divisions that cannot be represented in JSON are simply not recorded
+            pass
+
+    return metadata
+
+
+def _read_metadata(path: str) -> Optional[dict]:
+    if not os.path.isfile(path):
+        return None
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def _restore_divisions(metadata: Optional[dict]) -> Optional[tuple]:
+    import pandas as pd
+
+    if metadata is None or metadata["divisions"] is None:
+        return None
+
+    try:
+        return tuple(
+            pd.Series(metadata["divisions"]).astype(metadata["index"]["dtype"])
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+def _restore_index(partition, column: str, name: Optional[str], dtype: str):
+    index = partition[column].astype(dtype)
+    return partition.drop(columns=[column]).set_index(index.rename(name))
+
+
+def _convert_strings(df, string_dtype: Optional[str]):
+    from dask.dataframe.utils import clear_known_categories
+
+    if string_dtype is None:
+        return df
+
+    return df.map_partitions(
+        convert_strings,
+        string_dtype,
+        meta=clear_known_categories(convert_strings(df._meta, string_dtype)),
+    )
@@ -1,30 +1,58 @@
-"""Serialize DataFrames as CSVs."""
+"""Serialize DataFrames as Parquet files (https://parquet.apache.org/)."""
 
-import os
-import tempfile
-from typing import Any, BinaryIO, Optional
+import inspect
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Dict, Optional, Union
 
-from dagger import SerializationError, Serializer
+from dagger import DeserializationError, SerializationError
+
+from dagger_contrib.serializer._io import local_path
+from dagger_contrib.serializer._parquet import data_columns, pandas_range_index
+from dagger_contrib.serializer._strings import STRING_DTYPES, arrow_to_pandas_kwargs
+from dagger_contrib.serializer.dask.dataframe._partitioning import rebalance
+from dagger_contrib.serializer.dask.dataframe._staging import Staging, StagingMetrics
+from dagger_contrib.serializer.inspection import Summary, read_member
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dagger import Serializer
 
 
 class AsParquet:
     """
     Serializer implementation that uses Parquet to serialize Dask DataFrames.
 
+    Along with the Parquet files, the serializer writes a consolidated "_metadata" file
+    with the schema and statistics (including those of the index) of every file.
+    Deserialization plans the partitions from that single footer and, when the index is
+    sorted, returns a DataFrame with known divisions.
+
+    The serializer can also deserialize artifacts that consist of a single Parquet file
+    (e.g. those produced by dagger_contrib.serializer.pandas.dataframe.AsParquet), which it
+    detects by their magic bytes. Each row group of the file becomes a partition of the DataFrame,
+    which is read with pyarrow whatever the engine.
+
     See Also
     --------
     - https://docs.dask.org/en/latest/generated/dask.dataframe.DataFrame.to_parquet.html#dask.dataframe.DataFrame.to_parquet
     - https://docs.dask.org/en/latest/generated/dask.dataframe.read_parquet.html#dask.dataframe.read_parquet
     """
 
+    # Parquet files start (and end) with these bytes, unlike any of the path serializers' formats
+    PARQUET_MAGIC = b"PAR1"
+
     def __init__(
         self,
-        path_serializer: Serializer,
+        path_serializer: "Serializer",
         engine: str = "auto",
         compression: Optional[str] = "snappy",
+        partition_size: Optional[Union[int, str]] = None,
+        partition_rows: Optional[int] = None,
+        string_dtype: Optional[str] = None,
+        scratch_dir: Optional[str] = None,
+        memory_budget: Optional[Union[int, str]] = None,
+        metrics_callback: Optional[Callable[[StagingMetrics], None]] = None,
     ):
         """
-        Initialize a serializer that serializes DataFrame values as CSVs.
+        Initialize a serializer that serializes DataFrame values as Parquet files.
 
         Parameters
         ----------
@@ -37,10 +65,45 @@ class AsParquet:
 
         compression: str, optional, default="snappy"
             The compression mode, which may be one of the following values: {"snappy", "gzip", "brotli", None}
+
+        partition_size: int or str, optional
+            Rebalance the DataFrame before writing it, so that each partition (and thus each Parquet file)
+            holds roughly this many bytes of in-memory data (e.g. 100_000_000 or "100MB").
+
+        partition_rows: int, optional
+            Rebalance the DataFrame before writing it, so that each partition (and thus each Parquet file)
+            holds roughly this many rows. It cannot be combined with partition_size.
+
+        string_dtype: str, optional
+            The dtype to deserialize string columns into (pyarrow only): {None, "pyarrow", "category"}.
+            None produces NumPy object columns. Otherwise, each partition builds "string[pyarrow]" or categorical
+            columns straight from the Arrow buffers. The categories of each partition are not known in advance.
+
+        scratch_dir: str, optional
+            The directory to write the Parquet files in before the path serializer packages them.
+            By default, the temporary directory of the system.
+
+        memory_budget: int or str, optional
+            Write the Parquet files in a RAM-backed filesystem (/dev/shm) instead, when the in-memory size of the
+            DataFrame (estimated from its first partition) is below this many bytes (e.g. "2GB") and fits in it.
+            The serializer falls back to the scratch directory if it does not.
+
+        metrics_callback: callable, optional
+            A function that receives the StagingMetrics of each serialization: where the files were written,
+            and how long computing and writing them, packaging them and removing them took.
+            Dask writes Parquet files as part of its own tasks, so the time spent writing them is not isolated.
         """
+        assert partition_size is None or partition_rows is None
+        assert string_dtype in STRING_DTYPES
+        assert string_dtype is None or engine in ["auto", "pyarrow"]
+
         self._path_serializer = path_serializer
         self._engine = engine
         self._compression = compression
+        self._partition_size = partition_size
+        self._partition_rows = partition_rows
+        self._string_dtype = string_dtype
+        self._staging = Staging(scratch_dir, memory_budget, metrics_callback)
 
     def serialize(self, value: Any, writer: BinaryIO):
         """Serialize a Dask DataFrame as Parquet file directory packaged and compressed by the provided path serializer."""
@@ -51,25 +114,272 @@ class AsParquet:
                 f"This serializer only works with values of type dask.dataframe.DataFrame. You are trying to serialize a value of type '{type(value).__name__}'"
             )
 
-        with tempfile.TemporaryDirectory() as tmp:
-            value.to_parquet(
-                os.path.join(tmp),
-                engine=self._engine,
-                compression=self._compression,
-            )
-            self._path_serializer.serialize(tmp, writer)
+        value = rebalance(
+            value,
+            partition_size=self._partition_size,
+            partition_rows=self._partition_rows,
+        )
+
+        self._staging.run(
+            value,
+            write=self._write,
+            package=lambda tmp: self._path_serializer.serialize(tmp, writer),
+        )
+
+    def _write(self, value: Any, tmp: str) -> None:
+        """Write the partitions of a DataFrame as Parquet files into a directory, along with their "_metadata" file."""
+        value.to_parquet(
+            tmp,
+            engine=self._engine,
+            compression=self._compression,
+            write_index=True,
+            write_metadata_file=True,
+        )
 
     def deserialize(self, reader: BinaryIO) -> Any:
-        """Deserialize the content of 'reader' into a Dask DataFrame backed by a series of CSV files."""
+        """Deserialize the content of 'reader' into a Dask DataFrame backed by a series of Parquet files (or the row groups of a single file)."""
         from dask.dataframe import read_parquet
 
+        if self._is_parquet_file(reader):
+            path = local_path(reader)
+            if path is None:
+                raise DeserializationError(
+                    "The artifact is a single Parquet file, which can only be deserialized into a Dask DataFrame when it is backed by a local file"
+                )
+
+            return read_parquet_file(path, string_dtype=self._string_dtype)
+
         path = self._path_serializer.deserialize(reader)
-        return read_parquet(
-            path,
-            engine=self._engine,
+        return _unknown_categories(
+            read_parquet(
+                path,
+                engine=self._engine,
+                ignore_metadata_file=False,
+                **_divisions_kwargs(read_parquet),
+                **_string_dtype_kwargs(self._string_dtype),
+            )
+        )
+
+    def inspect(self, reader: BinaryIO) -> Summary:
+        """
+        Summarize the artifact from its "_metadata" file, without reading any of the Parquet files.
+
+        When the path serializer supports reading single members (e.g. AsTar or AsZip),
+        only the "_metadata" file is read from the artifact.
+
+        Returns
+        -------
+        A summary with the number of rows, the columns and their (Arrow) types,
+        the number of partitions (files) and the number of rows of each one.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        single_file = self._is_parquet_file(reader)
+
+        try:
+            if single_file:
+                metadata = pq.read_metadata(reader)
+            else:
+                metadata = pq.read_metadata(
+                    pa.BufferReader(
+                        read_member(self._path_serializer, reader, "_metadata")
+                    )
+                )
+        except KeyError:
+            raise DeserializationError(
+                "The artifact does not contain a '_metadata' file. It may have been serialized by a previous version of this serializer"
+            )
+        except pa.ArrowException as e:
+            raise DeserializationError(e)
+
+        # Each partition is a row group of a single file, or all the row groups of one of many files
+        rows_by_partition: Dict[Any, int] = {}
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            if single_file:
+                partition: Any = i
+            else:
+                partition = (
+                    row_group.column(0).file_path if row_group.num_columns else ""
+                )
+            rows_by_partition[partition] = (
+                rows_by_partition.get(partition, 0) + row_group.num_rows
+            )
+
+        schema = metadata.schema.to_arrow_schema()
+        columns = data_columns(schema)
+
+        return Summary(
+            format="parquet",
+            rows=metadata.num_rows,
+            columns=columns,
+            dtypes={name: str(schema.field(name).type) for name in columns},
+            partitions=len(rows_by_partition),
+            partition_rows=list(rows_by_partition.values()),
         )
 
     @property
     def extension(self) -> str:
         """Extension to use for files generated by this serializer."""
         return self._path_serializer.extension
+
+    def _is_parquet_file(self, reader: BinaryIO) -> bool:
+        if not reader.seekable():
+            return False
+
+        position = reader.tell()
+        magic = reader.read(len(self.PARQUET_MAGIC))
+        reader.seek(position)
+        return magic == self.PARQUET_MAGIC
+
+
+def read_parquet_file(path: str, string_dtype: Optional[str] = None) -> Any:
+    """
+    Read a single Parquet file into a Dask DataFrame with a partition per row group.
+
+    The file is memory-mapped right away, and each partition reads its row group from the mapping.
+    The DataFrame thus owns its data: it can be computed after the file has been removed (e.g. when
+    it was a temporary copy of the artifact), while pages are only loaded as row groups are read.
+    Computing it in other processes copies the whole mapping to them.
+
+    Divisions are known when the index is sorted, or when it is a RangeIndex. The latter is only
+    stored as metadata in the file, so it is restored explicitly for each row group.
+    String columns are deserialized into 'string_dtype' (see AsParquet).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from dask import delayed
+    from dask.dataframe import from_delayed, from_pandas
+
+    with pa.memory_map(path) as f:
+        buffer = f.read_buffer()
+
+    parquet_file = pq.ParquetFile(pa.BufferReader(buffer))
+    metadata = parquet_file.metadata
+    schema = parquet_file.schema_arrow
+    to_pandas_kwargs = arrow_to_pandas_kwargs(string_dtype)
+
+    range_index = pandas_range_index(schema)
+    meta = schema.empty_table().to_pandas(**to_pandas_kwargs)
+    if range_index is not None:
+        meta = _set_index(meta, range_index[:0])
+
+    if metadata.num_row_groups == 0:
+        return _unknown_categories(from_pandas(meta, npartitions=1))
+
+    offsets = [0]
+    for i in range(metadata.num_row_groups):
+        offsets.append(offsets[-1] + metadata.row_group(i).num_rows)
+
+    partitions = [
+        delayed(_read_row_group)(
+            buffer,
+            metadata,
+            i,
+            None if range_index is None else range_index[start:end],
+            to_pandas_kwargs,
+        )
+        for i, (start, end) in enumerate(zip(offsets[:-1], offsets[1:]))
+    ]
+
+    divisions: Optional[tuple] = None
+    if all(end > start for start, end in zip(offsets[:-1], offsets[1:])):
+        if range_index is None:
+            divisions = _index_divisions(metadata, schema, meta.index.dtype)
+        elif range_index.step > 0:
+            divisions = tuple(range_index[start] for start in offsets[:-1]) + (
+                range_index[-1],
+            )
+
+    return _unknown_categories(
+        from_delayed(
+            partitions,
+            meta=meta,
+            divisions=divisions or (None,) * (len(partitions) + 1),
+            verify_meta=False,
+        )
+    )
+
+
+def _read_row_group(
+    buffer: Any,
+    metadata: Any,
+    i: int,
+    index: Optional[Any],
+    to_pandas_kwargs: dict,
+) -> Any:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(pa.BufferReader(buffer), metadata=metadata)
+    partition = parquet_file.read_row_group(i, use_pandas_metadata=True).to_pandas(
+        **to_pandas_kwargs
+    )
+    return partition if index is None else _set_index(partition, index)
+
+
+def _set_index(partition: Any, index: Any) -> Any:
+    return partition.set_axis(index, axis=0)
+
+
+def _index_divisions(metadata: Any, schema: Any, dtype: Any) -> Optional[tuple]:
+    """Return the divisions of a file whose index is stored in a single column, from the statistics of each row group, if it is sorted."""
+    import pandas as pd
+
+    index_columns = (schema.pandas_metadata or {}).get("index_columns", [])
+    if len(index_columns) != 1 or not isinstance(index_columns[0], str):
+        return None
+
+    paths = [metadata.schema.column(j).path for j in range(metadata.num_columns)]
+    if index_columns[0] not in paths:
+        return None
+
+    column = paths.index(index_columns[0])
+    minimums, maximums = [], []
+    for i in range(metadata.num_row_groups):
+        statistics = metadata.row_group(i).column(column).statistics
+        if statistics is None or not statistics.has_min_max:
+            return None
+
+        minimums.append(statistics.min)
+        maximums.append(statistics.max)
+
+    try:
+        # Row groups may not share any value, or the partition holding a value would be ambiguous
+        if any(
+            maximum >= minimum for maximum, minimum in zip(maximums[:-1], minimums[1:])
+        ):
+            return None
+
+        return tuple(pd.Index(minimums + maximums[-1:]).astype(dtype))
+    except (TypeError, ValueError):
+        return None
+
+
+def _string_dtype_kwargs(string_dtype: Optional[str]) -> dict:
+    """Return the keyword arguments that make the pyarrow engine of 'read_parquet' deserialize strings into 'string_dtype'."""
+    kwargs = arrow_to_pandas_kwargs(string_dtype)
+    return {"arrow_to_pandas": kwargs} if kwargs else {}
+
+
+def _unknown_categories(df: Any) -> Any:
+    """Mark the categories of categorical columns as unknown, since the metadata of the DataFrame was built from an empty partition."""
+    categorical_columns = [
+        name for name, dtype in df.dtypes.items() if dtype == "category"
+    ]
+    if not categorical_columns:
+        return df
+
+    return df.assign(
+        **{name: df[name].cat.as_unknown() for name in categorical_columns}
+    )
+
+
+def _divisions_kwargs(read_parquet) -> dict:
+    """Return the keyword arguments that make 'read_parquet' calculate divisions from the statistics of the index."""
+    # Newer versions of Dask renamed 'gather_statistics' to 'calculate_divisions'
+    if "calculate_divisions" in inspect.signature(read_parquet).parameters:
+        return {"calculate_divisions": True}
+
+    return {"gather_statistics": True}
@@ -0,0 +1,91 @@
+"""Inspect serialized artifacts without fully deserializing them."""
+
+import os
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    runtime_checkable,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dagger import Serializer
+
+
+@dataclass(frozen=True)
+class Member:
+    """A file or directory packaged in an archive."""
+
+    name: str
+    size: int
+    is_dir: bool = False
+
+
+@dataclass(frozen=True)
+class Summary:
+    """
+    Lightweight description of a serialized artifact.
+
+    Only the fields that the serializer can determine cheaply are populated. The rest remain None.
+    The memory usage is an estimate of the number of bytes the value takes in memory once it is deserialized.
+    """
+
+    format: str
+    rows: Optional[int] = None
+    memory_usage: Optional[int] = None
+    columns: Optional[List[str]] = None
+    dtypes: Optional[Dict[str, str]] = None
+    partitions: Optional[int] = None
+    partition_rows: Optional[List[int]] = None
+    members: Optional[List[Member]] = None
+    preview: Optional[Any] = None
+
+
+@runtime_checkable
+class Inspectable(Protocol):  # pragma: no cover
+    """Protocol for serializers that can summarize an artifact at a fraction of the cost of deserializing it."""
+
+    def inspect(self, reader: BinaryIO) -> Summary:
+        """Summarize the artifact in 'reader' without deserializing it."""
+        ...
+
+
+def read_member(path_serializer: "Serializer", reader: BinaryIO, name: str) -> bytes:
+    """
+    Read a single file from an artifact produced by a path serializer.
+
+    Parameters
+    ----------
+    path_serializer: Serializer
+        The path serializer that produced the artifact (e.g. AsTar).
+
+    reader: BinaryIO
+        The artifact.
+
+    name: str
+        The path of the file, relative to the directory that was serialized.
+
+    Returns
+    -------
+    The contents of the file. When the path serializer does not support reading single
+    members, the whole artifact is deserialized (i.e. extracted) to read it.
+
+    Raises
+    ------
+    KeyError
+        If the artifact does not contain the file.
+    """
+    if hasattr(path_serializer, "read_member"):
+        return path_serializer.read_member(reader, name)  # type: ignore
+
+    path = os.path.join(path_serializer.deserialize(reader), name)
+    if not os.path.isfile(path):
+        raise KeyError(name)
+
+    with open(path, "rb") as f:
+        return f.read()
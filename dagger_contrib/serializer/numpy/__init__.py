@@ -0,0 +1,19 @@
+"""Collection of serializers for NumPy arrays (https://numpy.org/doc/stable/reference/arrays.html)."""
+
+from typing import TYPE_CHECKING
+
+from dagger_contrib.serializer._lazy import lazy_exports
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dagger_contrib.serializer.numpy.as_npy import AsNPY  # noqa
+    from dagger_contrib.serializer.numpy.as_npz import AsNPZ  # noqa
+
+__all__ = ["AsNPY", "AsNPZ"]
+
+__getattr__, __dir__ = lazy_exports(
+    globals(),
+    {
+        "AsNPY": "dagger_contrib.serializer.numpy.as_npy:AsNPY",
+        "AsNPZ": "dagger_contrib.serializer.numpy.as_npz:AsNPZ",
+    },
+)
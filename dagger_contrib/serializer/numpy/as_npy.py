@@ -0,0 +1,109 @@
+"""Serialize NumPy arrays as .npy files (https://numpy.org/doc/stable/reference/generated/numpy.lib.format.html)."""
+
+import io
+from typing import Any, BinaryIO
+
+from dagger import DeserializationError, SerializationError
+
+from dagger_contrib.serializer._io import local_path
+
+
+class AsNPY:
+    """
+    Serializer implementation that uses NumPy's .npy format to serialize NumPy arrays.
+
+    Arrays are streamed to the writer in chunks, so serializing them does not require an extra copy in memory.
+    When the reader is backed by a local file, deserialization returns a read-only memory-mapped array.
+
+    See Also
+    --------
+    - https://numpy.org/doc/stable/reference/generated/numpy.lib.format.html
+    - https://numpy.org/doc/stable/reference/generated/numpy.memmap.html
+    """
+
+    extension = "npy"
+
+    def __init__(
+        self,
+        memory_map: bool = True,
+        chunk_size: int = 16 * 1024 * 1024,
+    ):
+        """
+        Initialize a serializer that serializes NumPy arrays as .npy files.
+
+        Parameters
+        ----------
+        memory_map: bool, default=True
+            Whether to return a read-only np.memmap when deserializing from a reader backed by a local file.
+
+        chunk_size: int, default=16MiB
+            The maximum number of bytes to write to the writer at once.
+        """
+        assert chunk_size > 0
+
+        self._memory_map = memory_map
+        self._chunk_size = chunk_size
+
+    def serialize(self, value: Any, writer: BinaryIO):
+        """Serialize a NumPy array as a .npy file."""
+        import numpy as np
+
+        if not isinstance(value, np.ndarray):
+            raise SerializationError(
+                f"This serializer only works with values of type np.ndarray. You are trying to serialize a value of type '{type(value).__name__}'"
+            )
+
+        write_array(value, writer, self._chunk_size)
+
+    def deserialize(self, reader: BinaryIO) -> Any:
+        """Deserialize a .npy file into a NumPy array, memory-mapped if possible."""
+        import numpy as np
+
+        path = local_path(reader) if self._memory_map else None
+
+        try:
+            if path is not None:
+                return np.load(path, mmap_mode="r", allow_pickle=False)
+
+            return np.lib.format.read_array(reader, allow_pickle=False)
+        except ValueError as e:
+            raise DeserializationError(e)
+
+
+def write_array(array: Any, writer: BinaryIO, chunk_size: int):
+    """Write a NumPy array to 'writer' in the .npy format, in chunks of at most 'chunk_size' bytes."""
+    import numpy as np
+    from numpy.lib import format as npy
+
+    if array.dtype.hasobject:
+        raise SerializationError(
+            "Arrays containing Python objects are not supported, since they can only be serialized with pickle"
+        )
+
+    header = npy.header_data_from_array_1_0(array)
+    header_buffer = io.BytesIO()
+    try:
+        npy.write_array_header_1_0(header_buffer, header)
+    except ValueError:
+        # The header is too big for version 1.0 of the format
+        header_buffer = io.BytesIO()
+        npy.write_array_header_2_0(header_buffer, header)
+    writer.write(header_buffer.getvalue())
+
+    if array.size == 0:
+        return
+
+    if header["fortran_order"]:
+        # The transpose of a Fortran-contiguous array is C-contiguous and has the same memory layout
+        array = array.T
+
+    if array.flags.c_contiguous:
+        data = array.reshape(-1).view(np.uint8)
+        for start in range(0, data.size, chunk_size):
+            writer.write(memoryview(data[start : start + chunk_size]))
+    else:
+        # Non-contiguous arrays are copied into contiguous blocks of rows one at a time
+        rows_per_chunk = max(1, chunk_size // max(1, array[0].nbytes))
+        for start in range(0, len(array), rows_per_chunk):
+            block = np.ascontiguousarray(array[start : start + rows_per_chunk])
+            writer.write(memoryview(block.reshape(-1).view(np.uint8)))
@@ -0,0 +1,90 @@
+"""Serialize collections of named NumPy arrays as .npz files (https://numpy.org/doc/stable/reference/generated/numpy.savez.html)."""
+
+import io
+import zipfile
+from typing import Any, BinaryIO
+
+from dagger import DeserializationError, SerializationError
+
+from dagger_contrib.serializer._io import local_path
+from dagger_contrib.serializer.numpy.as_npy import write_array
+
+
+class AsNPZ:
+    """
+    Serializer implementation that uses NumPy's .npz format to serialize dictionaries of NumPy arrays.
+
+    Each array is streamed into its own member of the archive in chunks, so serializing them does not
+    require an extra copy in memory. Deserialization returns a lazy, read-only mapping (np.lib.npyio.NpzFile)
+    that only reads an array from the archive when it is accessed.
+
+    See Also
+    --------
+    - https://numpy.org/doc/stable/reference/generated/numpy.savez.html
+    - https://numpy.org/doc/stable/reference/generated/numpy.load.html
+    """
+
+    extension = "npz"
+
+    COMPRESSION_CONSTANTS = {
+        "stored": zipfile.ZIP_STORED,
+        "deflated": zipfile.ZIP_DEFLATED,
+    }
+
+    def __init__(
+        self,
+        compression: str = "stored",
+        chunk_size: int = 16 * 1024 * 1024,
+    ):
+        """
+        Initialize a serializer that serializes dictionaries of NumPy arrays as .npz files.
+
+        Parameters
+        ----------
+        compression: str, default="stored"
+            Whether to compress each array in the archive.
+            Accepted values are {"stored", "deflated"}.
+
+        chunk_size: int, default=16MiB
+            The maximum number of bytes to write to the archive at once.
+        """
+        assert compression in self.COMPRESSION_CONSTANTS.keys()
+        assert chunk_size > 0
+
+        self._compression = compression
+        self._chunk_size = chunk_size
+
+    def serialize(self, value: Any, writer: BinaryIO):
+        """Serialize a dictionary of NumPy arrays as a .npz file."""
+        import numpy as np
+
+        if not isinstance(value, dict) or not all(
+            isinstance(k, str) and isinstance(v, np.ndarray) for k, v in value.items()
+        ):
+            raise SerializationError(
+                f"This serializer only works with dictionaries of strings to values of type np.ndarray. You are trying to serialize a value of type '{type(value).__name__}'"
+            )
+
+        with zipfile.ZipFile(
+            writer,
+            mode="w",
+            compression=self.COMPRESSION_CONSTANTS[self._compression],
+            allowZip64=True,
+        ) as zip_:
+            for name, array in value.items():
+                # The size of each member is not known in advance, so we must assume it may need ZIP64 extensions
+                with zip_.open(f"{name}.npy", mode="w", force_zip64=True) as member:
+                    write_array(array, member, self._chunk_size)
+
+    def deserialize(self, reader: BinaryIO) -> Any:
+        """Deserialize a .npz file into a lazy mapping of names to NumPy arrays."""
+        import numpy as np
+
+        # When the reader is backed by a local file, numpy keeps its own handle
+        # open so that arrays can be loaded lazily after the reader is closed
+        source: Any = local_path(reader) or io.BytesIO(reader.read())
+
+        try:
+            return np.load(source, allow_pickle=False)
+        except (ValueError, OSError, zipfile.BadZipFile) as e:
+            raise DeserializationError(e)
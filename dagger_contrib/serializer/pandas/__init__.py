@@ -1,6 +1,37 @@
 """Collection of serializers for Pandas data structures (https://pandas.pydata.org/)."""
 
-from dagger_contrib.serializer.pandas.dataframe import AsCSV as DataFrameAsCSV  # noqa
-from dagger_contrib.serializer.pandas.dataframe import (  # noqa
-    AsParquet as DataFrameAsParquet,
+from typing import TYPE_CHECKING
+
+from dagger_contrib.serializer._lazy import lazy_exports
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dagger_contrib.serializer.pandas.dataframe.as_adaptive import (  # noqa
+        AsAdaptive as DataFrameAsAdaptive,
+    )
+    from dagger_contrib.serializer.pandas.dataframe.as_csv import (  # noqa
+        AsCSV as DataFrameAsCSV,
+    )
+    from dagger_contrib.serializer.pandas.dataframe.as_parquet import (  # noqa
+        AsParquet as DataFrameAsParquet,
+    )
+    from dagger_contrib.serializer.pandas.dataframe.as_partitioned_parquet import (  # noqa
+        AsPartitionedParquet as DataFrameAsPartitionedParquet,
+    )
+
+__all__ = [
+    "DataFrameAsAdaptive",
+    "DataFrameAsCSV",
+    "DataFrameAsParquet",
+    "DataFrameAsPartitionedParquet",
+]
+
+__getattr__, __dir__ = lazy_exports(
+    globals(),
+    {
+        "DataFrameAsAdaptive": "dagger_contrib.serializer.pandas.dataframe.as_adaptive:AsAdaptive",
+        "DataFrameAsCSV": "dagger_contrib.serializer.pandas.dataframe.as_csv:AsCSV",
+        "DataFrameAsParquet": "dagger_contrib.serializer.pandas.dataframe.as_parquet:AsParquet",
+        "DataFrameAsPartitionedParquet": "dagger_contrib.serializer.pandas.dataframe.as_partitioned_parquet:AsPartitionedParquet",
+        "dataframe": "dagger_contrib.serializer.pandas.dataframe",
+    },
 )
@@ -1,4 +1,27 @@
 """Collection of serializers for Pandas DataFrames (https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.html)."""
 
-from dagger_contrib.serializer.pandas.dataframe.as_csv import AsCSV  # noqa
-from dagger_contrib.serializer.pandas.dataframe.as_parquet import AsParquet  # noqa
+from typing import TYPE_CHECKING
+
+from dagger_contrib.serializer._lazy import lazy_exports
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dagger_contrib.serializer.pandas.dataframe.as_adaptive import (  # noqa
+        AsAdaptive,
+    )
+    from dagger_contrib.serializer.pandas.dataframe.as_csv import AsCSV  # noqa
+    from dagger_contrib.serializer.pandas.dataframe.as_parquet import AsParquet  # noqa
+    from dagger_contrib.serializer.pandas.dataframe.as_partitioned_parquet import (  # noqa
+        AsPartitionedParquet,
+    )
+
+__all__ = ["AsAdaptive", "AsCSV", "AsParquet", "AsPartitionedParquet"]
+
+__getattr__, __dir__ = lazy_exports(
+    globals(),
+    {
+        "AsAdaptive": "dagger_contrib.serializer.pandas.dataframe.as_adaptive:AsAdaptive",
+        "AsCSV": "dagger_contrib.serializer.pandas.dataframe.as_csv:AsCSV",
+        "AsParquet": "dagger_contrib.serializer.pandas.dataframe.as_parquet:AsParquet",
+        "AsPartitionedParquet": "dagger_contrib.serializer.pandas.dataframe.as_partitioned_parquet:AsPartitionedParquet",
+    },
+)
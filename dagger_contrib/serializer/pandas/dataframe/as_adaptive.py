@@ -0,0 +1,401 @@
+"""Serialize DataFrames in the format and compression that best suit their contents."""
+
+import importlib.util
+import io
+import json
+from typing import Any, BinaryIO, Optional, Tuple
+
+from dagger import DeserializationError, SerializationError
+
+from dagger_contrib.serializer._io import CountingWriter, OffsetReader
+from dagger_contrib.serializer.pandas.dataframe.as_csv import AsCSV
+from dagger_contrib.serializer.pandas.dataframe.as_parquet import AsParquet
+
+
+class AsAdaptive:
+    """
+    Serializer implementation that picks the format (CSV or Parquet) and the compression codec for each Pandas DataFrame based on its profile.
+
+    The decision takes into account the size of the DataFrame, its column types,
+    the cardinality of its string columns, and the Parquet engines that are available.
+    It is recorded in a small header at the beginning of the artifact, so that
+    deserialization does not depend on how the serializer was configured.
+
+    CSVs only store text, so the header of a CSV artifact also records the dtypes of the DataFrame,
+    which are restored when it is parsed. Values that CSV cannot reproduce (e.g. object columns
+    that mix numbers and strings, hold lists, or hold strings such as "" or "NA" that are parsed
+    as missing values) make serialization fail, instead of changing silently.
+
+    See Also
+    --------
+    - dagger_contrib.serializer.pandas.dataframe.AsCSV
+    - dagger_contrib.serializer.pandas.dataframe.AsParquet
+    """
+
+    extension = "dataframe"
+
+    GOALS = ["speed", "size", "balanced"]
+
+    # Header identifying artifacts produced by this serializer
+    MAGIC = b"DAGGER-CONTRIB-ADAPTIVE-DATAFRAME\n"
+
+    # The header of CSV artifacts lists the dtype of every column, so it may grow with the number of columns
+    MAX_HEADER_BYTES = 64 * 1024 * 1024
+
+    # DataFrames below this (estimated) size are dominated by fixed costs, so compressing them is not worth it
+    SMALL_FRAME_BYTES = 1024 * 1024
+
+    # Compression codecs to use when Parquet is not an option
+    CSV_COMPRESSION_BY_GOAL = {
+        "speed": None,
+        "balanced": "gzip",
+        "size": "xz",
+    }
+
+    # String columns with a ratio of distinct values below this one are cheap to dictionary-encode in Parquet
+    LOW_CARDINALITY_RATIO = 0.5
+
+    def __init__(
+        self,
+        goal: str = "balanced",
+        sample_size: int = 1000,
+    ):
+        """
+        Initialize a serializer that adapts the format of each DataFrame to its contents.
+
+        Parameters
+        ----------
+        goal: str, default="balanced"
+            What the choice of format and compression should optimize for.
+            Accepted values are {"speed", "size", "balanced"}.
+
+        sample_size: int, default=1000
+            The maximum number of values to inspect in each string column in order to
+            estimate its average length and cardinality.
+        """
+        assert goal in self.GOALS
+        assert sample_size > 0
+
+        self._goal = goal
+        self._sample_size = sample_size
+
+    def choose(self, value: Any) -> Tuple[str, Optional[str]]:
+        """
+        Choose the format and the compression codec to serialize a DataFrame with.
+
+        Returns
+        -------
+        A tuple (format, compression), where format is one of {"csv", "parquet"}
+        and compression is one of the compression modes supported by the serializer
+        for that format.
+        """
+        return self._choose(_profile(value, self._sample_size))
+
+    def _choose(self, profile: dict) -> Tuple[str, Optional[str]]:
+        if not _parquet_engine_is_available() or profile["mixed_columns"]:
+            # Columns that mix different types cannot be represented in Parquet
+            return self._choose_csv_compression(profile)
+
+        if self._goal == "size":
+            return "parquet", "brotli"
+
+        if profile["estimated_bytes"] < self.SMALL_FRAME_BYTES:
+            return "parquet", None
+
+        if self._goal == "speed":
+            # Numbers and low-cardinality strings (which are dictionary-encoded)
+            # barely benefit from generic compression, but pay for it on every read.
+            high_cardinality_bytes = profile["high_cardinality_string_bytes"]
+            if high_cardinality_bytes * 2 < profile["estimated_bytes"]:
+                return "parquet", None
+
+        return "parquet", "snappy"
+
+    def _choose_csv_compression(self, profile: dict) -> Tuple[str, Optional[str]]:
+        if profile["estimated_bytes"] < self.SMALL_FRAME_BYTES:
+            return "csv", None
+
+        return "csv", self.CSV_COMPRESSION_BY_GOAL[self._goal]
+
+    def serialize(self, value: Any, writer: BinaryIO):
+        """Serialize a Pandas DataFrame in the format that best suits it, preceded by a header describing the choice."""
+        import pandas as pd
+
+        if not isinstance(value, pd.DataFrame):
+            raise SerializationError(
+                f"This serializer only works with values of type pd.DataFrame. You are trying to serialize a value of type '{type(value).__name__}'"
+            )
+
+        profile = _profile(value, self._sample_size)
+        format_, compression = self._choose(profile)
+
+        # Converting the DataFrame before writing the header lets us fall back to CSV
+        # if it holds values that Parquet cannot represent after all
+        table = None
+        if format_ == "parquet" and _pyarrow_is_available():
+            import pyarrow as pa
+
+            try:
+                table = pa.Table.from_pandas(value)
+            except pa.ArrowException:
+                format_, compression = self._choose_csv_compression(profile)
+
+        header = {"format": format_, "compression": compression}
+        if format_ == "csv":
+            header.update(_csv_schema(value))
+
+        writer.write(self.MAGIC)
+        writer.write(json.dumps(header).encode("utf-8") + b"\n")
+
+        if table is not None:
+            AsParquet(compression=compression)._write_table(
+                table, CountingWriter(writer)
+            )
+        elif format_ == "parquet":
+            AsParquet(compression=compression).serialize(value, CountingWriter(writer))
+        else:
+            AsCSV(compression=compression).serialize(value, writer)
+
+    def deserialize(self, reader: BinaryIO) -> Any:
+        """Deserialize a DataFrame, using the format and compression recorded in the artifact's header."""
+        if reader.read(len(self.MAGIC)) != self.MAGIC:
+            raise DeserializationError(
+                "The artifact was not produced by the AsAdaptive serializer: its header is missing or corrupted"
+            )
+
+        try:
+            choice = json.loads(reader.readline(self.MAX_HEADER_BYTES).decode("utf-8"))
+            format_ = choice["format"]
+            compression = choice["compression"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise DeserializationError(
+                f"The header of the artifact could not be parsed: {str(e)}"
+            ) from e
+
+        if format_ == "parquet":
+            if reader.seekable():
+                payload: BinaryIO = OffsetReader(reader)  # type: ignore
+            else:
+                payload = io.BytesIO(reader.read())
+
+            return AsParquet(compression=compression).deserialize(payload)
+        elif format_ == "csv":
+            if "columns" not in choice:
+                # Artifacts serialized before the dtypes were recorded
+                return AsCSV(compression=compression).deserialize(reader)
+
+            return _read_csv(reader, compression, choice)
+        else:
+            raise DeserializationError(
+                f"The artifact was serialized with an unsupported format '{format_}'"
+            )
+
+
+def _parquet_engine_is_available() -> bool:
+    return (
+        _pyarrow_is_available() or importlib.util.find_spec("fastparquet") is not None
+    )
+
+
+def _pyarrow_is_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _csv_schema(df) -> dict:
+    """
+    Describe the dtypes of a DataFrame, so that they can be restored once it is parsed from a CSV.
+
+    The values of the columns whose dtype is not trivially preserved (e.g. object columns) are written to and
+    parsed from a CSV, once for each distinct value, to make sure the whole DataFrame can be.
+
+    Raises
+    ------
+    SerializationError
+        If a CSV cannot reproduce the DataFrame.
+    """
+    import pandas as pd
+
+    if (
+        isinstance(df.index, pd.MultiIndex)
+        or not df.columns.is_unique
+        or not all(isinstance(name, str) for name in df.columns)
+    ):
+        raise SerializationError(
+            "The DataFrame can only be serialized as a CSV, which requires a single index and unique column names that are strings"
+        )
+
+    schema: dict = {
+        "index": _dtype_name(df.index.dtype),
+        "columns": {},
+        "categories": {},
+    }
+    unsupported = []
+
+    for name, dtype in df.dtypes.items():
+        schema["columns"][name] = _dtype_name(dtype)
+
+        if isinstance(dtype, pd.CategoricalDtype):
+            if dtype.categories.inferred_type not in [
+                "string",
+                "integer",
+                "floating",
+                "boolean",
+            ]:
+                unsupported.append(name)
+                continue
+
+            schema["categories"][name] = {
+                "categories": dtype.categories.tolist(),
+                "ordered": bool(dtype.ordered),
+            }
+            sample = pd.Series(pd.Categorical(dtype.categories, dtype=dtype))
+        elif _is_preserved_by_csv(dtype):
+            continue
+        else:
+            sample = df[name].drop_duplicates()
+
+        if not _round_trips(
+            pd.DataFrame({name: sample.reset_index(drop=True)}), schema
+        ):
+            unsupported.append(name)
+
+    index = df.index.drop_duplicates()
+    if not _is_preserved_by_csv(index.dtype) and not _round_trips(
+        pd.DataFrame(index=index), schema
+    ):
+        unsupported.append(df.index.name)
+
+    if unsupported:
+        raise SerializationError(
+            f"The DataFrame can only be serialized as a CSV, which cannot reproduce the values of some of its columns (or index): {unsupported}. "
+            "Convert them into a single type that CSV supports (e.g. strings without missing value markers such as '' or 'NA') first"
+        )
+
+    return schema
+
+
+def _dtype_name(dtype) -> str:
+    import pandas as pd
+
+    if isinstance(dtype, pd.StringDtype):
+        return f"string[{dtype.storage}]"
+
+    return str(dtype)
+
+
+def _is_preserved_by_csv(dtype) -> bool:
+    """Return whether values of a (NumPy) dtype are always parsed back unchanged from their text once the dtype is restored."""
+    import numpy as np
+    from pandas.api.types import is_datetime64_any_dtype, is_timedelta64_dtype
+
+    return (
+        (isinstance(dtype, np.dtype) and dtype.kind in "biuf")
+        or is_datetime64_any_dtype(dtype)
+        or is_timedelta64_dtype(dtype)
+    )
+
+
+def _round_trips(df, schema: dict) -> bool:
+    """Return whether a DataFrame made of some values of another one is parsed back unchanged from a CSV, with the schema of the latter."""
+    schema = {**schema, "index": _dtype_name(df.index.dtype)}
+    try:
+        parsed = _read_csv(io.BytesIO(df.to_csv().encode("utf-8")), None, schema)
+    except DeserializationError:
+        return False
+
+    return parsed.equals(df) and parsed.index.equals(df.index)
+
+
+def _read_csv(reader: BinaryIO, compression: Optional[str], schema: dict) -> Any:
+    """Parse a CSV written by DataFrame.to_csv, restoring the dtypes described by its schema (see _csv_schema)."""
+    import pandas as pd
+    from pandas.errors import EmptyDataError, ParserError
+
+    dtypes: dict = {}
+    for name, dtype in schema["columns"].items():
+        if name in schema["categories"]:
+            dtypes[name] = pd.CategoricalDtype(**schema["categories"][name])
+        elif dtype.startswith(("datetime64", "timedelta64")):
+            # The parser does not support these dtypes, so they are converted afterwards
+            dtypes[name] = object
+        else:
+            dtypes[name] = dtype
+
+    try:
+        df = pd.read_csv(
+            reader,
+            index_col=0,
+            compression=compression,
+            dtype=dtypes,
+            # The default converter does not always parse a float into the value it was formatted from
+            float_precision="round_trip",
+        )
+
+        converted = {
+            name: dtype
+            for name, dtype in schema["columns"].items()
+            if name in df.columns and _dtype_name(df[name].dtype) != dtype
+        }
+        if converted:
+            df = df.astype(converted)
+        if _dtype_name(df.index.dtype) != schema["index"]:
+            df.index = df.index.astype(schema["index"])
+    except (
+        EmptyDataError,
+        ParserError,
+        UnicodeDecodeError,
+        TypeError,
+        ValueError,
+    ) as e:
+        raise DeserializationError(e) from e
+
+    return df
+
+
+def _profile(df, sample_size: int) -> dict:
+    """
+    Estimate the in-memory size of a DataFrame and characterize its columns, sampling the values of string columns.
+
+    The types of the values of each object column are inferred from the whole column, since values of a different
+    type may be spread in a way that sampling does not catch (e.g. every other row).
+    """
+    import pandas as pd
+
+    rows = len(df)
+    step = max(1, rows // sample_size)
+
+    estimated_bytes = int(df.memory_usage(index=True, deep=False).sum())
+    high_cardinality_string_bytes = 0
+    mixed_columns = []
+
+    for name, column in df.items():
+        if column.dtype != object:
+            continue
+
+        inferred_type = pd.api.types.infer_dtype(column, skipna=True)
+        if inferred_type.startswith("mixed"):
+            # Columns of lists or dicts are also reported as "mixed", but hold values of a single type
+            if column.dropna().map(type).nunique() > 1:
+                mixed_columns.append(name)
+            continue
+        elif inferred_type != "string":
+            continue
+
+        sample = column.iloc[::step].iloc[:sample_size].dropna()
+        if len(sample) == 0:
+            continue
+
+        average_length = sample.str.len().mean()
+        # The shallow memory usage already accounts for the pointers to the strings
+        column_bytes = int(average_length * rows)
+        estimated_bytes += column_bytes
+
+        if pd.unique(sample).size > len(sample) * AsAdaptive.LOW_CARDINALITY_RATIO:
+            high_cardinality_string_bytes += column_bytes
+
+    return {
+        "rows": rows,
+        "estimated_bytes": estimated_bytes,
+        "high_cardinality_string_bytes": high_cardinality_string_bytes,
+        "mixed_columns": mixed_columns,
+    }
@@ -1,14 +1,33 @@
 """Serialize DataFrames as CSVs."""
 
-from typing import Any, BinaryIO, Optional
+import collections
+import io
+import os
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
 
 from dagger import DeserializationError, SerializationError
 
+from dagger_contrib.serializer._io import local_path
+from dagger_contrib.serializer._strings import STRING_DTYPES, convert_strings
+from dagger_contrib.serializer.inspection import Summary
+
 
 class AsCSV:
     """
     Serializer implementation that uses CSV to serialize Pandas DataFrames.
 
+    With more than one worker, the DataFrame is split into ranges of rows that are formatted
+    (and compressed) concurrently in a pool of processes, and written to the writer in order.
+    Compressed outputs are then made of one compressed member (or stream) per range, which
+    gzip, bz2 and xz decompressors read as a single file.
+
+    Uncompressed CSVs are also deserialized in parallel: the input is split into byte ranges
+    aligned to the start of a record (taking quoted line breaks into account), and each worker
+    parses one range with the header of the file. The types of the columns are inferred from
+    the first range and imposed on the others, so that the result matches a serial parse.
+    If the records of another range do not fit them (e.g. a float in an integer column),
+    the CSV is parsed again as a whole, in the current process.
+
     See Also
     --------
     - https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.to_csv.html
@@ -22,9 +41,18 @@ class AsCSV:
         "xz": "csv.xz",
     }
 
+    # Compression modes whose outputs remain valid when they are concatenated
+    CONCATENABLE_COMPRESSIONS = [None, "gzip", "bz2", "xz"]
+
+    # Inputs are not split into byte ranges smaller than this, since parsing them is dominated by fixed costs
+    MIN_BYTES_PER_RANGE = 8 * 1024 * 1024
+
     def __init__(
         self,
         compression: Optional[str] = None,
+        n_workers: int = 1,
+        rows_per_chunk: int = 500_000,
+        string_dtype: Optional[str] = None,
     ):
         """
         Initialize a serializer that serializes DataFrame values as CSVs.
@@ -33,8 +61,29 @@ class AsCSV:
         ----------
         compression: str, optional
             The compression mode, which may be one of the following values: {"gzip", "bz2", "zip", "xz", None}
+
+        n_workers: int, default=1
+            The number of processes to format (and compress) or parse the CSV with. With a single worker,
+            the DataFrame is processed in the current process. Parallel serialization is not available
+            for the "zip" compression mode, and parallel deserialization is only available for
+            uncompressed CSVs. Other modes fall back to a single worker.
+
+        rows_per_chunk: int, default=500_000
+            The number of rows each worker formats at once when serializing in parallel.
+
+        string_dtype: str, optional
+            The dtype to deserialize string columns into: {None, "pyarrow", "category"}.
+            None keeps the NumPy object columns the parser produces. Otherwise, each of them is
+            converted into "string[pyarrow]" or a categorical column as soon as it is parsed.
         """
+        assert n_workers > 0
+        assert rows_per_chunk > 0
+        assert string_dtype in STRING_DTYPES
+
         self._compression = compression
+        self._n_workers = n_workers
+        self._rows_per_chunk = rows_per_chunk
+        self._string_dtype = string_dtype
 
     def serialize(self, value: Any, writer: BinaryIO):
         """Serialize a Pandas DataFrame as a CSV file."""
@@ -45,7 +94,10 @@ class AsCSV:
                 f"This serializer only works with values of type pd.DataFrame. You are trying to serialize a value of type '{type(value).__name__}'"
             )
 
-        value.to_csv(writer, compression=self._compression)
+        if self._n_workers > 1 and self._compression in self.CONCATENABLE_COMPRESSIONS:
+            self._serialize_in_parallel(value, writer)
+        else:
+            value.to_csv(writer, compression=self._compression)
 
     def deserialize(self, reader: BinaryIO) -> Any:
         """Deserialize a CSV into a DataFrame object."""
@@ -53,7 +105,13 @@ class AsCSV:
         from pandas.errors import EmptyDataError
 
         try:
-            return read_csv(reader, index_col=0, compression=self._compression)
+            if self._n_workers > 1 and self._compression is None:
+                return self._deserialize_in_parallel(reader)
+
+            return convert_strings(
+                read_csv(reader, index_col=0, compression=self._compression),
+                self._string_dtype,
+            )
         except EmptyDataError as e:
             raise DeserializationError(e)
         except UnicodeDecodeError as e:
@@ -61,7 +119,248 @@ class AsCSV:
                 f"We could not deserialize the CSV artifact. This may be happening because the file was originally serialized with a particular compression mode, but you're trying to deserialize it with compression=None. The original error is: {str(e)}"
             ) from e
 
+    def inspect(self, reader: BinaryIO, preview_rows: int = 0) -> Summary:
+        """
+        Summarize a CSV by parsing its header (and optionally its first rows), without parsing the rest of the file.
+
+        Parameters
+        ----------
+        reader: BinaryIO
+            The CSV file.
+
+        preview_rows: int, default=0
+            The number of rows to parse into a DataFrame, as a preview.
+            The types of the columns are inferred from these rows, so they are only reported when there are some.
+
+        Returns
+        -------
+        A summary with the columns of the CSV. Counting its rows would require reading the whole file, so they are not reported.
+        """
+        from pandas import read_csv
+        from pandas.errors import EmptyDataError
+
+        try:
+            preview = read_csv(
+                reader,
+                index_col=0,
+                nrows=preview_rows,
+                compression=self._compression,
+            )
+        except (EmptyDataError, UnicodeDecodeError) as e:
+            raise DeserializationError(e)
+
+        preview = convert_strings(preview, self._string_dtype)
+        return Summary(
+            format="csv",
+            columns=list(preview.columns),
+            dtypes=(
+                {name: str(dtype) for name, dtype in preview.dtypes.items()}
+                if preview_rows > 0
+                else None
+            ),
+            preview=preview if preview_rows > 0 else None,
+        )
+
     @property
     def extension(self) -> str:
         """Extension to use for files generated by this serializer."""
         return self.EXTENSIONS_BY_COMPRESSION.get(self._compression or "", "csv")
+
+    def _serialize_in_parallel(self, value: Any, writer: BinaryIO):
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Bound the number of chunks in flight, so that memory usage does not depend on the size of the DataFrame
+        max_pending = 2 * self._n_workers
+        pending: collections.deque = collections.deque()
+
+        with ProcessPoolExecutor(max_workers=self._n_workers) as pool:
+            for start in range(0, max(len(value), 1), self._rows_per_chunk):
+                pending.append(
+                    pool.submit(
+                        _format_chunk,
+                        value.iloc[start : start + self._rows_per_chunk],
+                        start == 0,
+                        self._compression,
+                    )
+                )
+
+                if len(pending) >= max_pending:
+                    writer.write(pending.popleft().result())
+
+            while pending:
+                writer.write(pending.popleft().result())
+
+    def _deserialize_in_parallel(self, reader: BinaryIO) -> Any:
+        import mmap
+        from concurrent.futures import ProcessPoolExecutor
+
+        import pandas as pd
+
+        # Workers read their ranges straight from local files, instead of receiving a copy of them
+        path = local_path(reader)
+        source: Union[str, bytes] = path if path is not None else reader.read()
+        size = os.path.getsize(path) if path is not None else len(source)
+
+        whole = reader if path is not None else io.BytesIO(source)  # type: ignore
+        n_ranges = min(self._n_workers, size // self.MIN_BYTES_PER_RANGE)
+        if n_ranges < 2:
+            return convert_strings(pd.read_csv(whole, index_col=0), self._string_dtype)
+
+        if path is not None:
+            with open(path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    header, ranges = _record_ranges(data, n_ranges)
+        else:
+            header, ranges = _record_ranges(source, n_ranges)
+
+        # The types of the first range are applied to the others (by position, since the index may be unnamed)
+        start, end = ranges[0]
+        first_df = _parse_range(
+            source if path is not None else source[start:end], header, start, end
+        )
+        dtype = dict(enumerate([first_df.index.dtype, *first_df.dtypes]))
+
+        with ProcessPoolExecutor(max_workers=self._n_workers) as pool:
+            futures = [
+                pool.submit(
+                    _parse_range,
+                    source if path is not None else source[start:end],
+                    header,
+                    start,
+                    end,
+                    self._string_dtype,
+                    dtype,
+                )
+                for start, end in ranges[1:]
+            ]
+            try:
+                dfs = [convert_strings(first_df, self._string_dtype)] + [
+                    future.result() for future in futures
+                ]
+            except (ValueError, OverflowError):
+                # Some records do not fit the types of the first range
+                pool.shutdown(wait=False, cancel_futures=True)
+                return convert_strings(
+                    pd.read_csv(whole, index_col=0), self._string_dtype
+                )
+
+        if self._string_dtype == "category":
+            # Categoricals are concatenated into objects unless they share their categories
+            from pandas.api.types import union_categoricals
+
+            for name in dfs[0].columns:
+                if not all(
+                    isinstance(df[name].dtype, pd.CategoricalDtype) for df in dfs
+                ):
+                    continue
+
+                categories = union_categoricals([df[name] for df in dfs]).categories
+                for df in dfs:
+                    df[name] = df[name].cat.set_categories(categories)
+
+        return pd.concat(dfs, copy=False)
+
+
+def _record_ranges(data: Any, n_ranges: int) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Split the records of a CSV into (at most) 'n_ranges' byte ranges of a similar size.
+
+    Ranges always start at the beginning of a record. A line break only ends a record if it is
+    preceded by an even number of quotes (escaped quotes are doubled, so they don't alter the parity).
+
+    Returns
+    -------
+    A tuple with the header line of the CSV and the list of (start, end) offsets of each range.
+    """
+    size = len(data)
+    header_end, _ = _record_end(data, 0, 0)
+    boundaries = [header_end]
+
+    position, quotes = header_end, 0
+    for i in range(1, n_ranges):
+        target = header_end + (size - header_end) * i // n_ranges
+        if target <= position:
+            continue
+
+        quotes += _count_quotes(data, position, target)
+        position, quotes = _record_end(data, target, quotes)
+        if position >= size:
+            break
+
+        boundaries.append(position)
+
+    boundaries.append(size)
+    return bytes(data[:header_end]), list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _record_end(data: Any, position: int, quotes: int) -> Tuple[int, int]:
+    """
+    Find the end of the record that 'position' falls in, given the number of quotes that precede it.
+
+    Returns
+    -------
+    A tuple with the offset that follows the line break ending the record (or the size of the data),
+    and the number of quotes that precede that offset.
+    """
+    size = len(data)
+    while position < size:
+        newline = data.find(b"\n", position)
+        newline = size - 1 if newline == -1 else newline
+        quotes += _count_quotes(data, position, newline)
+        position = newline + 1
+        if quotes % 2 == 0:
+            break
+
+    return position, quotes
+
+
+def _count_quotes(
+    data: Any, start: int, end: int, block_size: int = 64 * 1024 * 1024
+) -> int:
+    # Count in blocks, so that slicing memory-mapped files does not copy whole ranges in memory
+    return sum(
+        data[block : min(block + block_size, end)].count(b'"')
+        for block in range(start, end, block_size)
+    )
+
+
+def _parse_range(
+    source: Union[str, bytes],
+    header: bytes,
+    start: int,
+    end: int,
+    string_dtype: Optional[str] = None,
+    dtype: Optional[Dict[int, Any]] = None,
+) -> Any:
+    """Parse a range of records from a CSV file (or the records themselves) with the given header line (and column types)."""
+    import pandas as pd
+
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            f.seek(start)
+            source = f.read(end - start)
+
+    return convert_strings(
+        pd.read_csv(io.BytesIO(header + source), index_col=0, dtype=dtype),
+        string_dtype,
+    )
+
+
+def _format_chunk(chunk: Any, header: bool, compression: Optional[str]) -> bytes:
+    """Format a range of rows as CSV (only the first one includes the header), compressing it as a standalone member."""
+    data = chunk.to_csv(header=header).encode("utf-8")
+
+    if compression == "gzip":
+        import gzip
+
+        return gzip.compress(data, mtime=0)
+    elif compression == "bz2":
+        import bz2
+
+        return bz2.compress(data)
+    elif compression == "xz":
+        import lzma
+
+        return lzma.compress(data, format=lzma.FORMAT_XZ)
+
+    return data
@@ -1,18 +1,37 @@
 """Serialize DataFrames as Parquet files (https://parquet.apache.org/)."""
 
-from typing import Any, BinaryIO, Optional
+import importlib.util
+from typing import Any, BinaryIO, Iterator, List, Optional, Union
 
-from dagger import SerializationError
+from dagger import DeserializationError, SerializationError
+
+from dagger_contrib.serializer._io import local_path
+from dagger_contrib.serializer._parquet import data_columns, pandas_range_index
+from dagger_contrib.serializer._strings import STRING_DTYPES, arrow_to_pandas_kwargs
+from dagger_contrib.serializer.inspection import Summary
 
 
 class AsParquet:
     """
     Serializer implementation that uses Parquet to serialize Pandas DataFrames.
 
+    When the engine is (or resolves to) "pyarrow", DataFrames are converted to and from
+    Arrow tables directly, which exposes pyarrow's tuning settings. Reads from local files
+    are memory-mapped and multithreaded by default.
+
+    With a memory budget, deserialization first estimates the in-memory size of the DataFrame
+    from the footer of the Parquet file, and only loads it eagerly if the estimate fits the budget.
+    Otherwise, it fails fast or returns an out-of-core alternative over the same file.
+
+    String columns are deserialized as NumPy object columns by default, which hold a Python object per value.
+    With a string dtype, they are built straight from the Arrow buffers into a more compact representation instead.
+
     See Also
     --------
     - https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.to_parquet.html
     - https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.read_parquet.html
+    - https://arrow.apache.org/docs/python/generated/pyarrow.parquet.write_table.html
+    - https://arrow.apache.org/docs/python/generated/pyarrow.parquet.read_table.html
     - https://parquet.apache.org/
     """
 
@@ -22,10 +41,25 @@ class AsParquet:
         "brotli": "parquet.br",
     }
 
+    OVER_BUDGET_STRATEGIES = ["raise", "chunks", "dask"]
+
+    # Estimated in-memory size of each Python object (e.g. str) pandas creates for variable-width values,
+    # on top of the 8-byte pointer that references it.
+    PYTHON_OBJECT_OVERHEAD = 50
+
     def __init__(
         self,
         engine: str = "auto",
         compression: Optional[str] = "snappy",
+        use_threads: bool = True,
+        memory_map: bool = True,
+        pre_buffer: bool = True,
+        use_dictionary: Union[bool, List[str]] = True,
+        row_group_size: Optional[int] = None,
+        data_page_size: Optional[int] = None,
+        memory_budget: Optional[int] = None,
+        over_budget: str = "raise",
+        string_dtype: Optional[str] = None,
     ):
         """
         Initialize a serializer that serializes DataFrame values using the Parquet format.
@@ -37,12 +71,61 @@ class AsParquet:
 
         compression: str, optional, default="snappy"
             The compression mode, which may be one of the following values: {"snappy", "gzip", "brotli", None}
+
+        use_threads: bool, default=True
+            Whether to convert and decode columns in parallel using multiple threads (pyarrow only).
+
+        memory_map: bool, default=True
+            Whether to memory-map the file when deserializing from a reader backed by a local file (pyarrow only).
+
+        pre_buffer: bool, default=True
+            Whether to coalesce and issue column chunk reads in parallel when deserializing (pyarrow only).
+
+        use_dictionary: bool or list of str, default=True
+            Whether to use dictionary encoding for all columns, or the names of the columns to use it for (pyarrow only).
+
+        row_group_size: int, optional
+            The maximum number of rows in each row group (pyarrow only).
+
+        data_page_size: int, optional
+            The target size, in bytes, of each encoded data page within a column chunk (pyarrow only).
+
+        memory_budget: int, optional
+            The maximum number of bytes the deserialized DataFrame should take in memory (pyarrow only,
+            so the "auto" engine requires pyarrow to be installed).
+            The size is estimated from the footer of the Parquet file before the data is read.
+
+        over_budget: str, default="raise"
+            What to do when the estimated size of the DataFrame goes over the memory budget:
+            - "raise" fails fast with a DeserializationError.
+            - "chunks" returns an iterator of DataFrames, each of them taking at most half the budget.
+            - "dask" returns a Dask DataFrame with a partition per row group. It requires the reader to be backed by a local file,
+              which is memory-mapped, so the DataFrame can still be computed after the file is removed.
+
+        string_dtype: str, optional
+            The dtype to deserialize string columns into (pyarrow only, like memory_budget):
+            - None produces NumPy object columns.
+            - "pyarrow" produces "string[pyarrow]" columns, which keep the values in Arrow buffers.
+            - "category" produces categorical columns, which suit columns with few distinct values.
         """
+        assert over_budget in self.OVER_BUDGET_STRATEGIES
+        assert string_dtype in STRING_DTYPES
         self._engine = engine
+        assert memory_budget is None or self._uses_pyarrow()
+        assert string_dtype is None or self._uses_pyarrow()
         self._compression = compression
+        self._use_threads = use_threads
+        self._memory_map = memory_map
+        self._pre_buffer = pre_buffer
+        self._use_dictionary = use_dictionary
+        self._row_group_size = row_group_size
+        self._data_page_size = data_page_size
+        self._memory_budget = memory_budget
+        self._over_budget = over_budget
+        self._string_dtype = string_dtype
 
     def serialize(self, value: Any, writer: BinaryIO):
-        """Serialize a Pandas DataFrame as a CSV file."""
+        """Serialize a Pandas DataFrame as a Parquet file."""
         import pandas as pd
 
         if not isinstance(value, pd.DataFrame):
@@ -50,15 +133,293 @@ class AsParquet:
                 f"This serializer only works with values of type pd.DataFrame. You are trying to serialize a value of type '{type(value).__name__}'"
             )
 
-        value.to_parquet(writer, engine=self._engine, compression=self._compression)
+        if not self._uses_pyarrow():
+            value.to_parquet(writer, engine=self._engine, compression=self._compression)
+            return
+
+        import pyarrow as pa
+
+        try:
+            table = pa.Table.from_pandas(
+                value,
+                nthreads=None if self._use_threads else 1,
+            )
+        except pa.ArrowException as e:
+            raise SerializationError(e)
+
+        self._write_table(table, writer)
+
+    def _write_table(self, table: Any, writer: BinaryIO):
+        """Write an Arrow Table converted from a DataFrame as a Parquet file (pyarrow only)."""
+        import pyarrow.parquet as pq
+
+        pq.write_table(
+            table,
+            writer,
+            compression=self._compression,
+            use_dictionary=self._use_dictionary,
+            row_group_size=self._row_group_size,
+            data_page_size=self._data_page_size,
+        )
 
     def deserialize(self, reader: BinaryIO) -> Any:
         """Deserialize a Parquet file into a DataFrame object."""
-        import pandas as pd
+        if not self._uses_pyarrow():
+            import pandas as pd
+
+            return pd.read_parquet(reader, engine=self._engine)
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Reading from the path lets pyarrow use native (and optionally memory-mapped) I/O
+        path = local_path(reader)
+
+        if self._memory_budget is not None:
+            try:
+                metadata = pq.read_metadata(path or reader)
+            except pa.ArrowException as e:
+                raise DeserializationError(e)
+
+            estimated_memory = _estimate_memory(metadata, self._string_dtype)
+            if estimated_memory > self._memory_budget:
+                return self._deserialize_over_budget(
+                    reader, path, metadata, estimated_memory
+                )
+
+        try:
+            table = pq.read_table(
+                path or reader,
+                use_threads=self._use_threads,
+                memory_map=self._memory_map and path is not None,
+                pre_buffer=self._pre_buffer,
+            )
+        except pa.ArrowException as e:
+            raise DeserializationError(e)
+
+        return table.to_pandas(
+            use_threads=self._use_threads,
+            **arrow_to_pandas_kwargs(self._string_dtype),
+        )
+
+    def inspect(self, reader: BinaryIO, preview_rows: int = 0) -> Summary:
+        """
+        Summarize a Parquet file by reading its footer (and optionally its first rows), without reading the rest of the data (pyarrow only).
+
+        Parameters
+        ----------
+        reader: BinaryIO
+            The Parquet file.
+
+        preview_rows: int, default=0
+            The number of rows to read from the beginning of the file into a DataFrame, as a preview.
+
+        Returns
+        -------
+        A summary with the number of rows, the columns and their (Arrow) types, and the number of rows of each row group.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = local_path(reader)
+
+        try:
+            parquet_file = pq.ParquetFile(
+                path or reader,
+                memory_map=self._memory_map and path is not None,
+            )
+            metadata = parquet_file.metadata
+            schema = parquet_file.schema_arrow
+
+            preview = None
+            if preview_rows > 0:
+                batch = next(parquet_file.iter_batches(batch_size=preview_rows), None)
+                table = (
+                    pa.Table.from_batches([batch], schema=schema)
+                    if batch is not None
+                    else schema.empty_table()
+                )
+                preview = table.to_pandas(
+                    use_threads=self._use_threads,
+                    **arrow_to_pandas_kwargs(self._string_dtype),
+                )
+        except pa.ArrowException as e:
+            raise DeserializationError(e)
 
-        return pd.read_parquet(reader, engine=self._engine)
+        columns = data_columns(schema)
+        return Summary(
+            format="parquet",
+            rows=metadata.num_rows,
+            memory_usage=_estimate_memory(metadata, self._string_dtype),
+            columns=columns,
+            dtypes={name: str(schema.field(name).type) for name in columns},
+            partitions=metadata.num_row_groups,
+            partition_rows=[
+                metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)
+            ],
+            preview=preview,
+        )
 
     @property
     def extension(self) -> str:
         """Extension to use for files generated by this serializer."""
         return self.EXTENSIONS_BY_COMPRESSION.get(self._compression or "", "parquet")
+
+    def _deserialize_over_budget(
+        self,
+        reader: BinaryIO,
+        path: Optional[str],
+        metadata: Any,
+        estimated_memory: int,
+    ) -> Any:
+        message = f"The DataFrame is estimated to take {estimated_memory} bytes in memory, which goes over the memory budget of {self._memory_budget} bytes"
+
+        if self._over_budget == "raise":
+            raise DeserializationError(
+                f"{message}. Use over_budget='chunks' or over_budget='dask' to load it out-of-core"
+            )
+        elif self._over_budget == "dask":
+            if path is None:
+                raise DeserializationError(
+                    f"{message}, and it cannot be loaded as a Dask DataFrame because the artifact is not backed by a local file"
+                )
+
+            from dagger_contrib.serializer.dask.dataframe.as_parquet import (
+                read_parquet_file,
+            )
+
+            return read_parquet_file(path, string_dtype=self._string_dtype)
+
+        bytes_per_row = estimated_memory / max(metadata.num_rows, 1)
+        batch_size = max(1, int(self._memory_budget // 2 // max(bytes_per_row, 1)))
+
+        import pyarrow as pa
+
+        # The reader is closed as soon as this method returns, so the iterator must read from
+        # its own copy of the file: a memory map of it, which stays valid after it is removed, or its bytes.
+        if path is not None:
+            with pa.memory_map(path) as f:
+                buffer = f.read_buffer()
+        else:
+            reader.seek(0)
+            buffer = pa.py_buffer(reader.read())
+
+        return _iterate_chunks(
+            buffer, batch_size, self._use_threads, self._string_dtype
+        )
+
+    def _uses_pyarrow(self) -> bool:
+        if self._engine == "pyarrow":
+            return True
+
+        return (
+            self._engine == "auto" and importlib.util.find_spec("pyarrow") is not None
+        )
+
+
+def _estimate_memory(metadata: Any, string_dtype: Optional[str] = None) -> int:
+    """
+    Estimate the size a Parquet file takes in memory once it is loaded into a Pandas DataFrame, from the metadata in its footer.
+
+    Fixed-width columns take their width for each row. Variable-width columns (e.g. strings) are
+    estimated conservatively, as if each value was a distinct Python object, unless they are strings
+    loaded with a string dtype, which keeps the values in a buffer next to an offset per row.
+    The values of dictionary-encoded column chunks take far more space once decoded than in the file,
+    so they are estimated from the length of the largest of their extremes (see _variable_width_bytes).
+    """
+    rows = metadata.num_rows
+    estimate = 0
+
+    for i in range(metadata.num_columns):
+        column = metadata.schema.column(i)
+        width = _PHYSICAL_TYPE_WIDTHS.get(column.physical_type)
+        if column.physical_type == "FIXED_LEN_BYTE_ARRAY":
+            width = column.length
+
+        if width is not None:
+            estimate += rows * width
+        else:
+            per_row = 8
+            if string_dtype is None or column.logical_type.type != "STRING":
+                per_row += AsParquet.PYTHON_OBJECT_OVERHEAD
+
+            estimate += _variable_width_bytes(metadata, i) + rows * per_row
+
+    return estimate
+
+
+def _variable_width_bytes(metadata: Any, i: int) -> int:
+    """Estimate the size of the values of a variable-width column once they are decoded."""
+    total = 0
+    for rg in range(metadata.num_row_groups):
+        row_group = metadata.row_group(rg)
+        chunk = row_group.column(i)
+        size = chunk.total_uncompressed_size
+
+        # Dictionary-encoded pages only hold the index of each value, whose (decoded) length is
+        # not recorded anywhere else. The statistics give the length of two of the values, though.
+        statistics = chunk.statistics
+        if (
+            chunk.has_dictionary_page
+            and statistics is not None
+            and statistics.has_min_max
+        ):
+            length = max(_length(statistics.min), _length(statistics.max))
+            size = max(size, length * row_group.num_rows)
+
+        total += size
+
+    return total
+
+
+def _length(value: Any) -> int:
+    return len(value.encode("utf-8")) if isinstance(value, str) else len(value)
+
+
+# In-memory width of the values of each fixed-width physical type of Parquet, in bytes
+_PHYSICAL_TYPE_WIDTHS = {
+    "BOOLEAN": 1,
+    "INT32": 4,
+    "FLOAT": 4,
+    "INT64": 8,
+    "DOUBLE": 8,
+    # Legacy timestamps, which are loaded as datetime64[ns]
+    "INT96": 8,
+}
+
+
+def _iterate_chunks(
+    buffer: Any,
+    batch_size: int,
+    use_threads: bool,
+    string_dtype: Optional[str] = None,
+) -> Iterator[Any]:
+    """
+    Yield the rows of a Parquet file held in an Arrow buffer as a series of DataFrames of (at most) 'batch_size' rows.
+
+    The file is only opened once the first chunk is requested, so an iterator that is never consumed holds no open file.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    with pa.BufferReader(buffer) as source:
+        parquet_file = pq.ParquetFile(source)
+        schema = parquet_file.schema_arrow
+        range_index = pandas_range_index(schema)
+
+        offset = 0
+        for batch in parquet_file.iter_batches(
+            batch_size=batch_size,
+            use_threads=use_threads,
+        ):
+            df = pa.Table.from_batches([batch], schema=schema).to_pandas(
+                use_threads=use_threads,
+                **arrow_to_pandas_kwargs(string_dtype),
+            )
+
+            # A RangeIndex is only stored as metadata, so each chunk would otherwise start from the beginning
+            if range_index is not None:
+                df.index = range_index[offset : offset + len(df)]
+            offset += len(df)
+
+            yield df
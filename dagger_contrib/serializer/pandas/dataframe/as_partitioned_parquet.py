@@ -0,0 +1,204 @@
+"""Serialize DataFrames as Hive-partitioned Parquet datasets (https://arrow.apache.org/docs/python/parquet.html#partitioned-datasets-multiple-files)."""
+
+import itertools
+import os
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, List, Optional
+from urllib.parse import quote
+
+from dagger import DeserializationError, SerializationError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dagger import Serializer
+
+
+class AsPartitionedParquet:
+    """
+    Serializer implementation that serializes Pandas DataFrames as a Hive-partitioned Parquet dataset.
+
+    The DataFrame is split into a directory per distinct value of the partition columns
+    (e.g. "day=2021-01-01/segment=b/"), which is then packaged by a path serializer.
+    When deserializing, only the partitions that match the configured filters are read.
+    If the path serializer can narrow down the files it extracts (e.g. AsTar or AsZip), the equality
+    conditions of the filters on partition columns are also turned into glob patterns (e.g. "day=2021-01-01/*"),
+    so that the rest of the partitions are not even extracted. Otherwise, the whole archive is extracted first.
+
+    The schema of the DataFrame is stored in a "_common_metadata" file next to the partitions,
+    so that reading a subset of them does not require opening any other file, and so that
+    partition columns are restored with their original types. Rows are grouped by partition,
+    so the original row order is not preserved, but each row keeps its index label (the index
+    is always stored as a column, even when it is a RangeIndex).
+
+    See Also
+    --------
+    - https://arrow.apache.org/docs/python/generated/pyarrow.parquet.write_to_dataset.html
+    - https://arrow.apache.org/docs/python/generated/pyarrow.parquet.read_table.html
+    """
+
+    COMMON_METADATA_FILENAME = "_common_metadata"
+
+    def __init__(
+        self,
+        path_serializer: "Serializer",
+        partition_cols: List[str],
+        filters: Optional[List[Any]] = None,
+        compression: Optional[str] = "snappy",
+    ):
+        """
+        Initialize a serializer that serializes DataFrame values as partitioned Parquet datasets.
+
+        Parameters
+        ----------
+        path_serializer: Serializer
+            A Serializer implementation that works with path names pointing to a file or a directory in the local filesystem.
+            Any serializer in dagger_contrib.path.* should be compatible (e.g. AsTar)
+
+        partition_cols: list of str
+            The names of the columns to partition the dataset by, in order.
+
+        filters: list, optional
+            Only read the partitions (and rows) that match these filters when deserializing.
+            Filters are expressed in disjunctive normal form, e.g. [("day", "=", "2021-01-01")] or
+            [[("segment", "in", ["a", "b"])], [("day", ">", "2021-01-01")]].
+            Partitions are only left out of the extraction when every conjunction has an "=" or "in"
+            condition with string or integer values on a partition column.
+            See https://arrow.apache.org/docs/python/generated/pyarrow.parquet.read_table.html
+
+        compression: str, optional, default="snappy"
+            The compression mode for each Parquet file, which may be one of the following values: {"snappy", "gzip", "brotli", None}
+        """
+        assert len(partition_cols) > 0
+
+        self._path_serializer = path_serializer
+        self._partition_cols = partition_cols
+        self._filters = filters
+        self._compression = compression
+
+    def serialize(self, value: Any, writer: BinaryIO):
+        """Serialize a Pandas DataFrame as a partitioned Parquet dataset packaged by the provided path serializer."""
+        import tempfile
+
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not isinstance(value, pd.DataFrame):
+            raise SerializationError(
+                f"This serializer only works with values of type pd.DataFrame. You are trying to serialize a value of type '{type(value).__name__}'"
+            )
+
+        missing_cols = [col for col in self._partition_cols if col not in value.columns]
+        if missing_cols:
+            raise SerializationError(
+                f"The DataFrame does not contain the partition columns {missing_cols}"
+            )
+
+        try:
+            table = pa.Table.from_pandas(value, preserve_index=True)
+        except pa.ArrowException as e:
+            raise SerializationError(e)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            pq.write_to_dataset(
+                table,
+                tmp,
+                partition_cols=self._partition_cols,
+                compression=self._compression,
+            )
+            pq.write_metadata(
+                table.schema,
+                os.path.join(tmp, self.COMMON_METADATA_FILENAME),
+            )
+            self._path_serializer.serialize(tmp, writer)
+
+    def deserialize(self, reader: BinaryIO) -> Any:
+        """Deserialize the partitions of the dataset that match the configured filters into a Pandas DataFrame."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path_serializer = self._path_serializer
+        patterns = self._partition_patterns()
+        if patterns is not None and hasattr(path_serializer, "narrow"):
+            path_serializer = path_serializer.narrow(
+                patterns + [self.COMMON_METADATA_FILENAME]
+            )
+
+        path = path_serializer.deserialize(reader)
+
+        try:
+            common_metadata = os.path.join(path, self.COMMON_METADATA_FILENAME)
+            schema = (
+                pq.read_schema(common_metadata)
+                if os.path.isfile(common_metadata)
+                else None
+            )
+
+            table = pq.read_table(
+                path,
+                schema=schema,
+                filters=self._filters,
+                partitioning="hive",
+            )
+        except (pa.ArrowException, OSError, ValueError) as e:
+            raise DeserializationError(e)
+
+        return table.to_pandas()
+
+    def _partition_patterns(self) -> Optional[List[str]]:
+        """
+        Return glob patterns matching the files of every partition that may match the filters, or None if any partition may.
+
+        The patterns are built from the "=" and "in" conditions on partition columns, escaping their values
+        the way pyarrow names the directories of a Hive-partitioned dataset. Other conditions, and values
+        of other types, whose directory names may differ from the values, are left to pyarrow.
+        """
+        if not isinstance(self._filters, list) or not self._filters:
+            return None
+
+        conjunctions = (
+            [self._filters] if isinstance(self._filters[0], tuple) else self._filters
+        )
+
+        patterns = []
+        for conjunction in conjunctions:
+            values: Dict[str, List[str]] = {}
+            for column, operator, value in conjunction:
+                if column not in self._partition_cols or column in values:
+                    continue
+
+                if operator in ["=", "=="]:
+                    candidates = [value]
+                elif operator == "in":
+                    candidates = list(value)
+                else:
+                    continue
+
+                if all(
+                    isinstance(candidate, (str, int))
+                    and not isinstance(candidate, bool)
+                    for candidate in candidates
+                ):
+                    values[column] = [
+                        f"{column}={quote(str(candidate), safe='')}"
+                        for candidate in candidates
+                    ]
+
+            if not values:
+                return None
+
+            # Each level of directories is either constrained to some values, or may be anything
+            last_level = max(self._partition_cols.index(column) for column in values)
+            levels = [
+                values.get(column, ["*"])
+                for column in self._partition_cols[: last_level + 1]
+            ]
+            patterns += [
+                "/".join(directories) + "/*"
+                for directories in itertools.product(*levels)
+            ]
+
+        return patterns
+
+    @property
+    def extension(self) -> str:
+        """Extension to use for files generated by this serializer."""
+        return self._path_serializer.extension
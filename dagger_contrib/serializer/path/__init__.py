@@ -1,4 +1,23 @@
 """Collection of serializers for local directories or files."""
 
-from dagger_contrib.serializer.path.as_tar import AsTar  # noqa
-from dagger_contrib.serializer.path.as_zip import AsZip  # noqa
+from typing import TYPE_CHECKING
+
+from dagger_contrib.serializer._lazy import lazy_exports
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dagger_contrib.serializer.path.as_tar import AsTar  # noqa
+    from dagger_contrib.serializer.path.as_zip import AsZip  # noqa
+    from dagger_contrib.serializer.path.extraction_space import (  # noqa
+        ExtractionSpace,
+    )
+
+__all__ = ["AsTar", "AsZip", "ExtractionSpace"]
+
+__getattr__, __dir__ = lazy_exports(
+    globals(),
+    {
+        "AsTar": "dagger_contrib.serializer.path.as_tar:AsTar",
+        "AsZip": "dagger_contrib.serializer.path.as_zip:AsZip",
+        "ExtractionSpace": "dagger_contrib.serializer.path.extraction_space:ExtractionSpace",
+    },
+)
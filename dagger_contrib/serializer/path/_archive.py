@@ -0,0 +1,145 @@
+"""Helpers shared by the serializers that package paths into archives."""
+
+import fnmatch
+import hashlib
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Set
+
+from dagger import DeserializationError
+
+
+def relative_name(member_name: str) -> str:
+    """
+    Return the name of an archive member relative to the path that was serialized.
+
+    Directories are archived under their own basename (e.g. "dir/sub/file"), so the first
+    component is dropped ("sub/file"). Single files are archived under their basename,
+    which is returned unchanged.
+    """
+    member_name = member_name.rstrip("/")
+    if "/" not in member_name:
+        return member_name
+
+    return member_name.split("/", 1)[1]
+
+
+def selected(
+    member_name: str,
+    include: Optional[List[str]],
+    exclude: Optional[List[str]],
+    narrowing: Sequence[List[str]] = (),
+) -> bool:
+    """
+    Return whether an archive member matches any of the 'include' glob patterns (if any) and none of the 'exclude' ones.
+
+    Patterns are matched against the name of the member relative to the path that was serialized
+    (see relative_name). As with fnmatch, "*" also matches "/", so "*.parquet" selects Parquet files at any depth.
+    The member must also match one of the patterns of each list in 'narrowing' (see AsTar.narrow).
+    """
+    name = relative_name(member_name)
+    for patterns in [include, *narrowing]:
+        if patterns is not None and not any(
+            fnmatch.fnmatchcase(name, pattern) for pattern in patterns
+        ):
+            return False
+
+    return not any(fnmatch.fnmatchcase(name, pattern) for pattern in exclude or [])
+
+
+def safe_name(member_name: str, links: Set[str]) -> str:
+    """
+    Return the normalized name of an archive member, making sure it cannot be extracted outside of the output directory.
+
+    Names are resolved lexically, without a syscall per member. That is only sound as long as they
+    do not go through any of the symbolic 'links' extracted from the same archive, since those
+    may point anywhere, so such names are rejected as well.
+
+    Raises
+    ------
+    DeserializationError
+        If the name is absolute, or if it escapes (or may escape) the output directory.
+    """
+    if member_name.startswith("/") or os.path.isabs(member_name):
+        raise DeserializationError(
+            f"The archive contains a member with an absolute path: '{member_name}'"
+        )
+
+    parts = []
+    for component in member_name.split("/"):
+        if component in ["", "."]:
+            continue
+
+        if parts and "/".join(parts) in links:
+            raise DeserializationError(
+                f"The archive contains a member that goes through a symbolic link: '{member_name}'"
+            )
+
+        if component == "..":
+            if not parts:
+                raise DeserializationError(
+                    f"The archive contains a member outside of the output directory: '{member_name}'"
+                )
+            parts.pop()
+        else:
+            parts.append(component)
+
+    return "/".join(parts)
+
+
+class DirectoryCache:
+    """Create the directories files are extracted into, with a single syscall per directory no matter how many threads extract files into it."""
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._created: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def create(self, path: str):
+        """Create a directory (and its parents) unless it was already created."""
+        if path in self._created:
+            return
+
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            self._created.add(path)
+
+
+class Deduplicator:
+    """
+    Find the files whose contents are identical to those of a file seen before.
+
+    Files are compared by their SHA-256 digest, but only files whose size matches that of a
+    previous file are hashed, so directories without duplicates are (almost) not read twice.
+    """
+
+    def __init__(self):
+        """Initialize a deduplicator that has not seen any file."""
+        # Files seen so far, by size, as lists of [path, name, digest (computed lazily)]
+        self._files_by_size: Dict[int, List[list]] = {}
+
+    def original(self, path: str, name: str) -> Optional[str]:
+        """Return the name of a file seen before with the same contents as 'path', or remember 'path' under 'name' and return None."""
+        candidates = self._files_by_size.setdefault(os.path.getsize(path), [])
+
+        digest = None
+        if candidates:
+            digest = _digest(path)
+            for candidate in candidates:
+                if candidate[2] is None:
+                    candidate[2] = _digest(candidate[0])
+
+                if candidate[2] == digest:
+                    return candidate[1]
+
+        candidates.append([path, name, digest])
+        return None
+
+
+def _digest(path: str) -> bytes:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+    return digest.digest()
@@ -1,14 +1,53 @@
 """Serializer implementation that packages and unpackages paths (files or directories) in the local filesystem using compressed tarfiles."""
 
+import collections
+import gzip
+import io
+import json
 import os
+import posixpath
+import shutil
+import struct
 import tarfile
-from typing import Any, BinaryIO, Optional
+import zlib
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 from dagger import DeserializationError
 
+from dagger_contrib.serializer._io import OffsetReader, RangeReader
+from dagger_contrib.serializer.inspection import Member, Summary
+from dagger_contrib.serializer.path._archive import (
+    Deduplicator,
+    DirectoryCache,
+    relative_name,
+    safe_name,
+    selected,
+)
+from dagger_contrib.serializer.path.extraction_space import (
+    ExtractionSpace,
+    managed_output_dir,
+)
+
 
 class AsTar:
-    """Serializer implementation that packages and unpackages paths (files or directories) in the local filesystem using compressed tarfiles."""
+    """
+    Serializer implementation that packages and unpackages paths (files or directories) in the local filesystem using compressed tarfiles.
+
+    With more than one worker, the tarfile is still decompressed by a single (reader) thread,
+    but writing each file, creating directories and restoring their metadata is dispatched to a pool
+    of threads. This pays off for archives with many small files, whose extraction is dominated by
+    the latency of those syscalls.
+
+    Members are only extracted inside the output directory. Archives with absolute names, names that
+    go up the directory tree, links that point outside of it, or special files (e.g. devices) are rejected.
+
+    With an index, each member is compressed as an independent gzip member (or left uncompressed),
+    and the offsets of the files are appended to the archive, after the end of the tarfile.
+    The result is still a valid tarfile, but single files can be read straight from their offset.
+
+    With deduplication, files whose contents are identical to those of a file archived before are
+    stored as hard links to it, so their data is only compressed and stored once.
+    """
 
     EXTENSIONS_BY_COMPRESSION = {
         "gzip": "tar.gz",
@@ -23,48 +62,611 @@ class AsTar:
         "": "",
     }
 
-    def __init__(self, output_dir: str, compression: Optional[str] = "gzip"):
+    # Files are read into memory by the reader thread and written by the pool, up to this many bytes at a time
+    MAX_BUFFERED_BYTES = 64 * 1024 * 1024
+
+    # Compression modes that can be split into independently compressed blocks, which an index can point to
+    INDEXABLE_COMPRESSIONS = [None, "gzip"]
+
+    # Identifies the trailer that points to the index, at the very end of the archive
+    INDEX_MAGIC = b"TARINDEX"
+
+    def __init__(
+        self,
+        output_dir: Union[str, ExtractionSpace],
+        compression: Optional[str] = "gzip",
+        n_workers: int = 1,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        index: bool = False,
+        dedup: bool = False,
+    ):
         """
         Initialize an instance of the serializer.
 
         Parameters
         ----------
-        output_dir: str
+        output_dir: str or ExtractionSpace
             The path to a local directory we can extract the directory into.
+            With an ExtractionSpace, each archive is extracted into a new directory managed by the space,
+            which is leased to the current process until it releases the deserialized path.
 
         compression: str, optional, default="gzip"
             The compression algorithm to use. When None, the file will be uncompressed.
             Accepted values are {"gzip", "bz2", "xz", None}.
+
+        n_workers: int, default=1
+            The number of threads to write the extracted files with. With a single worker,
+            members are extracted one at a time by the thread that decompresses the tarfile.
+
+        include: list of str, optional
+            Only extract the files (and links) whose name, relative to the serialized directory, matches one of
+            these glob patterns (e.g. ["*.parquet"]). Directories are always extracted. The data of the rest of
+            the members is skipped: uncompressed archives read from a seekable stream seek past it, while
+            compressed ones still decompress it, but none of it is written to disk.
+
+        exclude: list of str, optional
+            Do not extract the files (and links) whose name matches one of these glob patterns (e.g. ["logs/*"]).
+
+        index: bool, default=False
+            Whether to write an index with the offset of each file, so that 'open_member' can read it
+            without going through the rest of the archive. Only available without compression or with "gzip".
+            Compressing each member independently makes archives of many small files slightly larger.
+
+        dedup: bool, default=False
+            Whether to store files with the same contents as a previous file as hard links to it.
+            They are extracted as hard links too. When copies are extracted but the file they link to is
+            left out by 'include'/'exclude', the archive is read a second time (which requires a seekable reader)
+            to extract the data of that file into the first copy. The rest of the copies are linked to it.
         """
         assert compression is None or compression in ["gzip", "bz2", "xz"]
+        assert n_workers > 0
+        assert not index or compression in self.INDEXABLE_COMPRESSIONS
 
         self._output_dir = output_dir
         self._compression = compression
+        self._n_workers = n_workers
+        self._index = index
+        self._include = include
+        self._exclude = exclude
+        self._narrowing: List[List[str]] = []
+        self._dedup = dedup
 
     def serialize(self, value: Any, writer: BinaryIO):
         """Serialize 'value', which is expected to be a path to the local filesystem, as a compressed tar file written to 'writer'."""
+        if self._index:
+            self._serialize_with_index(value, writer)
+            return
+
         with tarfile.open(
             fileobj=writer,
             mode=f"w|{self.MODE_BY_COMPRESSION[self._compression or '']}",
         ) as tar:
-            tar.add(value, arcname=os.path.basename(value))
+            if not self._dedup:
+                tar.add(value, arcname=os.path.basename(value))
+                return
+
+            deduplicator = Deduplicator()
+            for path, arcname in _walk(value, os.path.basename(value)):
+                _add_member(tar, path, arcname, deduplicator)
 
     def deserialize(self, reader: BinaryIO) -> Any:
         """Extract a tarfile into the output directory the serializer was initialized with."""
+        # Random access mode seeks past the data of the members that are not extracted, instead of reading it
+        mode = "r:" if reader.seekable() and self._compression is None else "r|"
+        position = reader.tell() if reader.seekable() else None
+
+        # Hard links whose target is not extracted, by the name of their target
+        unresolved_links: Dict[str, List[Tuple[tarfile.TarInfo, str]]] = {}
+
+        with managed_output_dir(self._output_dir) as output_dir:
+            try:
+                with self._open(reader, mode) as tar:
+                    if self._n_workers > 1:
+                        self._extract_in_parallel(tar, output_dir, unresolved_links)
+                    else:
+                        tar.extractall(
+                            path=output_dir,
+                            members=(
+                                member
+                                for member, _ in self._selected_members(
+                                    tar, unresolved_links
+                                )
+                            ),
+                        )
+
+                    tar_members = tar.getnames()
+
+                if unresolved_links:
+                    self._resolve_links(reader, position, output_dir, unresolved_links)
+
+                return os.path.join(output_dir, tar_members[0])
+
+            except _READ_ERRORS as e:
+                raise DeserializationError(e)
+
+    def inspect(self, reader: BinaryIO) -> Summary:
+        """List the members of a tarfile from their headers, without extracting them."""
+        # Random access mode skips over the data of each member, instead of reading it
+        mode = "r:" if reader.seekable() else "r|"
+
         try:
-            with tarfile.open(
-                fileobj=reader,
-                mode=f"r|{self.MODE_BY_COMPRESSION[self._compression or '']}",
-            ) as tar:
-                tar.extractall(path=self._output_dir)
+            with self._open(reader, mode) as tar:
+                members = [Member(m.name, m.size, m.isdir()) for m in tar]
+        except _READ_ERRORS as e:
+            raise DeserializationError(e)
+
+        return Summary(format="tar", members=members)
 
-                tar_members = tar.getnames()
-                return os.path.join(self._output_dir, tar_members[0])
+    def read_member(self, reader: BinaryIO, name: str) -> bytes:
+        """
+        Read a single file from a tarfile, without extracting the rest.
+
+        The name of the file must be relative to the directory that was serialized.
+        Members are read in order, so files at the beginning of the archive are cheaper to read,
+        unless the archive has an index and 'reader' is seekable, in which case the file is read straight from its offset.
+        """
+        index = self._read_index(reader)
+        if index is not None:
+            with self._open_indexed_member(reader, index, name) as member:
+                return member.read()
+
+        position = reader.tell() if reader.seekable() else None
+        link_target = None
 
-        except tarfile.TarError as e:
+        try:
+            with self._open(reader, "r|") as tar:
+                for member in tar:
+                    if relative_name(member.name) != name:
+                        continue
+
+                    if member.isfile():
+                        return tar.extractfile(member).read()  # type: ignore
+                    elif member.islnk():
+                        link_target = relative_name(member.linkname)
+                        break
+        except _READ_ERRORS as e:
             raise DeserializationError(e)
 
+        # Hard links (e.g. deduplicated files) point to a member that has already been read past
+        if link_target is not None and position is not None:
+            reader.seek(position)
+            return self.read_member(reader, link_target)
+
+        raise KeyError(name)
+
+    def open_member(self, reader: BinaryIO, name: str) -> BinaryIO:
+        """
+        Open a single file of an archive serialized with an index, seeking straight to its offset.
+
+        Parameters
+        ----------
+        reader: BinaryIO
+            A seekable stream over the archive. It must remain open while the file is read.
+
+        name: str
+            The name of the file, relative to the directory that was serialized.
+
+        Returns
+        -------
+        A seekable, read-only file-like object over the contents of the file.
+
+        Raises
+        ------
+        KeyError
+            If the archive does not contain the file.
+
+        DeserializationError
+            If the archive does not have an index, or 'reader' is not seekable.
+        """
+        index = self._read_index(reader)
+        if index is None:
+            raise DeserializationError(
+                "Members can only be opened from seekable streams over archives serialized with index=True"
+            )
+
+        return self._open_indexed_member(reader, index, name)
+
+    def narrow(self, include: List[str]) -> "AsTar":
+        """
+        Return a copy of the serializer that only extracts the files matching one of the 'include' glob patterns, on top of its own.
+
+        Serializers that package a directory with a known layout (e.g. a partitioned dataset) use it
+        to extract only the files they are going to read.
+        """
+        import copy
+
+        narrowed = copy.copy(self)
+        narrowed._narrowing = self._narrowing + [include]
+        return narrowed
+
     @property
     def extension(self) -> str:
         """Extension to use for files generated by this serializer."""
         return self.EXTENSIONS_BY_COMPRESSION.get(self._compression or "", "tar")
+
+    def _open(self, reader: BinaryIO, mode: str) -> tarfile.TarFile:
+        if self._compression == "gzip":
+            # Indexed archives are made of many gzip members, but tarfile's own stream decompressor stops after the first one
+            return tarfile.open(
+                fileobj=gzip.GzipFile(fileobj=reader, mode="rb"),  # type: ignore
+                mode=mode,
+            )
+
+        return tarfile.open(
+            fileobj=reader,
+            mode=f"{mode}{self.MODE_BY_COMPRESSION[self._compression or '']}",
+        )
+
+    def _serialize_with_index(self, value: Any, writer: BinaryIO):
+        blocks = _BlockWriter(writer, self._compression)
+        deduplicator = Deduplicator() if self._dedup else None
+        files: Dict[str, List[int]] = {}
+
+        with tarfile.open(fileobj=blocks, mode="w") as tar:  # type: ignore
+            # Adding one member at a time (in the same order as tar.add) lets us start a block for each of them
+            for path, arcname in _walk(value, os.path.basename(value)):
+                block_offset = blocks.start_block()
+                header_offset = tar.offset
+                if not _add_member(tar, path, arcname, deduplicator):
+                    continue
+
+                member = tar.members[-1]
+                if member.isreg():
+                    data_size = tarfile.BLOCKSIZE * -(-member.size // tarfile.BLOCKSIZE)
+                    header_size = tar.offset - header_offset - data_size
+                    files[member.name] = [block_offset, header_size, member.size]
+                elif member.islnk() and member.linkname in files:
+                    files[member.name] = files[member.linkname]
+
+            # The end-of-archive marker is written when the tarfile is closed
+            blocks.start_block()
+
+        index_offset = blocks.start_block()
+        blocks.write(json.dumps({"files": files}).encode("utf-8"))
+        blocks.end_block()
+        writer.write(_index_trailer(index_offset, self._compression))
+
+    def _read_index(self, reader: BinaryIO) -> Optional[dict]:
+        """Read the index at the end of the archive, if it has one, leaving the reader at its original position."""
+        if (
+            self._compression not in self.INDEXABLE_COMPRESSIONS
+            or not reader.seekable()
+        ):
+            return None
+
+        view = OffsetReader(reader)
+        trailer_size = len(_index_trailer(0, self._compression))
+
+        try:
+            end = view.seek(0, io.SEEK_END)
+            if end < trailer_size:
+                return None
+
+            view.seek(end - trailer_size)
+            trailer = _decompress(view.read(trailer_size), self._compression)
+            if len(trailer) != 16 or not trailer.startswith(self.INDEX_MAGIC):
+                return None
+
+            (index_offset,) = struct.unpack("<Q", trailer[8:])
+            view.seek(index_offset)
+            return json.loads(
+                _decompress(
+                    view.read(end - trailer_size - index_offset), self._compression
+                )
+            )
+        except (OSError, EOFError, zlib.error, ValueError, struct.error):
+            return None
+        finally:
+            view.seek(0)
+
+    def _open_indexed_member(
+        self, reader: BinaryIO, index: dict, name: str
+    ) -> BinaryIO:
+        for member_name, (block_offset, header_size, size) in index["files"].items():
+            if relative_name(member_name) == name:
+                break
+        else:
+            raise KeyError(name)
+
+        # Offsets are relative to the start of the archive, where reading the index left the reader
+        reader.seek(block_offset, io.SEEK_CUR)
+        block: BinaryIO = OffsetReader(reader)  # type: ignore
+        if self._compression == "gzip":
+            block = gzip.GzipFile(fileobj=block, mode="rb")  # type: ignore
+
+        return RangeReader(block, header_size, size)  # type: ignore
+
+    def _selected_members(
+        self,
+        tar: tarfile.TarFile,
+        unresolved_links: Dict[str, List[Tuple[tarfile.TarInfo, str]]],
+    ) -> Iterator[Tuple[tarfile.TarInfo, str]]:
+        """Yield the members to extract, except for hard links to files that are not extracted, which are added to 'unresolved_links' instead."""
+        extracted: Set[str] = set()
+
+        for member, name in _safe_members(tar):
+            if not (
+                member.isdir()
+                or selected(member.name, self._include, self._exclude, self._narrowing)
+            ):
+                continue
+
+            if member.islnk():
+                target = safe_name(member.linkname, set())
+                if target not in extracted:
+                    unresolved_links.setdefault(target, []).append((member, name))
+                    continue
+
+            if member.isfile() or member.islnk():
+                extracted.add(name)
+
+            yield member, name
+
+    def _resolve_links(
+        self,
+        reader: BinaryIO,
+        position: Optional[int],
+        output_dir: str,
+        unresolved_links: Dict[str, List[Tuple[tarfile.TarInfo, str]]],
+    ):
+        """
+        Extract hard links whose target was left out, reading the archive a second time.
+
+        The data of each target is written into the first of its links, and the rest of them are linked to it.
+        Only the directories that receive those files are modified, so their metadata is restored afterwards.
+        """
+        if position is None:
+            target, links = next(iter(unresolved_links.items()))
+            raise DeserializationError(
+                f"The archive contains a hard link to a file that is not extracted: '{links[0][0].name}' -> '{target}'. "
+                "Extracting it requires a seekable reader"
+            )
+
+        reader.seek(position)
+        mode = "r:" if self._compression is None else "r|"
+        with self._open(reader, mode) as tar:
+            for member, name in _safe_members(tar):
+                if name not in unresolved_links or not member.isfile():
+                    continue
+
+                (first, first_name), *copies = unresolved_links.pop(name)
+                paths = [os.path.join(output_dir, first_name)] + [
+                    os.path.join(output_dir, copy_name) for _, copy_name in copies
+                ]
+                directories = {os.path.dirname(path) for path in paths}
+                directory_times = {
+                    directory: os.stat(directory) for directory in directories
+                }
+
+                with open(paths[0], "wb") as f:
+                    shutil.copyfileobj(tar.extractfile(member), f)  # type: ignore
+                _restore_metadata(first, paths[0])
+
+                for path in paths[1:]:
+                    if os.path.lexists(path):
+                        os.unlink(path)
+                    os.link(paths[0], path)
+
+                for directory, stat in directory_times.items():
+                    os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+                if not unresolved_links:
+                    return
+
+        target, links = next(iter(unresolved_links.items()))
+        raise DeserializationError(
+            f"The archive contains a hard link to a file that does not exist: '{links[0][0].name}' -> '{target}'"
+        )
+
+    def _extract_in_parallel(
+        self,
+        tar: tarfile.TarFile,
+        output_dir: str,
+        unresolved_links: Dict[str, List[Tuple[tarfile.TarInfo, str]]],
+    ):
+        from concurrent.futures import ThreadPoolExecutor
+
+        directories = DirectoryCache()
+        deferred_directories: List[Tuple[tarfile.TarInfo, str]] = []
+        links: List[Tuple[tarfile.TarInfo, str]] = []
+
+        # Bound the size of the files in flight, so that memory usage does not depend on the size of the archive
+        pending: collections.deque = collections.deque()
+        pending_bytes = 0
+
+        with ThreadPoolExecutor(max_workers=self._n_workers) as pool:
+            for member, name in self._selected_members(tar, unresolved_links):
+                path = os.path.join(output_dir, name)
+
+                if member.isdir():
+                    pending.append((pool.submit(directories.create, path), 0))
+                    deferred_directories.append((member, path))
+                elif member.issym() or member.islnk():
+                    # Links are created once their targets have been extracted
+                    links.append((member, path))
+                elif member.size > self.MAX_BUFFERED_BYTES:
+                    directories.create(os.path.dirname(path))
+                    with open(path, "wb") as f:
+                        shutil.copyfileobj(tar.extractfile(member), f)  # type: ignore
+                    _restore_metadata(member, path)
+                else:
+                    data = tar.extractfile(member).read()  # type: ignore
+                    pending.append(
+                        (
+                            pool.submit(_write_file, member, path, data, directories),
+                            len(data),
+                        )
+                    )
+                    pending_bytes += len(data)
+
+                while pending_bytes > self.MAX_BUFFERED_BYTES:
+                    future, size = pending.popleft()
+                    future.result()
+                    pending_bytes -= size
+
+            for future, _ in pending:
+                future.result()
+
+            for member, path in links:
+                directories.create(os.path.dirname(path))
+                if os.path.lexists(path):
+                    os.unlink(path)
+
+                if member.issym():
+                    os.symlink(member.linkname, path)
+                    continue
+
+                os.link(
+                    os.path.join(output_dir, safe_name(member.linkname, set())), path
+                )
+
+            # Writing files into a directory updates its modification time, so it must be restored last
+            for future in [
+                pool.submit(_restore_metadata, member, path)
+                for member, path in deferred_directories
+            ]:
+                future.result()
+
+
+class _BlockWriter(io.RawIOBase):
+    """Writer that compresses the data written to it as a series of independent gzip members (blocks), or leaves it uncompressed."""
+
+    def __init__(self, writer: BinaryIO, compression: Optional[str]):
+        self._writer = writer
+        self._compression = compression
+        self._compressor: Any = None
+        self._written = 0
+        self._offset = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        size = memoryview(data).nbytes
+        self._written += size
+
+        if self._compression is None:
+            self._emit(data)
+            return size
+
+        if self._compressor is None:
+            # The same settings tarfile uses to compress whole archives
+            self._compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+        self._emit(self._compressor.compress(data))
+        return size
+
+    def tell(self) -> int:
+        return self._written
+
+    def start_block(self) -> int:
+        """End the current block and return the offset (in the underlying writer) at which the next one starts."""
+        self.end_block()
+        return self._offset
+
+    def end_block(self):
+        if self._compressor is not None:
+            self._emit(self._compressor.flush())
+            self._compressor = None
+
+    def _emit(self, data):
+        self._writer.write(data)
+        self._offset += memoryview(data).nbytes
+
+
+def _index_trailer(index_offset: int, compression: Optional[str]) -> bytes:
+    """Build the fixed-size trailer that points to the index, which must be a valid (gzip) block of its own."""
+    trailer = AsTar.INDEX_MAGIC + struct.pack("<Q", index_offset)
+    if compression is None:
+        return trailer
+
+    # Without compression, the size of the block does not depend on its contents
+    return gzip.compress(trailer, compresslevel=0, mtime=0)
+
+
+def _decompress(data: bytes, compression: Optional[str]) -> bytes:
+    return data if compression is None else gzip.decompress(data)
+
+
+def _add_member(
+    tar: tarfile.TarFile,
+    path: str,
+    arcname: str,
+    deduplicator: Optional[Deduplicator],
+) -> bool:
+    """Add a single path to a tarfile (as a hard link if it duplicates a previous file) and return whether it was added."""
+    tarinfo = tar.gettarinfo(path, arcname)
+    if tarinfo is None:
+        # Unsupported types of files (e.g. sockets) are skipped, as tar.add does
+        return False
+
+    if not tarinfo.isreg():
+        tar.addfile(tarinfo)
+        return True
+
+    original = deduplicator.original(path, arcname) if deduplicator else None
+    if original is not None:
+        tarinfo.type = tarfile.LNKTYPE
+        tarinfo.linkname = original
+        tarinfo.size = 0
+        tar.addfile(tarinfo)
+        return True
+
+    with open(path, "rb") as f:
+        tar.addfile(tarinfo, f)
+
+    return True
+
+
+def _walk(path: str, arcname: str) -> Iterator[Tuple[str, str]]:
+    """Yield the paths under 'path' along with their names in the archive, in the same order tar.add adds them."""
+    yield path, arcname
+
+    if os.path.isdir(path) and not os.path.islink(path):
+        for name in sorted(os.listdir(path)):
+            yield from _walk(os.path.join(path, name), os.path.join(arcname, name))
+
+
+# Errors raised when the archive (or its compression) is invalid
+_READ_ERRORS = (tarfile.TarError, gzip.BadGzipFile, EOFError, zlib.error)
+
+
+def _safe_members(tar: tarfile.TarFile) -> Iterator[Tuple[tarfile.TarInfo, str]]:
+    """Yield the members of a tarfile along with their normalized names, making sure none of them can be extracted outside of the output directory."""
+    links: Set[str] = set()
+
+    for member in tar:
+        name = safe_name(member.name, links)
+
+        if member.issym():
+            if posixpath.isabs(member.linkname):
+                raise DeserializationError(
+                    f"The archive contains a symbolic link to an absolute path: '{member.name}' -> '{member.linkname}'"
+                )
+
+            safe_name(posixpath.join(posixpath.dirname(name), member.linkname), links)
+            links.add(name)
+        elif member.islnk():
+            safe_name(member.linkname, links)
+        elif not (member.isfile() or member.isdir()):
+            raise DeserializationError(
+                f"The archive contains a special file, which is not supported: '{member.name}'"
+            )
+
+        yield member, name
+
+
+def _write_file(
+    member: tarfile.TarInfo, path: str, data: bytes, directories: DirectoryCache
+):
+    directories.create(os.path.dirname(path))
+    with open(path, "wb") as f:
+        f.write(data)
+
+    _restore_metadata(member, path)
+
+
+def _restore_metadata(member: tarfile.TarInfo, path: str):
+    os.chmod(path, member.mode)
+    os.utime(path, (member.mtime, member.mtime))
@@ -1,14 +1,43 @@
 """Serializer implementation that packages and unpackages paths (files or directories) in the local filesystem using compressed zip files."""
 
+import io
+import json
 import os
+import shutil
+import threading
 import zipfile
-from typing import Any, BinaryIO, List, Optional
+from typing import Any, BinaryIO, Dict, List, Optional, Union
 
 from dagger import DeserializationError
 
+from dagger_contrib.serializer.inspection import Member, Summary
+from dagger_contrib.serializer.path._archive import (
+    Deduplicator,
+    DirectoryCache,
+    relative_name,
+    safe_name,
+    selected,
+)
+from dagger_contrib.serializer.path.extraction_space import (
+    ExtractionSpace,
+    managed_output_dir,
+)
+
 
 class AsZip:
-    """Serializer implementation that packages and unpackages paths (files or directories) in the local filesystem using compressed zip files."""
+    """
+    Serializer implementation that packages and unpackages paths (files or directories) in the local filesystem using compressed zip files.
+
+    With more than one worker, members are decompressed and written by a pool of threads.
+    Each member of a zip file is compressed independently, so they can be extracted in any order.
+
+    Members are only extracted inside the output directory. Archives with absolute names or
+    names that go up the directory tree are rejected.
+
+    With deduplication, files whose contents are identical to those of a file archived before are
+    not stored again. Instead, a manifest member maps each of them to the original, and they are
+    recreated from it when the archive is extracted.
+    """
 
     EXTENSIONS_BY_COMPRESSION = {
         "bz2": "zip.bz2",
@@ -24,19 +53,28 @@ class AsZip:
         "stored": zipfile.ZIP_STORED,
     }
 
+    # Name of the member that maps each deduplicated file to the file it duplicates
+    DEDUP_MANIFEST = "__dedup_manifest__.json"
+
     def __init__(
         self,
-        output_dir: str,
+        output_dir: Union[str, ExtractionSpace],
         compression: str = "deflated",
         compression_level: Optional[int] = None,
+        n_workers: int = 1,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        dedup: bool = False,
     ):
         """
         Initialize an instance of the serializer.
 
         Parameters
         ----------
-        output_dir: str
+        output_dir: str or ExtractionSpace
             The path to a local directory we can extract the directory into.
+            With an ExtractionSpace, each archive is extracted into a new directory managed by the space,
+            which is leased to the current process until it releases the deserialized path.
 
         compression: str, default="deflated"
             The compression algorithm to use.
@@ -45,12 +83,34 @@ class AsZip:
         compression_level: int, optional
             The compression level to use for the serialized zip file.
             See: https://docs.python.org/3/library/zipfile.html#zipfile.ZipFile
+
+        n_workers: int, default=1
+            The number of threads to decompress and write the extracted files with.
+
+        include: list of str, optional
+            Only extract the files whose name, relative to the serialized directory, matches one of these
+            glob patterns (e.g. ["*.parquet"]). Directories are always extracted. The rest of the members
+            are skipped through the central directory, without reading or decompressing them.
+
+        exclude: list of str, optional
+            Do not extract the files whose name matches one of these glob patterns (e.g. ["logs/*"]).
+
+        dedup: bool, default=False
+            Whether to store files with the same contents as a previous file only once. Their copies
+            are extracted as hard links to the original, or as regular copies if the filesystem does
+            not support hard links. Zip tools other than this serializer only extract the originals.
         """
         assert compression in self.COMPRESSION_CONSTANTS.keys()
+        assert n_workers > 0
 
         self._output_dir = output_dir
         self._compression = compression
         self._compression_level = compression_level
+        self._n_workers = n_workers
+        self._include = include
+        self._exclude = exclude
+        self._narrowing: List[List[str]] = []
+        self._dedup = dedup
 
     def serialize(self, value: Any, writer: BinaryIO):
         """Serialize 'value', which is expected to be a path to the local filesystem, as a compressed zip file written to 'writer'."""
@@ -60,41 +120,216 @@ class AsZip:
             compression=self.COMPRESSION_CONSTANTS[self._compression],
             compresslevel=self._compression_level,
         ) as zip_:
-            _add_path_to_zip(zip_, value)
+            copies = _add_path_to_zip(
+                zip_, value, Deduplicator() if self._dedup else None
+            )
+            if copies:
+                zip_.writestr(self.DEDUP_MANIFEST, json.dumps(copies))
 
     def deserialize(self, reader: BinaryIO) -> Any:
         """Extract a zip file into the output directory the serializer was initialized with."""
+        with managed_output_dir(self._output_dir) as output_dir:
+            try:
+                with zipfile.ZipFile(reader) as zip_:
+                    return self._extract(zip_, output_dir)
+            except zipfile.BadZipFile as e:
+                raise DeserializationError(e)
+
+    def inspect(self, reader: BinaryIO) -> Summary:
+        """List the members of a zip file from its central directory, without extracting them."""
         try:
-            with zipfile.ZipFile(reader) as zip_:
-                zip_.extractall(path=self._output_dir)
+            with zipfile.ZipFile(_seekable(reader)) as zip_:
+                members = [
+                    Member(info.filename, info.file_size, info.is_dir())
+                    for info in zip_.infolist()
+                    if info.filename != self.DEDUP_MANIFEST
+                ]
+                members += [
+                    Member(copy, zip_.getinfo(original).file_size)
+                    for copy, original in self._read_manifest(zip_).items()
+                ]
+        except zipfile.BadZipFile as e:
+            raise DeserializationError(e)
 
-                return os.path.join(
-                    self._output_dir,
-                    _find_base_dir(zip_.namelist()),
-                )
+        return Summary(format="zip", members=members)
 
+    def read_member(self, reader: BinaryIO, name: str) -> bytes:
+        """
+        Read a single file from a zip file, seeking straight to it through the central directory.
+
+        The name of the file must be relative to the directory that was serialized.
+        """
+        try:
+            with zipfile.ZipFile(_seekable(reader)) as zip_:
+                for info in zip_.infolist():
+                    if not info.is_dir() and relative_name(info.filename) == name:
+                        return zip_.read(info)
+
+                for copy, original in self._read_manifest(zip_).items():
+                    if relative_name(copy) == name:
+                        return zip_.read(original)
         except zipfile.BadZipFile as e:
             raise DeserializationError(e)
 
+        raise KeyError(name)
+
+    def narrow(self, include: List[str]) -> "AsZip":
+        """
+        Return a copy of the serializer that only extracts the files matching one of the 'include' glob patterns, on top of its own.
+
+        Serializers that package a directory with a known layout (e.g. a partitioned dataset) use it
+        to extract only the files they are going to read.
+        """
+        import copy
+
+        narrowed = copy.copy(self)
+        narrowed._narrowing = self._narrowing + [include]
+        return narrowed
+
     @property
     def extension(self) -> str:
         """Extension to use for files generated by this serializer."""
         return self.EXTENSIONS_BY_COMPRESSION[self._compression]
 
+    def _read_manifest(self, zip_: zipfile.ZipFile) -> Dict[str, str]:
+        try:
+            return json.loads(zip_.read(self.DEDUP_MANIFEST))
+        except KeyError:
+            return {}
+
+    def _extract(self, zip_: zipfile.ZipFile, output_dir: str) -> str:
+        copies = self._read_manifest(zip_)
+        infos = [
+            info for info in zip_.infolist() if info.filename != self.DEDUP_MANIFEST
+        ]
+        for name in [info.filename for info in infos] + list(copies):
+            safe_name(name, set())
+
+        members = [
+            info
+            for info in infos
+            if info.is_dir()
+            or selected(info.filename, self._include, self._exclude, self._narrowing)
+        ]
+
+        if self._n_workers > 1:
+            self._extract_in_parallel(zip_, members, output_dir)
+        else:
+            zip_.extractall(path=output_dir, members=members)
+
+        extracted = {info.filename for info in members}
+        for copy, original in copies.items():
+            if selected(copy, self._include, self._exclude, self._narrowing):
+                self._restore_copy(
+                    zip_, output_dir, copy, original, original in extracted
+                )
+
+        return os.path.join(
+            output_dir,
+            _find_base_dir([info.filename for info in infos]),
+        )
+
+    def _restore_copy(
+        self,
+        zip_: zipfile.ZipFile,
+        output_dir: str,
+        copy: str,
+        original: str,
+        extracted: bool,
+    ):
+        path = os.path.join(output_dir, safe_name(copy, set()))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if extracted:
+            original_path = os.path.join(output_dir, safe_name(original, set()))
+            try:
+                os.link(original_path, path)
+                return
+            except OSError:
+                pass
+
+        # The original may have been left out of the extraction, but it can still be read from the archive
+        with zip_.open(original) as source, open(path, "wb") as f:
+            shutil.copyfileobj(source, f)
+
+    def _extract_in_parallel(
+        self, zip_: zipfile.ZipFile, members: List[zipfile.ZipInfo], output_dir: str
+    ):
+        from concurrent.futures import ThreadPoolExecutor
+
+        directories = DirectoryCache()
+        lock = threading.Lock()
+
+        with ThreadPoolExecutor(max_workers=self._n_workers) as pool:
+            futures = [
+                pool.submit(
+                    _extract_member,
+                    zip_,
+                    info,
+                    os.path.join(output_dir, safe_name(info.filename, set())),
+                    directories,
+                    lock,
+                )
+                for info in members
+            ]
+            for future in futures:
+                future.result()
+
+
+def _extract_member(
+    zip_: zipfile.ZipFile,
+    info: zipfile.ZipInfo,
+    path: str,
+    directories: DirectoryCache,
+    lock: threading.Lock,
+):
+    if info.is_dir():
+        directories.create(path)
+        return
+
+    directories.create(os.path.dirname(path))
+
+    # Members read from the shared file under its own lock, and decompress outside of it,
+    # but opening a member updates the state of the ZipFile
+    with lock:
+        source = zip_.open(info)
+
+    with source, open(path, "wb") as f:
+        shutil.copyfileobj(source, f)
+
+
+def _seekable(reader: BinaryIO) -> BinaryIO:
+    # Zip files are read from the end (where the central directory is)
+    return reader if reader.seekable() else io.BytesIO(reader.read())
+
+
+def _add_path_to_zip(
+    zip_file, path, deduplicator: Optional[Deduplicator] = None
+) -> Dict[str, str]:
+    """Add a file or a directory to a zip file, returning the files that were not stored because they duplicate another one (mapped to the latter)."""
+    copies: Dict[str, str] = {}
 
-def _add_path_to_zip(zip_file, path):
     if os.path.isfile(path):
         zip_file.write(path, arcname=os.path.basename(path))
     else:
         for root, dirs, filenames in os.walk(path):
             for fname in filenames:
-                zip_file.write(
+                arcname = os.path.relpath(
                     os.path.join(root, fname),
-                    arcname=os.path.relpath(
-                        os.path.join(root, fname),
-                        os.path.join(path, ".."),
-                    ),
+                    os.path.join(path, ".."),
+                ).replace(os.sep, "/")
+
+                original = (
+                    deduplicator.original(os.path.join(root, fname), arcname)
+                    if deduplicator
+                    else None
                 )
+                if original is not None:
+                    copies[arcname] = original
+                else:
+                    zip_file.write(os.path.join(root, fname), arcname=arcname)
+
+    return copies
 
 
 def _find_base_dir(paths: List[str]) -> str:
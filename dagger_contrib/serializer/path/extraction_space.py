@@ -0,0 +1,329 @@
+"""A local directory that path serializers extract archives into, capped in size and cleaned up automatically."""
+
+import contextlib
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import IO, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+
+class ExtractionSpace:
+    """
+    Directory that holds the extractions of AsTar and AsZip, evicting the least recently used ones to stay under a size cap.
+
+    Each extraction lives in its own subdirectory of the root directory, and is leased to the processes
+    using it. The process that deserializes an archive holds a lease on its extraction until it calls
+    'release' with the deserialized path, or until it exits. Other processes may 'retain' an extraction
+    to share it. Extractions with live leases are never evicted, even if that means going over the cap.
+
+    Each lease is a file in the extraction, which the process holding the lease keeps open and locked
+    (with flock). The kernel drops the lock when the process exits, so the leases of processes that
+    died without releasing them are ignored, no matter which PID namespace (e.g. container) they ran in.
+    Leases are reference counted: every 'retain' takes a new one, and every 'release' gives one up.
+    All the bookkeeping happens under an exclusive lock on a file in the root directory, so a space
+    can be shared by every process on a host (but not across hosts, e.g. over NFS).
+
+    Usage
+    -----
+    >>> space = ExtractionSpace("/mnt/scratch/dagger", max_bytes=50 * 1024**3)
+    >>> serializer = AsTar(output_dir=space)
+    >>> path = serializer.deserialize(reader)
+    >>> ...
+    >>> space.release(path)
+    """
+
+    LOCK_FILE = ".lock"
+    LEASES_DIR = "leases"
+    SIZE_FILE = "size"
+    DATA_DIR = "data"
+    EVICTED_SUFFIX = ".evicted"
+
+    def __init__(self, root: str, max_bytes: int):
+        """
+        Initialize a space rooted at a local directory, creating it if it does not exist.
+
+        Parameters
+        ----------
+        root: str
+            The path to a local directory dedicated to the space. Any other content will be evicted.
+
+        max_bytes: int
+            The maximum number of bytes the files of all the extractions may take. Hard links
+            (e.g. the files deduplicated by AsTar and AsZip) are only counted once.
+        """
+        assert max_bytes > 0
+
+        self._root = os.path.abspath(root)
+        self._max_bytes = max_bytes
+        os.makedirs(self._root, exist_ok=True)
+
+    @property
+    def root(self) -> str:
+        """Directory the extractions are stored in."""
+        return self._root
+
+    @contextlib.contextmanager
+    def extraction(self) -> Iterator[str]:
+        """
+        Create an empty directory to extract an archive into, leased to the current process.
+
+        When the extraction finishes, its size is recorded and the least recently used extractions
+        are evicted if the space went over its cap. If it fails, the directory is removed.
+        """
+        entry = os.path.join(self._root, uuid.uuid4().hex)
+        with self._locked():
+            os.makedirs(os.path.join(entry, self.DATA_DIR))
+            os.makedirs(os.path.join(entry, self.LEASES_DIR))
+            self._add_lease(entry)
+
+        try:
+            yield os.path.join(entry, self.DATA_DIR)
+        except BaseException:
+            with self._locked():
+                _close_leases(entry)
+                trash = self._discard(entry)
+
+            _remove([(trash, 0)])
+            raise
+
+        with self._locked():
+            _write(os.path.join(entry, self.SIZE_FILE), str(self._size(entry)))
+            evicted = self._evict()
+
+        _remove(evicted)
+
+    def retain(self, path: str):
+        """Take a lease on the extraction that contains 'path' for the current process, so that it is not evicted."""
+        with self._locked():
+            entry = self._entry(path)
+            if not os.path.isdir(os.path.join(entry, self.LEASES_DIR)):
+                raise FileNotFoundError(path)
+
+            self._add_lease(entry)
+
+    def release(self, path: str):
+        """
+        Give up a lease of the current process on the extraction that contains 'path', which may then be evicted.
+
+        Raises
+        ------
+        ValueError
+            If the current process does not hold any lease on the extraction (e.g. it released all of them already).
+        """
+        with self._locked():
+            entry = self._entry(path)
+            with _leases_lock:
+                leases = _leases.get(entry)
+                if not leases:
+                    raise ValueError(
+                        f"The current process does not hold any lease on the extraction of '{path}'"
+                    )
+
+                lease = leases.pop()
+                if not leases:
+                    del _leases[entry]
+
+            os.unlink(lease.name)
+            lease.close()
+            _touch(entry)
+            evicted = self._evict()
+
+        _remove(evicted)
+
+    def collect(self) -> int:
+        """
+        Evict the least recently used extractions until the space is under its cap, and return the number of bytes freed.
+
+        It also finishes removing the extractions that were evicted by processes that died before removing them.
+        """
+        with self._locked():
+            evicted = [
+                (os.path.join(self._root, name), 0)
+                for name in os.listdir(self._root)
+                if name.endswith(self.EVICTED_SUFFIX)
+            ]
+            evicted += self._evict()
+
+        _remove(evicted)
+        return sum(size for _, size in evicted)
+
+    def usage(self) -> int:
+        """Return the number of bytes the extractions take, including those in progress."""
+        with self._locked():
+            return sum(size for _, size, _ in self._entries())
+
+    def _entry(self, path: str) -> str:
+        relative_path = os.path.relpath(os.path.abspath(path), self._root)
+        name = relative_path.split(os.sep, 1)[0]
+        if name in ["", os.curdir, os.pardir, self.LOCK_FILE]:
+            raise ValueError(f"'{path}' is not inside the extraction space")
+
+        return os.path.join(self._root, name)
+
+    def _add_lease(self, entry: str):
+        import fcntl
+
+        lease = open(os.path.join(entry, self.LEASES_DIR, uuid.uuid4().hex), "w")
+        fcntl.flock(lease, fcntl.LOCK_SH)
+        with _leases_lock:
+            _leases.setdefault(entry, []).append(lease)
+
+        _touch(entry)
+
+    def _is_leased(self, entry: str) -> bool:
+        """Return whether any process holds a lease on an extraction, removing the leases of processes that exited."""
+        import fcntl
+
+        leases = os.path.join(entry, self.LEASES_DIR)
+        try:
+            names = os.listdir(leases)
+        except FileNotFoundError:
+            return False
+
+        leased = False
+        for name in names:
+            with open(os.path.join(leases, name), "a") as f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    leased = True
+                    continue
+
+                # Nobody holds the lock anymore
+                os.unlink(os.path.join(leases, name))
+
+        return leased
+
+    def _entries(self) -> List[Tuple[str, int, float]]:
+        """Return the path, size and last use time of every extraction."""
+        entries = []
+        for name in os.listdir(self._root):
+            if name == self.LOCK_FILE or name.endswith(self.EVICTED_SUFFIX):
+                continue
+
+            entry = os.path.join(self._root, name)
+            size = _read(os.path.join(entry, self.SIZE_FILE))
+            entries.append(
+                (
+                    entry,
+                    int(size) if size else self._size(entry),
+                    os.lstat(entry).st_mtime,
+                )
+            )
+
+        return entries
+
+    def _size(self, entry: str) -> int:
+        data = os.path.join(entry, self.DATA_DIR)
+        return _disk_usage(data if os.path.isdir(data) else entry)
+
+    def _evict(self) -> List[Tuple[str, int]]:
+        """
+        Move the least recently used extractions without live leases out of the way, until the space is under its cap.
+
+        Must be called under the lock. The directories are renamed, so that the (slow) removal of
+        their files can happen after the lock is released, and returned along with their sizes.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+
+        evicted = []
+        for entry, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self._max_bytes:
+                break
+
+            if os.path.isdir(entry) and self._is_leased(entry):
+                continue
+
+            evicted.append((self._discard(entry), size))
+            total -= size
+
+        return evicted
+
+    def _discard(self, entry: str) -> str:
+        """Rename an extraction (under the lock), so that no other process uses it, and return its new path."""
+        trash = os.path.join(self._root, f".{uuid.uuid4().hex}{self.EVICTED_SUFFIX}")
+        os.rename(entry, trash)
+        return trash
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        import fcntl
+
+        with open(os.path.join(self._root, self.LOCK_FILE), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def managed_output_dir(
+    output_dir: Union[str, ExtractionSpace],
+) -> "contextlib.AbstractContextManager[str]":
+    """Return a context manager with the directory to extract an archive into: the output directory itself, or a new extraction of the space."""
+    if isinstance(output_dir, ExtractionSpace):
+        return output_dir.extraction()
+
+    return contextlib.nullcontext(output_dir)
+
+
+# Lease files held (open and locked) by the current process, by extraction
+_leases: Dict[str, List[IO]] = {}
+_leases_lock = threading.Lock()
+
+
+def _close_leases(entry: str):
+    with _leases_lock:
+        leases = _leases.pop(entry, [])
+
+    for lease in leases:
+        lease.close()
+
+
+def _disk_usage(path: str) -> int:
+    if not os.path.isdir(path):
+        return os.lstat(path).st_size if os.path.lexists(path) else 0
+
+    seen: Set[Tuple[int, int]] = set()
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.lstat(os.path.join(root, name))
+            except FileNotFoundError:
+                continue
+
+            if (stat.st_dev, stat.st_ino) not in seen:
+                seen.add((stat.st_dev, stat.st_ino))
+                total += stat.st_size
+
+    return total
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write(path: str, content: str):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def _touch(path: str):
+    now = time.time()
+    os.utime(path, (now, now))
+
+
+def _remove(evicted: List[Tuple[str, int]]):
+    for path, _ in evicted:
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.unlink(path)
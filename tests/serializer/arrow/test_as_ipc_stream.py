@@ -0,0 +1,185 @@
+import io
+import os
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from dagger import DeserializationError, SerializationError, Serializer
+
+from dagger_contrib.serializer.arrow.as_ipc_stream import AsIPCStream
+
+
+def _batches(n: int, rows: int = 10):
+    for i in range(n):
+        yield pa.RecordBatch.from_pydict(
+            {
+                "id": list(range(i * rows, (i + 1) * rows)),
+                "name": [f"row-{j}" for j in range(i * rows, (i + 1) * rows)],
+            }
+        )
+
+
+def test__conforms_to_protocol():
+    assert isinstance(AsIPCStream(), Serializer)
+
+
+def test_serialization_and_deserialization_are_symmetric():
+    with tempfile.TemporaryDirectory() as tmp:
+        for compression in [None, "lz4", "zstd"]:
+            serializer = AsIPCStream(compression=compression)
+            filename = os.path.join(tmp, f"stream.{serializer.extension}")
+
+            with open(filename, "wb") as writer:
+                serializer.serialize(_batches(5), writer)
+
+            with open(filename, "rb") as reader:
+                deserialized = serializer.deserialize(reader)
+
+            # The iterator keeps working after the reader has been closed
+            assert list(deserialized) == list(_batches(5))
+
+
+def test_serialization_and_deserialization_of_dataframes():
+    chunks = [
+        pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]}),
+        pd.DataFrame({"a": [4, 5], "b": ["v", "w"]}, index=[10, 11]),
+    ]
+    serializer = AsIPCStream(to_pandas=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "stream.arrows")
+
+        with open(filename, "wb") as writer:
+            serializer.serialize(iter(chunks), writer)
+
+        with open(filename, "rb") as reader:
+            deserialized = list(serializer.deserialize(reader))
+
+    assert len(deserialized) == len(chunks)
+    for chunk, deserialized_chunk in zip(chunks, deserialized):
+        pd.testing.assert_frame_equal(chunk, deserialized_chunk)
+
+
+def test_serialize_mixed_chunk_types():
+    chunks = [
+        pa.RecordBatch.from_pydict({"a": [1, 2]}),
+        pa.Table.from_pydict({"a": [3, 4]}),
+        pd.DataFrame({"a": [5, 6]}),
+    ]
+    buffer = io.BytesIO()
+    AsIPCStream(preserve_index=False).serialize(chunks, buffer)
+    buffer.seek(0)
+
+    table = pa.Table.from_batches(list(AsIPCStream().deserialize(buffer)))
+
+    assert table.column("a").to_pylist() == [1, 2, 3, 4, 5, 6]
+
+
+def test_serialize_a_single_chunk():
+    buffer = io.BytesIO()
+    AsIPCStream().serialize(pa.Table.from_pydict({"a": [1, 2]}), buffer)
+    buffer.seek(0)
+
+    batches = list(AsIPCStream().deserialize(buffer))
+
+    assert len(batches) == 1
+    assert batches[0].column(0).to_pylist() == [1, 2]
+
+
+def test_serialize_an_empty_iterator():
+    buffer = io.BytesIO()
+    AsIPCStream().serialize(iter([]), buffer)
+    buffer.seek(0)
+
+    assert list(AsIPCStream().deserialize(buffer)) == []
+
+
+def test_serialize_writes_each_chunk_as_it_is_produced():
+    writer = io.BytesIO()
+    sizes = []
+
+    def produce():
+        for batch in _batches(3):
+            sizes.append(len(writer.getvalue()))
+            yield batch
+
+    AsIPCStream().serialize(produce(), writer)
+
+    assert sizes[0] < sizes[1] < sizes[2] < len(writer.getvalue())
+
+
+def test_deserialize_yields_chunks_lazily():
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "stream.arrows")
+
+        with open(filename, "wb") as writer:
+            AsIPCStream().serialize(_batches(3), writer)
+
+        # Truncate the last chunk: the first ones can still be consumed before the error surfaces
+        with open(filename, "r+b") as f:
+            f.truncate(os.path.getsize(filename) - 20)
+
+        with open(filename, "rb") as reader:
+            deserialized = AsIPCStream().deserialize(reader)
+
+        first = next(deserialized)
+        assert first.column("id").to_pylist() == list(range(10))
+
+        with pytest.raises(DeserializationError):
+            list(deserialized)
+
+
+def test_deserialize_reads_other_readers_incrementally():
+    class CountingReader(io.RawIOBase):
+        def __init__(self, data: bytes):
+            self._data = io.BytesIO(data)
+            self.bytes_read = 0
+
+        def readable(self):
+            return True
+
+        def readinto(self, buffer):
+            data = self._data.read(len(buffer))
+            buffer[: len(data)] = data
+            self.bytes_read += len(data)
+            return len(data)
+
+    writer = io.BytesIO()
+    AsIPCStream().serialize(_batches(3, rows=10_000), writer)
+
+    reader = CountingReader(writer.getvalue())
+    deserialized = AsIPCStream().deserialize(reader)
+
+    first = next(deserialized)
+    assert first.column("id").to_pylist() == list(range(10_000))
+    assert reader.bytes_read < len(writer.getvalue()) / 2
+
+    assert [batch.num_rows for batch in deserialized] == [10_000, 10_000]
+    assert reader.bytes_read == len(writer.getvalue())
+
+
+def test_serialize_invalid_values():
+    serializer = AsIPCStream()
+    invalid_values = [
+        1,
+        [1, 2],
+        "abc",
+        [
+            pa.RecordBatch.from_pydict({"a": [1]}),
+            pa.RecordBatch.from_pydict({"b": ["x"]}),
+        ],
+    ]
+
+    for value in invalid_values:
+        with pytest.raises(SerializationError):
+            serializer.serialize(value, io.BytesIO())
+
+
+def test_deserialize_invalid_values():
+    with pytest.raises(DeserializationError):
+        AsIPCStream().deserialize(io.BytesIO(b"not an arrow stream"))
+
+
+def test_extension():
+    assert AsIPCStream().extension == "arrows"
@@ -0,0 +1,23 @@
+"""Fixtures shared by the tests of all serializers."""
+
+import pytest
+
+
+class ExtractingPathSerializer:
+    """Path serializer that can only read members by extracting the whole artifact."""
+
+    def __init__(self, path_serializer):
+        self._path_serializer = path_serializer
+        self.extension = path_serializer.extension
+
+    def serialize(self, value, writer):
+        self._path_serializer.serialize(value, writer)
+
+    def deserialize(self, reader):
+        return self._path_serializer.deserialize(reader)
+
+
+@pytest.fixture
+def extracting_path_serializer():
+    """Return a class that wraps a path serializer, hiding its support for reading single members."""
+    return ExtractingPathSerializer
@@ -1,12 +1,17 @@
+import glob
 import io
+import json
 import os
 import tempfile
 
+import pandas as pd
 import pytest
 from dagger import DeserializationError, SerializationError, Serializer
+from dask.dataframe import from_pandas
 
 from dagger_contrib.serializer.dask.dataframe.as_csv import AsCSV
 from dagger_contrib.serializer.path.as_tar import AsTar
+from dagger_contrib.serializer.path.as_zip import AsZip
 
 
 def test__conforms_to_protocol():
@@ -131,3 +136,235 @@ def test_extension_delegates_to_path_serializer():
 
     serializer = AsCSV(path_serializer=CustomSerializer())
     assert serializer.extension == "custom.ext"
+
+
+def test_serialization_rebalances_partitions(df_with_multiple_partitions):
+    for kwargs in [{"partition_rows": 3000}, {"partition_size": "120kB"}]:
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = os.path.join(tmp, "tar_output_dir")
+            serializer = AsCSV(path_serializer=AsTar(output_dir=output_dir), **kwargs)
+
+            filename = os.path.join(tmp, f"file.{serializer.extension}")
+            with open(filename, "wb") as writer:
+                serializer.serialize(df_with_multiple_partitions, writer)
+
+            with open(filename, "rb") as reader:
+                deserialized_df = serializer.deserialize(reader)
+
+            files = glob.glob(os.path.join(output_dir, "*", "*.csv"))
+            assert len(files) == 4
+            assert (
+                df_with_multiple_partitions.sum().sum().compute()
+                == deserialized_df.sum().sum().compute()
+            )
+
+
+def test_rebalancing_by_size_and_rows_is_not_supported():
+    with pytest.raises(AssertionError):
+        with tempfile.TemporaryDirectory() as tmp:
+            AsCSV(
+                path_serializer=AsTar(output_dir=tmp),
+                partition_size=10,
+                partition_rows=10,
+            )
+
+
+def _serialize_and_deserialize(df, tmp, **kwargs):
+    serializer = AsCSV(
+        path_serializer=AsTar(output_dir=os.path.join(tmp, "tar_output_dir")),
+        **kwargs,
+    )
+
+    filename = os.path.join(tmp, f"file.{serializer.extension}")
+    with open(filename, "wb") as writer:
+        serializer.serialize(df, writer)
+
+    with open(filename, "rb") as reader:
+        return serializer.deserialize(reader)
+
+
+def test_deserialization_restores_known_divisions():
+    indexes = [
+        pd.RangeIndex(1000),
+        pd.Index([f"key-{i:04d}" for i in range(1000)], name="key"),
+        pd.date_range("2021-01-01", periods=1000, freq="1min", name="minute"),
+    ]
+
+    for compression in [None, "gzip"]:
+        for index in indexes:
+            df = pd.DataFrame({"a": range(1000), "b": [1.5] * 1000}, index=index)
+            ddf = from_pandas(df, npartitions=4)
+            assert ddf.known_divisions
+
+            with tempfile.TemporaryDirectory() as tmp:
+                deserialized_df = _serialize_and_deserialize(
+                    ddf, tmp, compression=compression
+                )
+
+                assert deserialized_df.npartitions == ddf.npartitions
+                assert deserialized_df.divisions == ddf.divisions
+                pd.testing.assert_frame_equal(
+                    deserialized_df.compute(), df, check_freq=False
+                )
+                # Lookups by index only need to load the partition that contains the key
+                assert deserialized_df.loc[index[500]].npartitions == 1
+
+
+def test_deserialization_keeps_index_strings_that_look_like_numbers():
+    for index in [
+        pd.Index(["010", "10", "11", "2.5", "20", "x"]),
+        pd.Index(["1", "2", "3", "4", "5", "6"], dtype="string", name="key"),
+    ]:
+        df = pd.DataFrame({"a": range(6)}, index=index)
+        ddf = from_pandas(df, npartitions=3)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            deserialized_df = _serialize_and_deserialize(ddf, tmp)
+
+            assert deserialized_df.divisions == ddf.divisions
+            pd.testing.assert_frame_equal(deserialized_df.compute(), df)
+            assert deserialized_df.loc[index[3]].compute()["a"].tolist() == [3]
+
+
+def test_deserialization_of_an_unsorted_index_does_not_shuffle(
+    df_with_multiple_partitions,
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        deserialized_df = _serialize_and_deserialize(df_with_multiple_partitions, tmp)
+
+        assert not deserialized_df.known_divisions
+        pd.testing.assert_frame_equal(
+            deserialized_df.compute(),
+            df_with_multiple_partitions.compute(),
+        )
+
+
+def test_serialization_of_an_index_with_values_of_mixed_types():
+    frames = [
+        # Within a partition
+        from_pandas(
+            pd.DataFrame({"a": range(4)}, index=[1, "x", 2, "y"]),
+            npartitions=2,
+            sort=False,
+        ),
+        # Across partitions, each of them sorted
+        from_pandas(
+            pd.DataFrame({"a": range(4)}, index=[1, 2, "x", "y"]),
+            npartitions=2,
+            sort=False,
+        ),
+    ]
+
+    for ddf in frames:
+        with tempfile.TemporaryDirectory() as tmp:
+            serializer = AsCSV(path_serializer=AsTar(output_dir=tmp))
+            buffer = io.BytesIO()
+            serializer.serialize(ddf, buffer)
+
+            buffer.seek(0)
+            metadata = json.loads(
+                AsTar(output_dir=tmp).read_member(buffer, AsCSV.METADATA_FILENAME)
+            )
+            assert metadata["partition_rows"] == [2, 2]
+            assert metadata["divisions"] is None
+
+
+def test_deserialization_of_artifacts_without_index_metadata(
+    df_with_multiple_partitions,
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        serializer = AsCSV(
+            path_serializer=AsTar(output_dir=os.path.join(tmp, "tar_output_dir"))
+        )
+
+        csv_dir = os.path.join(tmp, "csv")
+        df_with_multiple_partitions.to_csv(os.path.join(csv_dir, AsCSV.GLOB_PATTERN))
+        filename = os.path.join(tmp, "file.tar.gz")
+        with open(filename, "wb") as writer:
+            AsTar(output_dir=tmp).serialize(csv_dir, writer)
+
+        with open(filename, "rb") as reader:
+            deserialized_df = serializer.deserialize(reader)
+
+        assert (
+            df_with_multiple_partitions.sum().sum().compute()
+            == deserialized_df.sum().sum().compute()
+        )
+
+
+def test_inspect_reads_only_the_metadata(
+    df_with_multiple_partitions, extracting_path_serializer
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = os.path.join(tmp, "output_dir")
+        os.mkdir(output_dir)
+
+        path_serializers = [
+            AsTar(output_dir=output_dir),
+            AsZip(output_dir=output_dir),
+            extracting_path_serializer(AsTar(output_dir=output_dir)),
+        ]
+
+        for path_serializer in path_serializers:
+            serializer = AsCSV(path_serializer=path_serializer)
+            filename = os.path.join(tmp, f"file.{serializer.extension}")
+
+            with open(filename, "wb") as writer:
+                serializer.serialize(df_with_multiple_partitions, writer)
+
+            with open(filename, "rb") as reader:
+                summary = serializer.inspect(reader)
+
+            assert summary.format == "csv"
+            assert summary.rows == 10000
+            assert summary.partitions == df_with_multiple_partitions.npartitions
+            assert summary.partition_rows == [2000] * 5
+
+            if not isinstance(path_serializer, extracting_path_serializer):
+                assert os.listdir(output_dir) == []
+
+
+def test_inspect_artifacts_without_index_metadata(df_with_multiple_partitions):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_dir = os.path.join(tmp, "csv")
+        df_with_multiple_partitions.to_csv(os.path.join(csv_dir, AsCSV.GLOB_PATTERN))
+        filename = os.path.join(tmp, "file.tar.gz")
+        with open(filename, "wb") as writer:
+            AsTar(output_dir=tmp).serialize(csv_dir, writer)
+
+        with open(filename, "rb") as reader:
+            with pytest.raises(DeserializationError):
+                AsCSV(path_serializer=AsTar(output_dir=tmp)).inspect(reader)
+
+
+def test_deserialize_strings_into_compact_dtypes():
+    df = pd.DataFrame(
+        {"a": range(100), "b": ["x", "y", "z", "w"] * 25},
+        index=pd.RangeIndex(100, name="id"),
+    )
+    ddf = from_pandas(df, npartitions=4)
+
+    for string_dtype, expected_dtype in [
+        ("pyarrow", pd.StringDtype("pyarrow")),
+        ("category", "category"),
+    ]:
+        with tempfile.TemporaryDirectory() as tmp:
+            serializer = AsCSV(
+                path_serializer=AsTar(output_dir=os.path.join(tmp, "output_dir")),
+                string_dtype=string_dtype,
+            )
+            buffer = io.BytesIO()
+            serializer.serialize(ddf, buffer)
+            buffer.seek(0)
+            deserialized_df = serializer.deserialize(buffer)
+
+            assert deserialized_df["b"].dtype == expected_dtype
+            assert deserialized_df.divisions == ddf.divisions
+            if string_dtype == "category":
+                assert not deserialized_df["b"].cat.known
+
+            computed_df = deserialized_df.compute()
+            assert computed_df["b"].dtype == expected_dtype
+            pd.testing.assert_frame_equal(
+                computed_df.astype({"b": object}), df, check_index_type=False
+            )
@@ -1,12 +1,18 @@
+import asyncio
+import glob
 import io
 import os
 import tempfile
 
+import pandas as pd
 import pytest
-from dagger import SerializationError, Serializer
+from dagger import DeserializationError, SerializationError, Serializer
+from dask.dataframe import from_pandas
 
+from dagger_contrib.serializer.asynchronous import AsyncSerializer
 from dagger_contrib.serializer.dask.dataframe.as_parquet import AsParquet
 from dagger_contrib.serializer.path.as_tar import AsTar
+from dagger_contrib.serializer.path.as_zip import AsZip
 
 
 def test__conforms_to_protocol():
@@ -104,3 +110,267 @@ def test_extension_delegates_to_path_serializer():
 
     serializer = AsParquet(path_serializer=CustomSerializer())
     assert serializer.extension == "custom.ext"
+
+
+def test_serialization_rebalances_partitions(df_with_multiple_partitions):
+    for kwargs in [{"partition_rows": 3000}, {"partition_size": "120kB"}]:
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = os.path.join(tmp, "tar_output_dir")
+            serializer = AsParquet(
+                path_serializer=AsTar(output_dir=output_dir), **kwargs
+            )
+
+            filename = os.path.join(tmp, f"file.{serializer.extension}")
+            with open(filename, "wb") as writer:
+                serializer.serialize(df_with_multiple_partitions, writer)
+
+            with open(filename, "rb") as reader:
+                deserialized_df = serializer.deserialize(reader)
+
+            files = glob.glob(os.path.join(output_dir, "*", "*.parquet"))
+            assert len(files) == 4
+            assert (
+                df_with_multiple_partitions.sum().sum().compute()
+                == deserialized_df.sum().sum().compute()
+            )
+
+
+def test_rebalancing_by_size_and_rows_is_not_supported():
+    with pytest.raises(AssertionError):
+        with tempfile.TemporaryDirectory() as tmp:
+            AsParquet(
+                path_serializer=AsTar(output_dir=tmp),
+                partition_size=10,
+                partition_rows=10,
+            )
+
+
+def test_serialization_writes_a_consolidated_metadata_file(df_with_multiple_partitions):
+    import pyarrow.parquet as pq
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = os.path.join(tmp, "tar_output_dir")
+        serializer = AsParquet(path_serializer=AsTar(output_dir=output_dir))
+
+        buffer = io.BytesIO()
+        serializer.serialize(df_with_multiple_partitions, buffer)
+        buffer.seek(0)
+        path = serializer._path_serializer.deserialize(buffer)
+
+        metadata = pq.read_metadata(os.path.join(path, "_metadata"))
+        assert metadata.num_rows == len(df_with_multiple_partitions)
+        assert metadata.num_row_groups == df_with_multiple_partitions.npartitions
+
+
+def test_deserialization_restores_known_divisions():
+    indexes = [
+        pd.RangeIndex(1000, name="id"),
+        pd.Index([f"key-{i:04d}" for i in range(1000)], name="key"),
+        pd.date_range("2021-01-01", periods=1000, freq="1min", name="minute"),
+    ]
+
+    for index in indexes:
+        df = pd.DataFrame({"a": range(1000), "b": [1.5] * 1000}, index=index)
+        ddf = from_pandas(df, npartitions=4)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            serializer = AsParquet(
+                path_serializer=AsTar(output_dir=os.path.join(tmp, "output_dir"))
+            )
+            buffer = io.BytesIO()
+            serializer.serialize(ddf, buffer)
+            buffer.seek(0)
+            deserialized_df = serializer.deserialize(buffer)
+
+            assert deserialized_df.divisions == ddf.divisions
+            pd.testing.assert_frame_equal(
+                deserialized_df.compute(), df, check_freq=False
+            )
+            # Lookups by index only need to load the partition that contains the key
+            assert deserialized_df.loc[index[500]].npartitions == 1
+
+
+def test_divisions_kwargs_depend_on_the_dask_version():
+    from dagger_contrib.serializer.dask.dataframe.as_parquet import _divisions_kwargs
+
+    def newer_read_parquet(path, calculate_divisions=None):
+        pass
+
+    def older_read_parquet(path, gather_statistics=None):
+        pass
+
+    assert _divisions_kwargs(newer_read_parquet) == {"calculate_divisions": True}
+    assert _divisions_kwargs(older_read_parquet) == {"gather_statistics": True}
+
+
+def test_inspect_reads_only_the_metadata(df_with_multiple_partitions):
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = os.path.join(tmp, "output_dir")
+        os.mkdir(output_dir)
+
+        for path_serializer in [
+            AsTar(output_dir=output_dir),
+            AsZip(output_dir=output_dir),
+        ]:
+            serializer = AsParquet(path_serializer=path_serializer)
+            filename = os.path.join(tmp, f"file.{serializer.extension}")
+
+            with open(filename, "wb") as writer:
+                serializer.serialize(df_with_multiple_partitions, writer)
+
+            with open(filename, "rb") as reader:
+                summary = serializer.inspect(reader)
+
+            assert summary.format == "parquet"
+            assert summary.rows == 10000
+            assert summary.columns == ["index", "A", "B", "C", "D"]
+            assert summary.dtypes["A"] == "int64"
+            assert summary.partitions == df_with_multiple_partitions.npartitions
+            assert summary.partition_rows == [2000] * 5
+            assert os.listdir(output_dir) == []
+
+
+def test_inspect_artifacts_without_metadata(df_with_multiple_partitions):
+    with tempfile.TemporaryDirectory() as tmp:
+        parquet_dir = os.path.join(tmp, "parquet")
+        df_with_multiple_partitions.to_parquet(parquet_dir, write_metadata_file=False)
+        filename = os.path.join(tmp, "file.tar.gz")
+        with open(filename, "wb") as writer:
+            AsTar(output_dir=tmp).serialize(parquet_dir, writer)
+
+        with open(filename, "rb") as reader:
+            with pytest.raises(DeserializationError):
+                AsParquet(path_serializer=AsTar(output_dir=tmp)).inspect(reader)
+
+
+def test_deserialize_single_file_artifacts_by_row_group():
+    from dagger_contrib.serializer.pandas.dataframe.as_parquet import (
+        AsParquet as AsPandasParquet,
+    )
+
+    indexes = [
+        pd.RangeIndex(100, 1100, name="id"),
+        pd.Index([f"key-{i:04d}" for i in range(1000)], name="key"),
+    ]
+
+    for index in indexes:
+        df = pd.DataFrame({"a": range(1000), "b": [1.5] * 1000}, index=index)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "file.parquet")
+            with open(filename, "wb") as writer:
+                AsPandasParquet(row_group_size=300).serialize(df, writer)
+
+            serializer = AsParquet(path_serializer=AsTar(output_dir=tmp))
+
+            with open(filename, "rb") as reader:
+                deserialized_df = serializer.deserialize(reader)
+
+            with open(filename, "rb") as reader:
+                summary = serializer.inspect(reader)
+
+            assert deserialized_df.npartitions == 4
+            assert deserialized_df.divisions == (
+                index[0],
+                index[300],
+                index[600],
+                index[900],
+                index[999],
+            )
+            pd.testing.assert_frame_equal(
+                deserialized_df.compute(), df, check_index_type=False
+            )
+            assert summary.partitions == 4
+            assert summary.partition_rows == [300, 300, 300, 100]
+            assert summary.columns == ["a", "b"]
+
+
+def test_deserialize_single_file_artifacts_that_are_removed_before_computing():
+    from dagger_contrib.serializer.pandas.dataframe.as_parquet import (
+        AsParquet as AsPandasParquet,
+    )
+
+    df = pd.DataFrame(
+        {"a": range(1000), "b": ["x", "y"] * 500},
+        index=pd.date_range("2021-01-01", periods=1000, freq="1min", name="minute"),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "file.parquet")
+        with open(filename, "wb") as writer:
+            AsPandasParquet(row_group_size=300).serialize(df, writer)
+
+        serializer = AsParquet(path_serializer=AsTar(output_dir=tmp))
+        with open(filename, "rb") as reader:
+            content = reader.read()
+            reader.seek(0)
+            deserialized_df = serializer.deserialize(reader)
+
+        os.remove(filename)
+
+        assert deserialized_df.divisions == (
+            df.index[0],
+            df.index[300],
+            df.index[600],
+            df.index[900],
+            df.index[999],
+        )
+        pd.testing.assert_frame_equal(deserialized_df.compute(), df, check_freq=False)
+
+        # Asynchronous readers are spooled into a temporary file, which is removed on return
+        async def deserialize():
+            reader = asyncio.StreamReader()
+            reader.feed_data(content)
+            reader.feed_eof()
+            return await AsyncSerializer(serializer).deserialize(reader)
+
+        pd.testing.assert_frame_equal(
+            asyncio.run(deserialize()).compute(), df, check_freq=False
+        )
+
+
+def test_deserialize_single_file_artifacts_requires_a_local_file():
+    from dagger_contrib.serializer.pandas.dataframe.as_parquet import (
+        AsParquet as AsPandasParquet,
+    )
+
+    buffer = io.BytesIO()
+    AsPandasParquet().serialize(pd.DataFrame({"a": range(10)}), buffer)
+    buffer.seek(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with pytest.raises(DeserializationError):
+            AsParquet(path_serializer=AsTar(output_dir=tmp)).deserialize(buffer)
+
+
+def test_deserialize_strings_into_compact_dtypes():
+    df = pd.DataFrame(
+        {"a": range(100), "b": ["x", "y", "z", "w"] * 25},
+        index=pd.RangeIndex(100, name="id"),
+    )
+    ddf = from_pandas(df, npartitions=4)
+
+    for string_dtype, expected_dtype in [
+        ("pyarrow", pd.StringDtype("pyarrow")),
+        ("category", "category"),
+    ]:
+        with tempfile.TemporaryDirectory() as tmp:
+            serializer = AsParquet(
+                path_serializer=AsTar(output_dir=os.path.join(tmp, "output_dir")),
+                string_dtype=string_dtype,
+            )
+            buffer = io.BytesIO()
+            serializer.serialize(ddf, buffer)
+            buffer.seek(0)
+            deserialized_df = serializer.deserialize(buffer)
+
+            assert deserialized_df["b"].dtype == expected_dtype
+            assert deserialized_df.divisions == ddf.divisions
+            if string_dtype == "category":
+                assert not deserialized_df["b"].cat.known
+
+            computed_df = deserialized_df.compute()
+            assert computed_df["b"].dtype == expected_dtype
+            pd.testing.assert_frame_equal(
+                computed_df.astype({"b": object}), df, check_index_type=False
+            )
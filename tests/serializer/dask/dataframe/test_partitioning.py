@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+from dask.dataframe import from_pandas
+
+from dagger_contrib.serializer.dask.dataframe._partitioning import rebalance
+
+
+def test_rebalance_without_a_target_returns_the_same_dataframe(
+    df_with_multiple_partitions,
+):
+    assert rebalance(df_with_multiple_partitions) is df_with_multiple_partitions
+
+
+def test_rebalance_by_rows_produces_even_partitions():
+    df = pd.DataFrame({"a": range(1000)})
+    # Very uneven partitions
+    ddf = from_pandas(df, npartitions=1).repartition(divisions=[0, 1, 2, 900, 999])
+
+    cases = [
+        (100, [100] * 10),
+        (300, [250] * 4),
+        (999, [500, 500]),
+        (5000, [1000]),
+    ]
+
+    for partition_rows, expected_lengths in cases:
+        rebalanced = rebalance(ddf, partition_rows=partition_rows)
+        assert rebalanced.map_partitions(len).compute().tolist() == expected_lengths
+        assert rebalanced.compute()["a"].tolist() == list(range(1000))
+
+
+def test_rebalance_carries_known_divisions_forward():
+    df = pd.DataFrame({"a": range(1000)}, index=[i * 2 for i in range(1000)])
+    ddf = from_pandas(df, npartitions=1).repartition(divisions=[0, 2, 4, 1800, 1998])
+
+    for partition_rows in [100, 300, 999, 5000]:
+        rebalanced = rebalance(ddf, partition_rows=partition_rows)
+
+        assert rebalanced.known_divisions
+        assert rebalanced.divisions[0] == 0
+        assert rebalanced.divisions[-1] == 1998
+        for i, partition in enumerate(rebalanced.partitions):
+            index = partition.compute().index
+            assert index.min() >= rebalanced.divisions[i]
+            assert index.max() <= rebalanced.divisions[i + 1]
+            if i < rebalanced.npartitions - 1:
+                assert index.max() < rebalanced.divisions[i + 1]
+
+        pd.testing.assert_frame_equal(
+            rebalanced.loc[500:899].compute(), df.loc[500:899]
+        )
+
+    # Equal index values split across two partitions cannot be described by divisions
+    df = pd.DataFrame({"a": range(4)}, index=[0, 1, 1, 2])
+    ddf = from_pandas(df, npartitions=1)
+    assert not rebalance(ddf, partition_rows=2).known_divisions
+    assert not rebalance(ddf.clear_divisions(), partition_rows=2).known_divisions
+
+
+def test_rebalance_by_size_produces_even_partitions():
+    df = pd.DataFrame({"a": range(1000), "b": [f"value {i}" for i in range(1000)]})
+    ddf = from_pandas(df, npartitions=7)
+    total_bytes = (
+        ddf.map_partitions(lambda p: p.memory_usage(index=True, deep=True).sum())
+        .compute()
+        .sum()
+    )
+
+    rebalanced = rebalance(ddf, partition_size=int(total_bytes // 10 + 1))
+    assert rebalanced.map_partitions(len).compute().tolist() == [100] * 10
+
+    rebalanced = rebalance(ddf, partition_size=f"{total_bytes // 2 + 1}B")
+    assert rebalanced.map_partitions(len).compute().tolist() == [500, 500]
+
+
+def test_rebalance_empty_dataframe():
+    ddf = from_pandas(pd.DataFrame({"a": []}, dtype="int64"), npartitions=1)
+
+    rebalanced = rebalance(ddf, partition_rows=10)
+    assert rebalanced.npartitions == 1
+    assert len(rebalanced.compute()) == 0
+
+
+def test_rebalance_with_both_targets_is_not_supported(df_with_multiple_partitions):
+    with pytest.raises(AssertionError):
+        rebalance(df_with_multiple_partitions, partition_size=10, partition_rows=10)
@@ -0,0 +1,145 @@
+import errno
+import io
+import os
+import tempfile
+
+import pytest
+
+from dagger_contrib.serializer.dask.dataframe._staging import Staging
+from dagger_contrib.serializer.dask.dataframe.as_csv import AsCSV
+from dagger_contrib.serializer.dask.dataframe.as_parquet import AsParquet
+from dagger_contrib.serializer.path.as_tar import AsTar
+
+
+def test_files_are_staged_in_the_scratch_directory(df_with_multiple_partitions):
+    for cls in [AsCSV, AsParquet]:
+        with tempfile.TemporaryDirectory() as tmp:
+            scratch_dir = os.path.join(tmp, "scratch")
+            os.makedirs(scratch_dir)
+            metrics = []
+            serializer = cls(
+                path_serializer=AsTar(output_dir=tmp),
+                scratch_dir=scratch_dir,
+                metrics_callback=metrics.append,
+            )
+
+            buffer = io.BytesIO()
+            serializer.serialize(df_with_multiple_partitions, buffer)
+            buffer.seek(0)
+            deserialized = serializer.deserialize(buffer)
+
+            assert len(deserialized.compute()) == len(df_with_multiple_partitions)
+            assert os.listdir(scratch_dir) == []
+
+            (m,) = metrics
+            assert m.directory == scratch_dir
+            assert not m.in_memory
+            assert m.estimated_bytes is None
+            assert m.staged_bytes > 0
+            assert m.stage_seconds > 0
+            assert m.package_seconds > 0
+            assert (m.write_seconds is not None) == (cls is AsCSV)
+            assert not m.fell_back_to_disk
+
+
+@pytest.mark.skipif(
+    not os.path.isdir(Staging.MEMORY_DIR), reason="No RAM-backed filesystem"
+)
+def test_files_are_staged_in_memory_when_they_fit_in_the_budget(
+    df_with_multiple_partitions,
+):
+    for memory_budget, in_memory in [("1GB", True), (1000, False)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            metrics = []
+            serializer = AsCSV(
+                path_serializer=AsTar(output_dir=tmp),
+                scratch_dir=tmp,
+                memory_budget=memory_budget,
+                metrics_callback=metrics.append,
+            )
+            serializer.serialize(df_with_multiple_partitions, io.BytesIO())
+
+            (m,) = metrics
+            assert m.in_memory == in_memory
+            assert m.directory == (Staging.MEMORY_DIR if in_memory else tmp)
+            assert m.estimated_bytes > 1000
+
+
+def test_staging_falls_back_to_disk_when_memory_runs_out(
+    df_with_multiple_partitions, monkeypatch
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        memory_dir = os.path.join(tmp, "memory")
+        scratch_dir = os.path.join(tmp, "scratch")
+        os.makedirs(memory_dir)
+        os.makedirs(scratch_dir)
+        monkeypatch.setattr(Staging, "MEMORY_DIR", memory_dir)
+
+        def write(df, path):
+            if path.startswith(memory_dir):
+                with open(os.path.join(path, "partial"), "w") as f:
+                    f.write("partial")
+                raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+
+            with open(os.path.join(path, "complete"), "w") as f:
+                f.write("complete")
+
+        packaged = []
+        metrics = []
+        Staging(scratch_dir, "1GB", metrics.append).run(
+            df_with_multiple_partitions,
+            write=write,
+            package=lambda path: packaged.append(os.listdir(path)),
+        )
+
+        assert packaged == [["complete"]]
+        assert os.listdir(memory_dir) == []
+        assert os.listdir(scratch_dir) == []
+
+        (m,) = metrics
+        assert m.directory == scratch_dir
+        assert not m.in_memory
+        assert m.fell_back_to_disk
+
+
+def test_staging_errors_other_than_running_out_of_space_are_raised(
+    df_with_multiple_partitions,
+):
+    with tempfile.TemporaryDirectory() as tmp:
+
+        def write(df, path):
+            raise OSError(errno.EACCES, os.strerror(errno.EACCES))
+
+        with pytest.raises(OSError):
+            Staging(tmp, "1GB").run(
+                df_with_multiple_partitions, write=write, package=lambda path: None
+            )
+
+        assert os.listdir(tmp) == []
+
+
+def test_the_partition_used_to_estimate_the_size_is_computed_once(
+    df_with_multiple_partitions,
+):
+    computed = []
+
+    def record(partition):
+        if len(partition):
+            computed.append(partition["index"].iloc[0])
+        return partition
+
+    df = df_with_multiple_partitions.map_partitions(
+        record, meta=df_with_multiple_partitions._meta
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        written = []
+        metrics = []
+        Staging(tmp, "1GB", metrics.append).run(
+            df,
+            write=lambda df, path: written.append(df.compute()),
+            package=lambda path: None,
+        )
+
+    assert sorted(computed) == [0, 2000, 4000, 6000, 8000]
+    assert written[0].equals(df_with_multiple_partitions.compute())
+    assert metrics[0].estimated_bytes > 0
@@ -0,0 +1,149 @@
+import io
+import os
+import tempfile
+
+import numpy as np
+import pytest
+from dagger import DeserializationError, SerializationError, Serializer
+
+from dagger_contrib.serializer.numpy.as_npy import AsNPY
+
+
+def test__conforms_to_protocol():
+    assert isinstance(AsNPY(), Serializer)
+
+
+def test_serialization_and_deserialization_are_symmetric():
+    arrays = [
+        np.arange(100, dtype="int64"),
+        np.random.default_rng(0).random((30, 20)),
+        np.asfortranarray(np.arange(600, dtype="float32").reshape(20, 30)),
+        np.arange(600).reshape(20, 30)[::2, ::3],
+        np.array(["a", "bb", "ccc"]),
+        np.array([(1, 2.0), (3, 4.0)], dtype=[("x", "i4"), ("y", "f8")]),
+        np.array(np.datetime64("2021-01-01")),
+        np.zeros((0, 3)),
+        np.arange(10, dtype=">i2"),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for memory_map in [True, False]:
+            serializer = AsNPY(memory_map=memory_map, chunk_size=64)
+            filename = os.path.join(tmp, f"array.{serializer.extension}")
+
+            for array in arrays:
+                with open(filename, "wb") as writer:
+                    serializer.serialize(array, writer)
+
+                with open(filename, "rb") as reader:
+                    deserialized = serializer.deserialize(reader)
+
+                assert deserialized.dtype == array.dtype
+                np.testing.assert_array_equal(deserialized, array)
+
+
+def test_output_is_compatible_with_numpy():
+    array = np.asfortranarray(np.random.default_rng(0).random((50, 40)))
+    serializer = AsNPY(chunk_size=100)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "array.npy")
+
+        with open(filename, "wb") as writer:
+            serializer.serialize(array, writer)
+
+        expected = io.BytesIO()
+        np.save(expected, array)
+
+        with open(filename, "rb") as reader:
+            assert reader.read() == expected.getvalue()
+
+
+def test_serialize_writes_in_chunks():
+    class RecordingWriter(io.BytesIO):
+        def __init__(self):
+            super().__init__()
+            self.sizes = []
+
+        def write(self, data):
+            self.sizes.append(len(memoryview(data).cast("B")))
+            return super().write(data)
+
+    array = np.arange(1000, dtype="int64")
+    writer = RecordingWriter()
+    AsNPY(chunk_size=1024).serialize(array, writer)
+
+    # Header + 8000 bytes of data in chunks of at most 1024 bytes
+    assert max(writer.sizes[1:]) == 1024
+    assert len(writer.sizes) == 1 + 8
+    np.testing.assert_array_equal(np.load(io.BytesIO(writer.getvalue())), array)
+
+
+def test_deserialize_local_file_returns_read_only_memory_map():
+    array = np.arange(100)
+    serializer = AsNPY()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "array.npy")
+
+        with open(filename, "wb") as writer:
+            serializer.serialize(array, writer)
+
+        with open(filename, "rb") as reader:
+            deserialized = serializer.deserialize(reader)
+
+        assert isinstance(deserialized, np.memmap)
+        assert not deserialized.flags.writeable
+        np.testing.assert_array_equal(deserialized, array)
+
+        with open(filename, "rb") as reader:
+            deserialized = AsNPY(memory_map=False).deserialize(reader)
+
+        assert not isinstance(deserialized, np.memmap)
+
+
+def test_deserialize_from_a_stream_loads_the_array_in_memory():
+    array = np.arange(100)
+    buffer = io.BytesIO()
+    AsNPY().serialize(array, buffer)
+    buffer.seek(0)
+
+    deserialized = AsNPY().deserialize(buffer)
+
+    assert not isinstance(deserialized, np.memmap)
+    np.testing.assert_array_equal(deserialized, array)
+
+
+def test_serialize_invalid_values():
+    serializer = AsNPY()
+    invalid_values = [
+        1,
+        "2",
+        [1, 2, 3],
+        np.array([{"a": 1}, None], dtype=object),
+    ]
+
+    for value in invalid_values:
+        with pytest.raises(SerializationError):
+            serializer.serialize(value, io.BytesIO())
+
+
+def test_deserialize_invalid_values():
+    serializer = AsNPY()
+
+    with pytest.raises(DeserializationError):
+        serializer.deserialize(io.BytesIO(b"not an array"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "array.npy")
+
+        with open(filename, "wb") as writer:
+            writer.write(b"not an array")
+
+        with open(filename, "rb") as reader:
+            with pytest.raises(DeserializationError):
+                serializer.deserialize(reader)
+
+
+def test_extension():
+    assert AsNPY().extension == "npy"
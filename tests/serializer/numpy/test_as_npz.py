@@ -0,0 +1,96 @@
+import io
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+import pytest
+from dagger import DeserializationError, SerializationError, Serializer
+
+from dagger_contrib.serializer.numpy.as_npz import AsNPZ
+
+
+def test__conforms_to_protocol():
+    assert isinstance(AsNPZ(), Serializer)
+
+
+def test_serialization_and_deserialization_are_symmetric():
+    arrays = {
+        "features": np.random.default_rng(0).random((100, 10)),
+        "labels": np.arange(100, dtype="int8"),
+        "transposed": np.asfortranarray(np.arange(50.0).reshape(5, 10)),
+        "empty": np.zeros(0),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for compression in ["stored", "deflated"]:
+            serializer = AsNPZ(compression=compression, chunk_size=128)
+            filename = os.path.join(tmp, f"arrays.{serializer.extension}")
+
+            with open(filename, "wb") as writer:
+                serializer.serialize(arrays, writer)
+
+            with open(filename, "rb") as reader:
+                deserialized = serializer.deserialize(reader)
+
+            with deserialized:
+                assert sorted(deserialized.keys()) == sorted(arrays.keys())
+                for name, array in arrays.items():
+                    np.testing.assert_array_equal(deserialized[name], array)
+
+
+def test_output_is_compatible_with_numpy():
+    arrays = {"a": np.arange(10), "b": np.ones((2, 2))}
+    buffer = io.BytesIO()
+    AsNPZ().serialize(arrays, buffer)
+    buffer.seek(0)
+
+    with np.load(buffer) as loaded:
+        for name, array in arrays.items():
+            np.testing.assert_array_equal(loaded[name], array)
+
+
+def test_deserialize_loads_arrays_lazily():
+    buffer = io.BytesIO()
+    AsNPZ().serialize({"a": np.arange(10), "b": np.arange(20)}, buffer)
+    buffer.seek(0)
+
+    deserialized = AsNPZ().deserialize(buffer)
+
+    assert isinstance(deserialized, np.lib.npyio.NpzFile)
+    np.testing.assert_array_equal(deserialized["b"], np.arange(20))
+
+
+def test_serialize_with_compression():
+    arrays = {"zeros": np.zeros(10_000)}
+    stored, deflated = io.BytesIO(), io.BytesIO()
+
+    AsNPZ(compression="stored").serialize(arrays, stored)
+    AsNPZ(compression="deflated").serialize(arrays, deflated)
+
+    assert len(deflated.getvalue()) < len(stored.getvalue()) / 10
+    with zipfile.ZipFile(deflated) as zip_:
+        assert zip_.getinfo("zeros.npy").compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_serialize_invalid_values():
+    serializer = AsNPZ()
+    invalid_values = [
+        np.arange(3),
+        {"a": [1, 2, 3]},
+        {1: np.arange(3)},
+        {"a": np.array([{"a": 1}], dtype=object)},
+    ]
+
+    for value in invalid_values:
+        with pytest.raises(SerializationError):
+            serializer.serialize(value, io.BytesIO())
+
+
+def test_deserialize_invalid_values():
+    with pytest.raises(DeserializationError):
+        AsNPZ().deserialize(io.BytesIO(b"not a zip file"))
+
+
+def test_extension():
+    assert AsNPZ().extension == "npz"
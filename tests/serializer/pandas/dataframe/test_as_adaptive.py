@@ -0,0 +1,227 @@
+import io
+import os
+import tempfile
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pytest
+from dagger import DeserializationError, SerializationError, Serializer
+
+from dagger_contrib.serializer.pandas.dataframe.as_adaptive import AsAdaptive
+
+
+def test__conforms_to_protocol():
+    assert isinstance(AsAdaptive(), Serializer)
+
+
+def test_serialization_and_deserialization_are_symmetric(star_wars_dataframe):
+    numeric_dataframe = pd.DataFrame(
+        np.random.randint(0, 100, size=(100000, 4)), columns=list("ABCD")
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for goal in AsAdaptive.GOALS:
+            for df in [star_wars_dataframe, numeric_dataframe]:
+                serializer = AsAdaptive(goal=goal)
+                filename = os.path.join(tmp, f"file.{serializer.extension}")
+
+                with open(filename, "wb") as writer:
+                    serializer.serialize(df, writer)
+
+                with open(filename, "rb") as reader:
+                    deserialized_df = serializer.deserialize(reader)
+
+                assert df.equals(deserialized_df)
+
+
+def test_deserialization_does_not_depend_on_configuration(star_wars_dataframe):
+    buffer = io.BytesIO()
+    AsAdaptive(goal="size").serialize(star_wars_dataframe, buffer)
+    buffer.seek(0)
+
+    assert star_wars_dataframe.equals(AsAdaptive(goal="speed").deserialize(buffer))
+
+
+def test_deserialization_from_a_stream_that_is_not_seekable(star_wars_dataframe):
+    class UnseekableReader(io.BytesIO):
+        def seekable(self):
+            return False
+
+    buffer = io.BytesIO()
+    AsAdaptive().serialize(star_wars_dataframe, buffer)
+
+    deserialized_df = AsAdaptive().deserialize(UnseekableReader(buffer.getvalue()))
+    assert star_wars_dataframe.equals(deserialized_df)
+
+
+def test_choice_depends_on_the_goal_and_the_profile_of_the_dataframe():
+    numeric = pd.DataFrame(
+        np.random.rand(200000, 4),
+        columns=list("ABCD"),
+    )
+    text = pd.DataFrame(
+        {
+            "id": np.arange(200000),
+            "text": [f"a unique and rather long value #{i}" for i in range(200000)],
+        }
+    )
+    tiny = pd.DataFrame({"a": [1, 2, 3]})
+
+    cases = [
+        ("speed", numeric, ("parquet", None)),
+        ("speed", text, ("parquet", "snappy")),
+        ("speed", tiny, ("parquet", None)),
+        ("balanced", numeric, ("parquet", "snappy")),
+        ("balanced", tiny, ("parquet", None)),
+        ("size", numeric, ("parquet", "brotli")),
+        ("size", tiny, ("parquet", "brotli")),
+    ]
+
+    for goal, df, expected_choice in cases:
+        assert AsAdaptive(goal=goal).choose(df) == expected_choice
+
+
+def without_a_parquet_engine():
+    return mock.patch(
+        "dagger_contrib.serializer.pandas.dataframe.as_adaptive._parquet_engine_is_available",
+        return_value=False,
+    )
+
+
+def test_choice_falls_back_to_csv_without_a_parquet_engine():
+    numeric = pd.DataFrame(np.random.rand(200000, 4), columns=list("ABCD"))
+    tiny = pd.DataFrame({"a": [1, 2, 3]})
+
+    with without_a_parquet_engine():
+        assert AsAdaptive(goal="speed").choose(numeric) == ("csv", None)
+        assert AsAdaptive(goal="balanced").choose(numeric) == ("csv", "gzip")
+        assert AsAdaptive(goal="size").choose(numeric) == ("csv", "xz")
+        assert AsAdaptive(goal="size").choose(tiny) == ("csv", None)
+
+
+def test_csv_artifacts_restore_values_and_dtypes():
+    df = pd.DataFrame(
+        {
+            "text": ["1", "01", None, "x"],
+            "float": np.random.rand(4) * 10.0 ** np.arange(-20, 20, 10),
+            "small_int": np.array([1, 2, 3, 4], dtype="int8"),
+            "nullable_int": pd.array([1, None, 3, 4], dtype="Int64"),
+            "flag": [True, False, True, False],
+            "time": pd.date_range("2021-01-01", periods=4, freq="1ns", tz="UTC"),
+            "duration": pd.to_timedelta([1, 2, None, 4], unit="s"),
+            "category": pd.Categorical(
+                [2, 1, 2, None], categories=[2, 1], ordered=True
+            ),
+            "string": pd.array(["a", None, "c", "d"], dtype="string"),
+        },
+        index=pd.Index(["a", "01", "b", "c"], name="key"),
+    )
+
+    # The index is restored too, whichever its dtype
+    for goal, value in zip(AsAdaptive.GOALS, [df, df.set_index("time"), df]):
+        with without_a_parquet_engine():
+            buffer = io.BytesIO()
+            AsAdaptive(goal=goal).serialize(value, buffer)
+
+        assert b'"format": "csv"' in buffer.getvalue()[:100]
+        buffer.seek(0)
+        pd.testing.assert_frame_equal(
+            AsAdaptive().deserialize(buffer), value, check_freq=False
+        )
+
+
+def test_csv_artifacts_without_dtypes_can_be_deserialized(star_wars_dataframe):
+    buffer = io.BytesIO()
+    buffer.write(AsAdaptive.MAGIC + b'{"format": "csv", "compression": null}\n')
+    star_wars_dataframe.to_csv(buffer)
+    buffer.seek(0)
+
+    assert star_wars_dataframe.equals(AsAdaptive().deserialize(buffer))
+
+
+def test_serialization_fails_when_csv_cannot_reproduce_the_values():
+    invalid_dataframes = [
+        pd.DataFrame({"a": ["x", ""]}),
+        pd.DataFrame({"a": ["x", "NA"]}),
+        pd.DataFrame({"a": ["x", "y"]}, index=["1", "2"]),
+        pd.DataFrame({1: ["x", "y"]}),
+        pd.DataFrame(
+            {"a": ["x", "y"]}, index=pd.MultiIndex.from_tuples([(1, 2), (3, 4)])
+        ),
+    ]
+
+    for df in invalid_dataframes:
+        with without_a_parquet_engine():
+            with pytest.raises(SerializationError):
+                AsAdaptive().serialize(df, io.BytesIO())
+
+
+def test_choice_falls_back_to_csv_with_columns_of_mixed_types():
+    df = pd.DataFrame({"mixed": [1, "two", 3.0]})
+
+    assert AsAdaptive().choose(df) == ("csv", None)
+
+    # Parsing the CSV would turn every value into a string
+    with pytest.raises(SerializationError):
+        AsAdaptive().serialize(df, io.BytesIO())
+
+
+def test_choice_detects_mixed_types_that_sampling_would_miss():
+    # Values alternate with a period that divides the sampling step
+    df = pd.DataFrame({"a": [1, "x"] * 400_000, "b": range(800_000)})
+
+    assert AsAdaptive(sample_size=1000).choose(df)[0] == "csv"
+
+    with pytest.raises(SerializationError):
+        AsAdaptive(sample_size=1000).serialize(df, io.BytesIO())
+
+
+def test_serialization_falls_back_to_csv_when_parquet_cannot_represent_the_values():
+    # Every value is a list, but Arrow cannot combine lists of numbers and lists of strings
+    df = pd.DataFrame({"a": [[1], ["x"]]})
+    assert AsAdaptive().choose(df)[0] == "parquet"
+
+    # CSV cannot represent lists either
+    with pytest.raises(SerializationError):
+        AsAdaptive().serialize(df, io.BytesIO())
+
+
+def test_serialize_invalid_values():
+    serializer = AsAdaptive()
+    invalid_values = [
+        None,
+        2,
+        "not a data frame",
+        ["not", "a", "dataframe"],
+        {"not": ["a", "dataframe"]},
+    ]
+
+    for value in invalid_values:
+        with pytest.raises(SerializationError) as e:
+            serializer.serialize(value, io.BytesIO())
+
+        assert (
+            str(e.value)
+            == f"This serializer only works with values of type pd.DataFrame. You are trying to serialize a value of type '{type(value).__name__}'"
+        )
+
+
+def test_deserialize_invalid_values():
+    serializer = AsAdaptive()
+    invalid_values = [
+        b"",
+        b"a,b\n1,2\n",
+        AsAdaptive.MAGIC + b"not json\n",
+        AsAdaptive.MAGIC + b'{"format": "parquet"}\n',
+        AsAdaptive.MAGIC + b'{"format": "feather", "compression": null}\n',
+    ]
+
+    for value in invalid_values:
+        with pytest.raises(DeserializationError):
+            serializer.deserialize(io.BytesIO(value))
+
+
+def test_unsupported_goal():
+    with pytest.raises(AssertionError):
+        AsAdaptive(goal="unsupported")
@@ -2,6 +2,7 @@ import gzip
 import io
 import os
 import tempfile
+from unittest import mock
 
 import pytest
 from dagger import DeserializationError, SerializationError, Serializer
@@ -98,3 +99,213 @@ def test_extension_depends_on_compression():
 
     for compression, expected_extension in cases:
         assert AsCSV(compression=compression).extension == expected_extension
+
+
+def _large_dataframe(rows: int):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "value": rng.random(rows).round(3),
+            "label": rng.choice(["a", "b", "c, with a comma"], rows),
+        },
+        index=pd.RangeIndex(rows, name="row"),
+    )
+
+
+def test_parallel_serialization_and_deserialization_are_symmetric(star_wars_dataframe):
+    dataframes = [star_wars_dataframe, _large_dataframe(1000)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for compression in AsCSV.CONCATENABLE_COMPRESSIONS + ["zip"]:
+            serializer = AsCSV(compression=compression, n_workers=2, rows_per_chunk=99)
+            filename = os.path.join(tmp, f"file.{serializer.extension}")
+
+            for df in dataframes:
+                with open(filename, "wb") as writer:
+                    serializer.serialize(df, writer)
+
+                with open(filename, "rb") as reader:
+                    deserialized_df = AsCSV(compression=compression).deserialize(reader)
+
+                assert df.equals(deserialized_df)
+
+
+def test_parallel_serialization_produces_the_same_csv():
+    df = _large_dataframe(1000)
+    sequential, parallel = io.BytesIO(), io.BytesIO()
+
+    AsCSV().serialize(df, sequential)
+    AsCSV(n_workers=3, rows_per_chunk=70).serialize(df, parallel)
+
+    assert parallel.getvalue() == sequential.getvalue()
+    assert parallel.getvalue().count(b"row,id,value,label") == 1
+
+
+def test_parallel_serialization_writes_a_gzip_member_per_chunk():
+    df = _large_dataframe(1000)
+    writer = io.BytesIO()
+
+    AsCSV(compression="gzip", n_workers=2, rows_per_chunk=250).serialize(df, writer)
+
+    assert writer.getvalue().count(b"\x1f\x8b\x08") >= 4
+    with gzip.open(io.BytesIO(writer.getvalue())) as f:
+        assert len(f.read().splitlines()) == 1001
+
+
+def test_parallel_serialization_of_an_empty_dataframe():
+    import pandas as pd
+
+    df = pd.DataFrame({"a": []}, dtype="int64")
+    writer = io.BytesIO()
+
+    AsCSV(n_workers=2).serialize(df, writer)
+
+    assert writer.getvalue().splitlines() == [b",a"]
+
+
+def test_parallel_deserialization_returns_the_same_dataframe():
+    df = _large_dataframe(1000)
+    df["notes"] = ['a "quoted"\nline break' if i % 7 == 0 else "" for i in range(1000)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "file.csv")
+
+        with open(filename, "wb") as writer:
+            AsCSV().serialize(df, writer)
+
+        with open(filename, "rb") as reader:
+            expected_df = AsCSV().deserialize(reader)
+
+        with mock.patch.object(AsCSV, "MIN_BYTES_PER_RANGE", 1024):
+            for n_workers in [2, 3, 8]:
+                serializer = AsCSV(n_workers=n_workers)
+
+                with open(filename, "rb") as reader:
+                    deserialized_df = serializer.deserialize(reader)
+
+                assert expected_df.equals(deserialized_df)
+
+                with open(filename, "rb") as f:
+                    deserialized_df = serializer.deserialize(io.BytesIO(f.read()))
+
+                assert expected_df.equals(deserialized_df)
+
+
+def test_parallel_deserialization_infers_the_same_types_as_a_serial_one():
+    import numpy as np
+
+    df = _large_dataframe(1000)
+    # Strings in the first range only, missing values in the last one only
+    df["code"] = ["x" if i == 0 else str(i) for i in range(1000)]
+    df["count"] = [np.nan if i == 999 else i for i in range(1000)]
+    buffer = io.BytesIO()
+    AsCSV().serialize(df, buffer)
+
+    buffer.seek(0)
+    expected_df = AsCSV().deserialize(buffer)
+
+    with mock.patch.object(AsCSV, "MIN_BYTES_PER_RANGE", 1024):
+        for columns in [["id", "code"], ["id", "count"], ["id", "code", "count"]]:
+            buffer = io.BytesIO()
+            AsCSV().serialize(df[columns], buffer)
+
+            buffer.seek(0)
+            deserialized_df = AsCSV(n_workers=3).deserialize(buffer)
+
+            assert expected_df[columns].equals(deserialized_df)
+            assert (deserialized_df.dtypes == expected_df[columns].dtypes).all()
+
+
+def test_record_ranges_are_aligned_to_records():
+    from dagger_contrib.serializer.pandas.dataframe.as_csv import _record_ranges
+
+    data = b'h1,h2\n1,"a\nb"\n2,"c""\n""d"\n3,e\n4,f\n'
+
+    header, ranges = _record_ranges(data, 4)
+
+    assert header == b"h1,h2\n"
+    assert ranges[0][0] == len(header)
+    assert ranges[-1][1] == len(data)
+    assert [data[start:end] for start, end in ranges] == [
+        b'1,"a\nb"\n',
+        b'2,"c""\n""d"\n',
+        b"3,e\n",
+        b"4,f\n",
+    ]
+
+    # Quoted line breaks do not end the header either
+    header, ranges = _record_ranges(b'"h\n1",h2\n' + data[len(header) :], 4)
+
+    assert header == b'"h\n1",h2\n'
+    assert ranges[0] == (len(header), len(header) + len(b'1,"a\nb"\n'))
+
+
+def test_parallel_deserialization_of_small_or_empty_files(star_wars_dataframe):
+    serializer = AsCSV(n_workers=2)
+    writer = io.BytesIO()
+    AsCSV().serialize(star_wars_dataframe, writer)
+
+    assert star_wars_dataframe.equals(
+        serializer.deserialize(io.BytesIO(writer.getvalue()))
+    )
+
+    with mock.patch.object(AsCSV, "MIN_BYTES_PER_RANGE", 1):
+        assert serializer.deserialize(io.BytesIO(b",a\n")).empty
+
+        with pytest.raises(DeserializationError):
+            serializer.deserialize(io.BytesIO(b""))
+
+
+def test_inspect_reads_the_header(star_wars_dataframe):
+    for compression in [None, "gzip"]:
+        serializer = AsCSV(compression=compression)
+        buffer = io.BytesIO()
+        AsCSV(compression=compression).serialize(star_wars_dataframe, buffer)
+
+        buffer.seek(0)
+        summary = serializer.inspect(buffer)
+
+        assert summary.format == "csv"
+        assert summary.columns == list(star_wars_dataframe.columns)
+        assert summary.rows is None
+        assert summary.dtypes is None
+        assert summary.preview is None
+
+        buffer.seek(0)
+        summary = serializer.inspect(buffer, preview_rows=2)
+
+        assert summary.dtypes["RunningTime"] == "int64"
+        assert star_wars_dataframe.head(2).equals(summary.preview)
+
+
+def test_inspect_empty_file():
+    with pytest.raises(DeserializationError):
+        AsCSV().inspect(io.BytesIO(b""))
+
+
+def test_deserialize_strings_into_compact_dtypes():
+    import pandas as pd
+
+    df = _large_dataframe(1000)
+    buffer = io.BytesIO()
+    AsCSV().serialize(df, buffer)
+
+    for string_dtype, expected_dtype in [
+        ("pyarrow", pd.StringDtype("pyarrow")),
+        ("category", "category"),
+    ]:
+        for n_workers in [1, 3]:
+            buffer.seek(0)
+            with mock.patch.object(AsCSV, "MIN_BYTES_PER_RANGE", 1024):
+                deserialized_df = AsCSV(
+                    n_workers=n_workers, string_dtype=string_dtype
+                ).deserialize(buffer)
+
+            assert deserialized_df["label"].dtype == expected_dtype
+            pd.testing.assert_frame_equal(
+                deserialized_df.astype({"label": object}), df, check_index_type=False
+            )
@@ -1,10 +1,13 @@
+import asyncio
 import io
 import os
 import tempfile
+from unittest import mock
 
 import pytest
-from dagger import SerializationError, Serializer
+from dagger import DeserializationError, SerializationError, Serializer
 
+from dagger_contrib.serializer.asynchronous import AsyncSerializer
 from dagger_contrib.serializer.pandas.dataframe.as_parquet import AsParquet
 
 
@@ -71,3 +74,404 @@ def test_extension_depends_on_compression():
 
     for compression, expected_extension in cases:
         assert AsParquet(compression=compression).extension == expected_extension
+
+
+def test_serialization_and_deserialization_with_tuning_settings(star_wars_dataframe):
+    settings = [
+        {"engine": "pyarrow"},
+        {"use_threads": False, "memory_map": False, "pre_buffer": False},
+        {"use_dictionary": False, "row_group_size": 1, "data_page_size": 1024},
+        {"use_dictionary": ["Director"]},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for kwargs in settings:
+            serializer = AsParquet(**kwargs)
+            filename = os.path.join(tmp, f"file.{serializer.extension}")
+
+            with open(filename, "wb") as writer:
+                serializer.serialize(star_wars_dataframe, writer)
+
+            with open(filename, "rb") as reader:
+                deserialized_df = serializer.deserialize(reader)
+
+            assert star_wars_dataframe.equals(deserialized_df)
+
+
+def test_tuning_settings_are_applied_to_the_file(star_wars_dataframe):
+    import pyarrow.parquet as pq
+
+    buffer = io.BytesIO()
+    AsParquet(row_group_size=1, use_dictionary=["Director"]).serialize(
+        star_wars_dataframe, buffer
+    )
+
+    metadata = pq.ParquetFile(io.BytesIO(buffer.getvalue())).metadata
+    assert metadata.num_row_groups == len(star_wars_dataframe)
+
+    schema = metadata.schema.to_arrow_schema()
+    row_group = metadata.row_group(0)
+    encodings = {
+        schema.field(i).name: row_group.column(i).encodings
+        for i in range(row_group.num_columns)
+    }
+    assert any("DICTIONARY" in encoding for encoding in encodings["Director"])
+    assert not any("DICTIONARY" in encoding for encoding in encodings["Title"])
+
+
+def test_deserialize_from_local_files_uses_memory_maps(star_wars_dataframe):
+    import pyarrow.parquet as pq
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "file.parquet")
+        with open(filename, "wb") as writer:
+            AsParquet().serialize(star_wars_dataframe, writer)
+
+        with mock.patch.object(pq, "read_table", wraps=pq.read_table) as read_table:
+            with open(filename, "rb") as reader:
+                AsParquet().deserialize(reader)
+
+            read_table.assert_called_once_with(
+                filename,
+                use_threads=True,
+                memory_map=True,
+                pre_buffer=True,
+            )
+
+        with mock.patch.object(pq, "read_table", wraps=pq.read_table) as read_table:
+            with open(filename, "rb") as f:
+                reader = io.BytesIO(f.read())
+
+            AsParquet().deserialize(reader)
+
+            read_table.assert_called_once_with(
+                reader,
+                use_threads=True,
+                memory_map=False,
+                pre_buffer=True,
+            )
+
+
+def test_serialization_and_deserialization_without_pyarrow(star_wars_dataframe):
+    serializer = AsParquet()
+
+    with mock.patch("importlib.util.find_spec", return_value=None):
+        assert not serializer._uses_pyarrow()
+
+    with mock.patch.object(AsParquet, "_uses_pyarrow", return_value=False):
+        buffer = io.BytesIO()
+        serializer.serialize(star_wars_dataframe, buffer)
+        buffer.seek(0)
+
+        assert star_wars_dataframe.equals(serializer.deserialize(buffer))
+
+
+def test_inspect_reads_the_footer(star_wars_dataframe):
+    serializer = AsParquet(row_group_size=2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "file.parquet")
+
+        with open(filename, "wb") as writer:
+            serializer.serialize(star_wars_dataframe, writer)
+
+        with open(filename, "rb") as reader:
+            summary = serializer.inspect(reader)
+
+        with open(filename, "rb") as reader:
+            summary_from_stream = serializer.inspect(io.BytesIO(reader.read()))
+
+    assert summary == summary_from_stream
+    assert summary.format == "parquet"
+    assert summary.rows == len(star_wars_dataframe)
+    assert summary.columns == list(star_wars_dataframe.columns)
+    assert summary.dtypes["RunningTime"] == "int64"
+    assert summary.partitions == 2
+    assert summary.partition_rows == [2, 1]
+    assert summary.preview is None
+
+
+def test_inspect_with_preview(star_wars_dataframe):
+    serializer = AsParquet()
+    df = star_wars_dataframe.set_index("Title")
+    buffer = io.BytesIO()
+    serializer.serialize(df, buffer)
+
+    for preview_rows, expected_preview in [(2, df.head(2)), (10, df)]:
+        buffer.seek(0)
+        summary = serializer.inspect(buffer, preview_rows=preview_rows)
+
+        assert summary.columns == list(df.columns)
+        assert expected_preview.equals(summary.preview)
+
+
+def _large_dataframe(rows: int = 10_000):
+    import numpy as np
+    import pandas as pd
+
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "value": np.linspace(0, 1, rows),
+            "name": [f"name-{i}" for i in range(rows)],
+        }
+    )
+
+
+def test_inspect_estimates_the_memory_usage():
+    df = _large_dataframe()
+    buffer = io.BytesIO()
+    AsParquet().serialize(df, buffer)
+    buffer.seek(0)
+
+    summary = AsParquet().inspect(buffer)
+
+    actual = df.memory_usage(index=True, deep=True).sum()
+    assert actual * 0.8 < summary.memory_usage < actual * 1.5
+
+
+def _low_cardinality_dataframe(rows: int = 100_000):
+    import numpy as np
+    import pandas as pd
+
+    # Dictionary-encoded, so the file holds little more than an index per row
+    labels = np.array([letter * 100 for letter in "abcdefghij"], dtype=object)
+    return pd.DataFrame({"label": labels[np.arange(rows) % len(labels)]})
+
+
+def test_inspect_estimates_the_memory_usage_of_dictionary_encoded_columns():
+    df = _low_cardinality_dataframe()
+    buffer = io.BytesIO()
+    AsParquet().serialize(df, buffer)
+    buffer.seek(0)
+
+    summary = AsParquet().inspect(buffer)
+
+    actual = df.memory_usage(index=True, deep=True).sum()
+    assert len(buffer.getvalue()) * 10 < actual
+    assert actual * 0.8 < summary.memory_usage < actual * 1.5
+
+
+def test_deserialize_within_the_memory_budget():
+    df = _large_dataframe()
+    serializer = AsParquet(memory_budget=10 * 1024 * 1024)
+    buffer = io.BytesIO()
+    serializer.serialize(df, buffer)
+    buffer.seek(0)
+
+    assert df.equals(serializer.deserialize(buffer))
+
+
+def test_deserialize_over_the_memory_budget_fails_fast():
+    df = _large_dataframe()
+    serializer = AsParquet(memory_budget=1024)
+    buffer = io.BytesIO()
+    serializer.serialize(df, buffer)
+    buffer.seek(0)
+
+    with mock.patch("pyarrow.parquet.read_table") as read_table:
+        with pytest.raises(DeserializationError) as e:
+            serializer.deserialize(buffer)
+
+    read_table.assert_not_called()
+    assert "goes over the memory budget of 1024 bytes" in str(e.value)
+
+
+def test_deserialize_over_the_memory_budget_in_chunks():
+    import pandas as pd
+
+    df = _large_dataframe()
+    serializer = AsParquet(memory_budget=100_000, over_budget="chunks")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "file.parquet")
+
+        with open(filename, "wb") as writer:
+            serializer.serialize(df, writer)
+
+        with open(filename, "rb") as reader:
+            chunks = serializer.deserialize(reader)
+
+        # The iterator keeps working after the reader has been closed
+        chunks = list(chunks)
+
+    assert len(chunks) > 1
+    assert all(c.memory_usage(deep=True).sum() <= 100_000 for c in chunks)
+    assert df.equals(pd.concat(chunks))
+
+
+def test_deserialize_over_the_memory_budget_in_chunks_from_a_stream():
+    import pandas as pd
+
+    df = _large_dataframe()
+    serializer = AsParquet(memory_budget=100_000, over_budget="chunks")
+    buffer = io.BytesIO()
+    serializer.serialize(df, buffer)
+    buffer.seek(0)
+
+    assert df.equals(pd.concat(serializer.deserialize(buffer)))
+
+
+def test_deserialize_over_the_memory_budget_as_a_dask_dataframe():
+    df = _large_dataframe()
+    serializer = AsParquet(
+        memory_budget=100_000,
+        over_budget="dask",
+        row_group_size=2500,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "file.parquet")
+
+        with open(filename, "wb") as writer:
+            serializer.serialize(df, writer)
+
+        with open(filename, "rb") as reader:
+            ddf = serializer.deserialize(reader)
+
+    # The DataFrame keeps working after the file has been removed
+    assert ddf.npartitions == 4
+    assert ddf.known_divisions
+    assert df.equals(ddf.compute())
+
+    buffer = io.BytesIO()
+    serializer.serialize(df, buffer)
+    buffer.seek(0)
+
+    with pytest.raises(DeserializationError):
+        serializer.deserialize(buffer)
+
+
+def test_deserialize_over_the_memory_budget_from_an_async_reader():
+    import pandas as pd
+
+    df = _large_dataframe()
+    buffer = io.BytesIO()
+    AsParquet(row_group_size=2500).serialize(df, buffer)
+
+    async def deserialize(serializer):
+        reader = asyncio.StreamReader()
+        reader.feed_data(buffer.getvalue())
+        reader.feed_eof()
+        return await AsyncSerializer(serializer).deserialize(reader)
+
+    # The reader is spooled into a temporary file, which is removed before the value is used
+    ddf = asyncio.run(deserialize(AsParquet(memory_budget=100_000, over_budget="dask")))
+    assert df.equals(ddf.compute())
+
+    chunks = asyncio.run(
+        deserialize(AsParquet(memory_budget=100_000, over_budget="chunks"))
+    )
+    assert df.equals(pd.concat(chunks))
+
+
+def test_chunks_that_are_never_consumed_do_not_hold_the_file_open():
+    df = _large_dataframe()
+    serializer = AsParquet(memory_budget=100_000, over_budget="chunks")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "file.parquet")
+
+        with open(filename, "wb") as writer:
+            serializer.serialize(df, writer)
+
+        open_files = set(os.listdir("/proc/self/fd"))
+        with open(filename, "rb") as reader:
+            chunks = serializer.deserialize(reader)
+
+        assert set(os.listdir("/proc/self/fd")) == open_files
+        del chunks
+
+
+def test_memory_budgets_require_pyarrow():
+    with pytest.raises(AssertionError):
+        AsParquet(engine="fastparquet", memory_budget=100_000)
+
+    # The "auto" engine does not resolve to pyarrow when it is not installed
+    with mock.patch.object(AsParquet, "_uses_pyarrow", return_value=False):
+        with pytest.raises(AssertionError):
+            AsParquet(memory_budget=100_000)
+
+        with pytest.raises(AssertionError):
+            AsParquet(string_dtype="pyarrow")
+
+
+def test_deserialize_strings_into_compact_dtypes():
+    import pandas as pd
+
+    df = _large_dataframe()
+
+    for string_dtype, expected_dtype in [
+        ("pyarrow", pd.StringDtype("pyarrow")),
+        ("category", "category"),
+    ]:
+        serializer = AsParquet(string_dtype=string_dtype)
+        buffer = io.BytesIO()
+        serializer.serialize(df, buffer)
+        buffer.seek(0)
+
+        deserialized_df = serializer.deserialize(buffer)
+
+        assert deserialized_df["name"].dtype == expected_dtype
+        assert deserialized_df["id"].dtype == df["id"].dtype
+        if string_dtype == "pyarrow":
+            assert (
+                deserialized_df.memory_usage(deep=True).sum()
+                < df.memory_usage(deep=True).sum() / 2
+            )
+        pd.testing.assert_frame_equal(
+            deserialized_df.astype({"name": object}), df, check_index_type=False
+        )
+
+
+def test_string_dtypes_apply_to_chunks_and_lower_the_memory_estimate():
+    import pandas as pd
+
+    df = _large_dataframe()
+    buffer = io.BytesIO()
+    AsParquet().serialize(df, buffer)
+
+    buffer.seek(0)
+    estimate = AsParquet().inspect(buffer).memory_usage
+    buffer.seek(0)
+    serializer = AsParquet(
+        memory_budget=estimate // 2,
+        over_budget="chunks",
+        string_dtype="pyarrow",
+    )
+    assert serializer.inspect(buffer).memory_usage < estimate
+
+    buffer.seek(0)
+    serializer = AsParquet(
+        memory_budget=100_000, over_budget="chunks", string_dtype="pyarrow"
+    )
+    chunks = list(serializer.deserialize(buffer))
+
+    assert len(chunks) > 1
+    assert all(chunk["name"].dtype == pd.StringDtype("pyarrow") for chunk in chunks)
+
+
+def test_string_dtype_estimate_accounts_for_dictionary_encoded_columns():
+    df = _low_cardinality_dataframe()
+    buffer = io.BytesIO()
+    AsParquet().serialize(df, buffer)
+
+    buffer.seek(0)
+    serializer = AsParquet(string_dtype="pyarrow")
+    estimate = serializer.inspect(buffer).memory_usage
+    buffer.seek(0)
+    actual = serializer.deserialize(buffer).memory_usage(index=True, deep=True).sum()
+    assert actual * 0.8 < estimate < actual * 1.5
+
+    # A budget well below the decoded size rejects the load before reading any data
+    buffer.seek(0)
+    with pytest.raises(DeserializationError):
+        AsParquet(memory_budget=actual // 2, string_dtype="pyarrow").deserialize(buffer)
+
+
+def test_string_dtypes_require_pyarrow():
+    with pytest.raises(AssertionError):
+        AsParquet(engine="fastparquet", string_dtype="pyarrow")
+
+    with pytest.raises(AssertionError):
+        AsParquet(string_dtype="str")
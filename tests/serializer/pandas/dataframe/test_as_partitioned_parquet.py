@@ -0,0 +1,309 @@
+import io
+import os
+import tempfile
+
+import pandas as pd
+import pytest
+from dagger import DeserializationError, SerializationError, Serializer
+
+from dagger_contrib.serializer.pandas.dataframe.as_partitioned_parquet import (
+    AsPartitionedParquet,
+)
+from dagger_contrib.serializer.path.as_tar import AsTar
+from dagger_contrib.serializer.path.as_zip import AsZip
+
+
+def _normalize(df):
+    return df.sort_values("Title").reset_index(drop=True)[
+        ["Title", "Released", "Director", "RunningTime"]
+    ]
+
+
+def test__conforms_to_protocol():
+    with tempfile.TemporaryDirectory() as tmp:
+        assert isinstance(
+            AsPartitionedParquet(
+                path_serializer=AsTar(output_dir=tmp),
+                partition_cols=["a"],
+            ),
+            Serializer,
+        )
+
+
+def test_serialization_and_deserialization_are_symmetric(star_wars_dataframe):
+    for path_serializer_class in [AsTar, AsZip]:
+        with tempfile.TemporaryDirectory() as tmp:
+            serializer = AsPartitionedParquet(
+                path_serializer=path_serializer_class(
+                    output_dir=os.path.join(tmp, "output_dir")
+                ),
+                partition_cols=["Director"],
+            )
+
+            filename = os.path.join(tmp, f"file.{serializer.extension}")
+            with open(filename, "wb") as writer:
+                serializer.serialize(star_wars_dataframe, writer)
+
+            with open(filename, "rb") as reader:
+                deserialized_df = serializer.deserialize(reader)
+
+            assert _normalize(star_wars_dataframe).equals(_normalize(deserialized_df))
+
+
+def test_deserialization_only_reads_the_partitions_that_match_the_filters(
+    star_wars_dataframe,
+):
+    class CorruptingPathSerializer:
+        """Corrupt the files of all partitions but one after extracting them."""
+
+        extension = "tar"
+
+        def __init__(self, output_dir):
+            self._path_serializer = AsTar(output_dir=output_dir)
+
+        def serialize(self, value, writer):
+            self._path_serializer.serialize(value, writer)
+
+        def deserialize(self, reader):
+            path = self._path_serializer.deserialize(reader)
+            for root, _, files in os.walk(path):
+                if not os.path.basename(root).startswith("Director="):
+                    continue
+                if os.path.basename(root).startswith("Director=George"):
+                    continue
+
+                for f in files:
+                    with open(os.path.join(root, f), "wb") as corrupted_file:
+                        corrupted_file.write(b"not a parquet file")
+
+            return path
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path_serializer = CorruptingPathSerializer(os.path.join(tmp, "output_dir"))
+        buffer = io.BytesIO()
+        AsPartitionedParquet(
+            path_serializer=path_serializer,
+            partition_cols=["Director"],
+        ).serialize(star_wars_dataframe, buffer)
+
+        buffer.seek(0)
+        deserialized_df = AsPartitionedParquet(
+            path_serializer=path_serializer,
+            partition_cols=["Director"],
+            filters=[("Director", "=", "George Lucas")],
+        ).deserialize(buffer)
+
+        assert deserialized_df["Title"].tolist() == [
+            "Star Wars: Episode IV – A New Hope"
+        ]
+
+        buffer.seek(0)
+        with pytest.raises(DeserializationError):
+            AsPartitionedParquet(
+                path_serializer=path_serializer,
+                partition_cols=["Director"],
+            ).deserialize(buffer)
+
+
+def test_deserialization_with_filters_on_multiple_partition_columns():
+    df = pd.DataFrame(
+        {
+            "day": ["2021-01-01", "2021-01-01", "2021-01-02", "2021-01-03"],
+            "segment": ["a", "b", "a", "b"],
+            "value": [1, 2, 3, 4],
+        }
+    )
+
+    cases = [
+        ([("day", "=", "2021-01-01")], [1, 2]),
+        ([("day", "=", "2021-01-01"), ("segment", "=", "b")], [2]),
+        ([[("segment", "=", "a")], [("day", "=", "2021-01-03")]], [1, 3, 4]),
+        ([("day", "in", ["2021-01-02", "2021-01-03"])], [3, 4]),
+        ([("segment", "==", "a"), ("value", ">", 1)], [3]),
+        ([[("segment", "=", "a")], [("day", ">", "2021-01-02")]], [1, 3, 4]),
+    ]
+
+    for filters, expected_values in cases:
+        with tempfile.TemporaryDirectory() as tmp:
+            path_serializer = AsTar(output_dir=tmp)
+            buffer = io.BytesIO()
+            AsPartitionedParquet(
+                path_serializer=path_serializer,
+                partition_cols=["day", "segment"],
+            ).serialize(df, buffer)
+
+            buffer.seek(0)
+            deserialized_df = AsPartitionedParquet(
+                path_serializer=path_serializer,
+                partition_cols=["day", "segment"],
+                filters=filters,
+            ).deserialize(buffer)
+
+            assert sorted(deserialized_df["value"].tolist()) == expected_values
+
+
+def test_deserialization_only_extracts_the_partitions_that_match_the_filters():
+    df = pd.DataFrame(
+        {
+            "director": ["George Lucas", "Irvin Kershner", "Richard Marquand", "a/b"],
+            "year": [1977, 1980, 1983, 1977],
+            "value": [1, 2, 3, 4],
+        }
+    )
+
+    cases = [
+        ([("director", "=", "George Lucas")], {"director=George%20Lucas/year=1977"}),
+        ([("director", "=", "a/b")], {"director=a%2Fb/year=1977"}),
+        (
+            [("year", "in", [1980, 1983])],
+            {
+                "director=Irvin%20Kershner/year=1980",
+                "director=Richard%20Marquand/year=1983",
+            },
+        ),
+        (
+            [[("year", "=", 1977)], [("director", "=", "Irvin Kershner")]],
+            {
+                "director=George%20Lucas/year=1977",
+                "director=Irvin%20Kershner/year=1980",
+                "director=a%2Fb/year=1977",
+            },
+        ),
+        # Conditions other than equalities may match any partition
+        ([("year", ">", 1980)], None),
+    ]
+
+    for filters, expected_partitions in cases:
+        for path_serializer_class in [AsTar, AsZip]:
+            with tempfile.TemporaryDirectory() as tmp:
+                path_serializer = path_serializer_class(output_dir=tmp)
+                buffer = io.BytesIO()
+                AsPartitionedParquet(
+                    path_serializer=path_serializer,
+                    partition_cols=["director", "year"],
+                ).serialize(df, buffer)
+
+                buffer.seek(0)
+                deserialized_df = AsPartitionedParquet(
+                    path_serializer=path_serializer,
+                    partition_cols=["director", "year"],
+                    filters=filters,
+                ).deserialize(buffer)
+
+                extracted_partitions = {
+                    os.path.relpath(root, os.path.join(tmp, os.listdir(tmp)[0]))
+                    for root, _, files in os.walk(tmp)
+                    if any(name.endswith(".parquet") for name in files)
+                }
+                if expected_partitions is None:
+                    assert len(extracted_partitions) == 4
+                else:
+                    assert extracted_partitions == expected_partitions
+
+                expected_df = pd.read_parquet(
+                    io.BytesIO(df.to_parquet()), filters=filters
+                )
+                assert sorted(deserialized_df["value"]) == sorted(expected_df["value"])
+
+
+def test_serialize_invalid_values():
+    invalid_values = [
+        None,
+        2,
+        "not a data frame",
+        ["not", "a", "dataframe"],
+        {"not": ["a", "dataframe"]},
+    ]
+
+    for value in invalid_values:
+        with tempfile.TemporaryDirectory() as tmp:
+            serializer = AsPartitionedParquet(
+                path_serializer=AsTar(output_dir=tmp),
+                partition_cols=["a"],
+            )
+
+            with pytest.raises(SerializationError) as e:
+                serializer.serialize(value, io.BytesIO())
+
+            assert (
+                str(e.value)
+                == f"This serializer only works with values of type pd.DataFrame. You are trying to serialize a value of type '{type(value).__name__}'"
+            )
+
+
+def test_serialize_dataframe_without_the_partition_columns(star_wars_dataframe):
+    with tempfile.TemporaryDirectory() as tmp:
+        serializer = AsPartitionedParquet(
+            path_serializer=AsTar(output_dir=tmp),
+            partition_cols=["Director", "Producer"],
+        )
+
+        with pytest.raises(SerializationError) as e:
+            serializer.serialize(star_wars_dataframe, io.BytesIO())
+
+        assert (
+            str(e.value)
+            == "The DataFrame does not contain the partition columns ['Producer']"
+        )
+
+
+def test_partition_columns_are_required():
+    with tempfile.TemporaryDirectory() as tmp:
+        with pytest.raises(AssertionError):
+            AsPartitionedParquet(
+                path_serializer=AsTar(output_dir=tmp),
+                partition_cols=[],
+            )
+
+
+def test_extension_delegates_to_path_serializer():
+    with tempfile.TemporaryDirectory() as tmp:
+        serializer = AsPartitionedParquet(
+            path_serializer=AsZip(output_dir=tmp),
+            partition_cols=["a"],
+        )
+        assert serializer.extension == "zip.zlib"
+
+
+def test_partition_columns_keep_their_original_types():
+    df = pd.DataFrame({"year": [2020, 2021, 2021], "value": [1.0, 2.0, 3.0]})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        serializer = AsPartitionedParquet(
+            path_serializer=AsTar(output_dir=tmp),
+            partition_cols=["year"],
+            filters=[("year", ">", 2020)],
+        )
+        buffer = io.BytesIO()
+        serializer.serialize(df, buffer)
+        buffer.seek(0)
+
+        deserialized_df = serializer.deserialize(buffer)
+        assert deserialized_df["year"].dtype == "int64"
+        assert deserialized_df["year"].tolist() == [2021, 2021]
+
+
+def test_rows_keep_their_index_labels():
+    indexes = [
+        pd.RangeIndex(3),
+        pd.Index(["x", "y", "z"], name="key"),
+    ]
+
+    for index in indexes:
+        df = pd.DataFrame({"segment": ["a", "b", "a"], "value": [1, 2, 3]}, index=index)
+        with tempfile.TemporaryDirectory() as tmp:
+            serializer = AsPartitionedParquet(
+                path_serializer=AsTar(output_dir=tmp),
+                partition_cols=["segment"],
+            )
+            buffer = io.BytesIO()
+            serializer.serialize(df, buffer)
+            buffer.seek(0)
+            deserialized_df = serializer.deserialize(buffer)
+
+            pd.testing.assert_frame_equal(
+                deserialized_df.loc[df.index, ["value"]],
+                df[["value"]],
+                check_index_type=False,
+            )
+            assert deserialized_df.index.name == df.index.name
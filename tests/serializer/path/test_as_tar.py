@@ -1,5 +1,6 @@
 import io
 import os
+import shutil
 import tempfile
 
 import pytest
@@ -129,3 +130,448 @@ def test_extension_fails_when_compression_is_not_supported():
     with pytest.raises(AssertionError):
         with tempfile.TemporaryDirectory() as tmp:
             AsTar(output_dir=tmp, compression="unsupported")
+
+
+def _serialize_directory(tmp, serializer):
+    original_dir = os.path.join(tmp, "original_dir")
+    os.makedirs(os.path.join(original_dir, "subdir"))
+    for filename in ["a", os.path.join("subdir", "b")]:
+        with open(os.path.join(original_dir, filename), "w") as f:
+            f.write(f"content of {filename}")
+
+    serialized = os.path.join(tmp, f"serialized.{serializer.extension}")
+    with open(serialized, "wb") as writer:
+        serializer.serialize(original_dir, writer)
+
+    return serialized
+
+
+def test_inspect_lists_members_without_extracting_them():
+    for compression in SUPPORTED_COMPRESSION_MODES:
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = os.path.join(tmp, "output_dir")
+            os.mkdir(output_dir)
+            serializer = AsTar(output_dir=output_dir, compression=compression)
+            serialized = _serialize_directory(tmp, serializer)
+
+            with open(serialized, "rb") as reader:
+                summary = serializer.inspect(reader)
+
+            with open(serialized, "rb") as reader:
+                summary_from_stream = serializer.inspect(io.BytesIO(reader.read()))
+
+            assert summary == summary_from_stream
+            assert summary.format == "tar"
+            files = {m.name: m.size for m in summary.members if not m.is_dir}
+            assert files == {
+                "original_dir/a": len("content of a"),
+                "original_dir/subdir/b": len("content of subdir/b"),
+            }
+            assert os.listdir(output_dir) == []
+
+
+def test_read_member():
+    for compression in SUPPORTED_COMPRESSION_MODES:
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = os.path.join(tmp, "output_dir")
+            os.mkdir(output_dir)
+            serializer = AsTar(output_dir=output_dir, compression=compression)
+            serialized = _serialize_directory(tmp, serializer)
+
+            with open(serialized, "rb") as reader:
+                assert (
+                    serializer.read_member(reader, "subdir/b") == b"content of subdir/b"
+                )
+
+            with open(serialized, "rb") as reader:
+                with pytest.raises(KeyError):
+                    serializer.read_member(reader, "subdir")
+
+            assert os.listdir(output_dir) == []
+
+
+def test_parallel_extraction_is_equivalent_to_sequential_extraction():
+    for compression in SUPPORTED_COMPRESSION_MODES:
+        with tempfile.TemporaryDirectory() as tmp:
+            original_dir = os.path.join(tmp, "original_dir")
+            for i in range(50):
+                os.makedirs(os.path.join(original_dir, f"part={i % 5}"), exist_ok=True)
+                with open(
+                    os.path.join(original_dir, f"part={i % 5}", str(i)), "w"
+                ) as f:
+                    f.write(f"content of {i}" * i)
+            os.chmod(os.path.join(original_dir, "part=0", "0"), 0o600)
+            os.utime(os.path.join(original_dir, "part=1"), (1_000_000, 1_000_000))
+            os.symlink("part=0/5", os.path.join(original_dir, "link"))
+
+            extracted = {}
+            for n_workers in [1, 4]:
+                output_dir = os.path.join(tmp, f"output_dir_{n_workers}")
+                os.mkdir(output_dir)
+                serializer = AsTar(
+                    output_dir=output_dir, compression=compression, n_workers=n_workers
+                )
+                buffer = io.BytesIO()
+                serializer.serialize(original_dir, buffer)
+                buffer.seek(0)
+                deserialized_dir = serializer.deserialize(buffer)
+
+                extracted[n_workers] = _snapshot(deserialized_dir)
+
+            assert extracted[1] == extracted[4]
+            assert extracted[4]["part=1"][2] == 1_000_000
+            assert extracted[4]["part=0/0"][1] == 0o100600
+            assert extracted[4]["link"][0] == "part=0/5"
+
+
+def test_parallel_extraction_of_large_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        original_file = os.path.join(tmp, "original")
+        with open(original_file, "wb") as f:
+            f.write(os.urandom(2048))
+
+        output_dir = os.path.join(tmp, "output_dir")
+        serializer = AsTar(output_dir=output_dir, n_workers=2)
+        serializer.MAX_BUFFERED_BYTES = 1024
+        buffer = io.BytesIO()
+        serializer.serialize(original_file, buffer)
+        buffer.seek(0)
+
+        with open(serializer.deserialize(buffer), "rb") as f:
+            with open(original_file, "rb") as original:
+                assert f.read() == original.read()
+
+
+def test_deserialize_rejects_members_outside_of_the_output_directory():
+    import tarfile
+
+    malicious_members = [
+        [_tar_file("../evil")],
+        [_tar_file("dir/../../evil")],
+        [_tar_file("/tmp/evil")],
+        [_tar_link("dir/link", "../../evil", tarfile.SYMTYPE)],
+        [_tar_link("link", "/tmp", tarfile.SYMTYPE)],
+        [_tar_link("link", ".", tarfile.SYMTYPE), _tar_file("link/../evil")],
+        [_tar_link("dir/link", "../..", tarfile.LNKTYPE)],
+        [_tar_link("dev", "", tarfile.CHRTYPE)],
+    ]
+
+    for members in malicious_members:
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w") as tar:
+            for member, data in members:
+                tar.addfile(member, data)
+
+        for n_workers in [1, 4]:
+            with tempfile.TemporaryDirectory() as tmp:
+                output_dir = os.path.join(tmp, "output_dir")
+                os.mkdir(output_dir)
+                serializer = AsTar(
+                    output_dir=output_dir, compression=None, n_workers=n_workers
+                )
+
+                buffer.seek(0)
+                with pytest.raises(DeserializationError):
+                    serializer.deserialize(buffer)
+
+                assert os.listdir(tmp) == ["output_dir"]
+
+
+def _tar_file(name: str):
+    import tarfile
+
+    member = tarfile.TarInfo(name)
+    member.size = 4
+    return member, io.BytesIO(b"evil")
+
+
+def _tar_link(name: str, target: str, type_: bytes):
+    import tarfile
+
+    member = tarfile.TarInfo(name)
+    member.type = type_
+    member.linkname = target
+    return member, None
+
+
+def _snapshot(path: str) -> dict:
+    """Map the paths under a directory to their (link target or contents, mode, modification time)."""
+    snapshot = {}
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            full_path = os.path.join(root, name)
+            stat = os.lstat(full_path)
+            if os.path.islink(full_path):
+                content = os.readlink(full_path)
+            elif os.path.isfile(full_path):
+                with open(full_path) as f:
+                    content = f.read()
+            else:
+                content = None
+
+            # The modification time of symbolic links is not restored
+            snapshot[os.path.relpath(full_path, path)] = (
+                content,
+                stat.st_mode,
+                None if os.path.islink(full_path) else int(stat.st_mtime),
+            )
+
+    return snapshot
+
+
+def test_open_member_reads_a_single_file_through_the_index():
+    for compression in AsTar.INDEXABLE_COMPRESSIONS:
+        with tempfile.TemporaryDirectory() as tmp:
+            original_dir = os.path.join(tmp, "original_dir")
+            os.makedirs(os.path.join(original_dir, "subdir"))
+            contents = {f"subdir/{i}": os.urandom(10_000) for i in range(20)}
+            for name, content in contents.items():
+                with open(os.path.join(original_dir, name), "wb") as f:
+                    f.write(content)
+            os.link(
+                os.path.join(original_dir, "subdir/3"),
+                os.path.join(original_dir, "hardlink"),
+            )
+
+            output_dir = os.path.join(tmp, "output_dir")
+            serializer = AsTar(
+                output_dir=output_dir, compression=compression, index=True
+            )
+            serialized = os.path.join(tmp, f"serialized.{serializer.extension}")
+            with open(serialized, "wb") as writer:
+                serializer.serialize(original_dir, writer)
+
+            with open(serialized, "rb") as f:
+                reader = _CountingReader(f)
+                with serializer.open_member(reader, "subdir/10") as member:
+                    assert member.read() == contents["subdir/10"]
+                    member.seek(5000)
+                    assert member.read(10) == contents["subdir/10"][5000:5010]
+
+                assert reader.bytes_read < os.path.getsize(serialized) / 4
+
+                reader.seek(0)
+                assert (
+                    serializer.read_member(reader, "hardlink") == contents["subdir/3"]
+                )
+
+                reader.seek(0)
+                with pytest.raises(KeyError):
+                    serializer.open_member(reader, "subdir/missing")
+
+            # The archive remains a valid tarfile
+            with open(serialized, "rb") as reader:
+                deserialized_dir = serializer.deserialize(reader)
+
+            for name, content in contents.items():
+                with open(os.path.join(deserialized_dir, name), "rb") as f:
+                    assert f.read() == content
+
+
+def test_open_member_requires_an_index_and_a_seekable_stream():
+    with tempfile.TemporaryDirectory() as tmp:
+        serialized = _serialize_directory(tmp, AsTar(output_dir=tmp))
+        with open(serialized, "rb") as reader:
+            with pytest.raises(DeserializationError):
+                AsTar(output_dir=tmp).open_member(reader, "a")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        serializer = AsTar(output_dir=tmp, index=True)
+        serialized = _serialize_directory(tmp, serializer)
+        with open(serialized, "rb") as reader:
+            stream = _CountingReader(reader)
+            stream.seekable = lambda: False  # type: ignore
+            with pytest.raises(DeserializationError):
+                serializer.open_member(stream, "a")
+
+        with pytest.raises(AssertionError):
+            AsTar(output_dir=tmp, compression="bz2", index=True)
+
+
+class _CountingReader(io.RawIOBase):
+    """Seekable reader that counts the bytes read from the underlying file."""
+
+    def __init__(self, f):
+        self._f = f
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._f.read(len(buffer))
+        buffer[: len(data)] = data
+        self.bytes_read += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._f.seek(offset, whence)
+
+    def tell(self):
+        return self._f.tell()
+
+
+def test_deserialize_selected_members():
+    for compression in SUPPORTED_COMPRESSION_MODES:
+        for n_workers in [1, 4]:
+            with tempfile.TemporaryDirectory() as tmp:
+                original_dir = os.path.join(tmp, "original_dir")
+                os.makedirs(os.path.join(original_dir, "logs"))
+                for name in ["part.0.parquet", "part.1.parquet", "logs/run.log"]:
+                    with open(os.path.join(original_dir, name), "wb") as f:
+                        f.write(os.urandom(100_000))
+
+                serialized = os.path.join(tmp, "serialized")
+                with open(serialized, "wb") as writer:
+                    AsTar(output_dir=tmp, compression=compression).serialize(
+                        original_dir, writer
+                    )
+
+                output_dir = os.path.join(tmp, "output_dir")
+                serializer = AsTar(
+                    output_dir=output_dir,
+                    compression=compression,
+                    n_workers=n_workers,
+                    include=["*.parquet"],
+                    exclude=["part.1.*"],
+                )
+                with open(serialized, "rb") as f:
+                    reader = _CountingReader(f)
+                    deserialized_dir = serializer.deserialize(reader)
+
+                structure = {
+                    os.path.relpath(root, deserialized_dir): set(files)
+                    for root, _, files in os.walk(deserialized_dir)
+                }
+                assert structure == {".": {"part.0.parquet"}, "logs": set()}
+
+                if compression is None:
+                    # The data of the members that are not extracted is skipped
+                    assert reader.bytes_read < 150_000
+
+                # Narrowing keeps the files that match the patterns of the serializer as well
+                shutil.rmtree(output_dir)
+                with open(serialized, "rb") as f:
+                    deserialized_dir = serializer.narrow(
+                        ["logs/*", "part.1.*"]
+                    ).deserialize(f)
+
+                structure = {
+                    os.path.relpath(root, deserialized_dir): set(files)
+                    for root, _, files in os.walk(deserialized_dir)
+                }
+                assert structure == {".": set(), "logs": set()}
+
+
+def test_dedup_stores_identical_files_once():
+    import tarfile
+
+    for compression in SUPPORTED_COMPRESSION_MODES:
+        for index in [False, True] if compression in [None, "gzip"] else [False]:
+            with tempfile.TemporaryDirectory() as tmp:
+                original_dir = os.path.join(tmp, "original_dir")
+                os.makedirs(os.path.join(original_dir, "sub"))
+                data = os.urandom(100_000)
+                contents = {
+                    "a": data,
+                    "sub/b": data,
+                    "sub/c": data[:-1] + b"!",
+                    "d": b"",
+                    "e": b"",
+                }
+                for name, content in contents.items():
+                    with open(os.path.join(original_dir, name), "wb") as f:
+                        f.write(content)
+
+                serialized = os.path.join(tmp, "serialized")
+                serializer = AsTar(
+                    output_dir=os.path.join(tmp, "output_dir"),
+                    compression=compression,
+                    index=index,
+                    dedup=True,
+                )
+                with open(serialized, "wb") as writer:
+                    serializer.serialize(original_dir, writer)
+
+                with tarfile.open(serialized) as tar:
+                    links = {
+                        member.name: member.linkname
+                        for member in tar.getmembers()
+                        if member.islnk()
+                    }
+                assert links == {
+                    "original_dir/sub/b": "original_dir/a",
+                    "original_dir/e": "original_dir/d",
+                }
+
+                with open(serialized, "rb") as reader:
+                    deserialized_dir = serializer.deserialize(reader)
+
+                for name, content in contents.items():
+                    with open(os.path.join(deserialized_dir, name), "rb") as f:
+                        assert f.read() == content
+
+                assert os.path.samefile(
+                    os.path.join(deserialized_dir, "a"),
+                    os.path.join(deserialized_dir, "sub/b"),
+                )
+
+                with open(serialized, "rb") as reader:
+                    assert serializer.read_member(reader, "sub/b") == data
+
+                if index:
+                    with open(serialized, "rb") as reader:
+                        with serializer.open_member(reader, "sub/b") as member:
+                            assert member.read() == data
+
+
+def test_dedup_extracts_copies_whose_original_is_not_selected():
+    for compression in SUPPORTED_COMPRESSION_MODES:
+        for n_workers in [1, 4]:
+            with tempfile.TemporaryDirectory() as tmp:
+                original_dir = os.path.join(tmp, "original_dir")
+                for name in ["a/x.bin", "b/y.parquet", "c/z.parquet"]:
+                    os.makedirs(os.path.join(original_dir, os.path.dirname(name)))
+                    with open(os.path.join(original_dir, name), "w") as f:
+                        f.write("same contents")
+                    os.utime(os.path.join(original_dir, os.path.dirname(name)), (0, 0))
+
+                serializer = AsTar(
+                    output_dir=os.path.join(tmp, "output_dir"),
+                    compression=compression,
+                    n_workers=n_workers,
+                    include=["*.parquet"],
+                    dedup=True,
+                )
+                buffer = io.BytesIO()
+                serializer.serialize(original_dir, buffer)
+
+                # The archive is read once more to extract the original, no matter how many copies link to it
+                reader = _CountingReader(io.BytesIO(buffer.getvalue()))
+                deserialized_dir = serializer.deserialize(reader)
+                assert reader.bytes_read <= 2 * len(buffer.getvalue())
+
+                assert os.listdir(os.path.join(deserialized_dir, "a")) == []
+                for name in ["b/y.parquet", "c/z.parquet"]:
+                    with open(os.path.join(deserialized_dir, name)) as f:
+                        assert f.read() == "same contents"
+                    assert (
+                        os.stat(
+                            os.path.dirname(os.path.join(deserialized_dir, name))
+                        ).st_mtime
+                        == 0
+                    )
+
+                assert os.path.samefile(
+                    os.path.join(deserialized_dir, "b/y.parquet"),
+                    os.path.join(deserialized_dir, "c/z.parquet"),
+                )
+
+                # Streams cannot go back to the data of the original
+                stream = io.BufferedReader(io.BytesIO(buffer.getvalue()))
+                stream.seekable = lambda: False  # type: ignore
+                with pytest.raises(DeserializationError):
+                    serializer.deserialize(stream)
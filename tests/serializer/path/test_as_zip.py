@@ -1,5 +1,6 @@
 import io
 import os
+import shutil
 import tempfile
 
 import pytest
@@ -160,3 +161,228 @@ def test_find_base_dir():
 
     for case in cases:
         assert _find_base_dir(case["paths"]) == case["expected_result"]
+
+
+def _serialize_directory(tmp, serializer):
+    original_dir = os.path.join(tmp, "original_dir")
+    os.makedirs(os.path.join(original_dir, "subdir"))
+    for filename in ["a", os.path.join("subdir", "b")]:
+        with open(os.path.join(original_dir, filename), "w") as f:
+            f.write(f"content of {filename}")
+
+    serialized = os.path.join(tmp, f"serialized.{serializer.extension}")
+    with open(serialized, "wb") as writer:
+        serializer.serialize(original_dir, writer)
+
+    return serialized
+
+
+def test_inspect_lists_members_without_extracting_them():
+    for compression in SUPPORTED_COMPRESSION_MODES:
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = os.path.join(tmp, "output_dir")
+            os.mkdir(output_dir)
+            serializer = AsZip(output_dir=output_dir, compression=compression)
+            serialized = _serialize_directory(tmp, serializer)
+
+            with open(serialized, "rb") as reader:
+                summary = serializer.inspect(reader)
+
+            with open(serialized, "rb") as reader:
+                summary_from_stream = serializer.inspect(io.BytesIO(reader.read()))
+
+            assert summary == summary_from_stream
+            assert summary.format == "zip"
+            files = {m.name: m.size for m in summary.members if not m.is_dir}
+            assert files == {
+                "original_dir/a": len("content of a"),
+                "original_dir/subdir/b": len("content of subdir/b"),
+            }
+            assert os.listdir(output_dir) == []
+
+
+def test_read_member():
+    for compression in SUPPORTED_COMPRESSION_MODES:
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = os.path.join(tmp, "output_dir")
+            os.mkdir(output_dir)
+            serializer = AsZip(output_dir=output_dir, compression=compression)
+            serialized = _serialize_directory(tmp, serializer)
+
+            with open(serialized, "rb") as reader:
+                assert (
+                    serializer.read_member(reader, "subdir/b") == b"content of subdir/b"
+                )
+
+            with open(serialized, "rb") as reader:
+                with pytest.raises(KeyError):
+                    serializer.read_member(reader, "subdir")
+
+            assert os.listdir(output_dir) == []
+
+
+def test_parallel_extraction_is_equivalent_to_sequential_extraction():
+    for compression in SUPPORTED_COMPRESSION_MODES:
+        with tempfile.TemporaryDirectory() as tmp:
+            original_dir = os.path.join(tmp, "original_dir")
+            for i in range(50):
+                os.makedirs(os.path.join(original_dir, f"part={i % 5}"), exist_ok=True)
+                with open(
+                    os.path.join(original_dir, f"part={i % 5}", str(i)), "w"
+                ) as f:
+                    f.write(f"content of {i}" * i)
+
+            extracted = {}
+            for n_workers in [1, 4]:
+                output_dir = os.path.join(tmp, f"output_dir_{n_workers}")
+                os.mkdir(output_dir)
+                serializer = AsZip(
+                    output_dir=output_dir, compression=compression, n_workers=n_workers
+                )
+                buffer = io.BytesIO()
+                serializer.serialize(original_dir, buffer)
+                buffer.seek(0)
+                deserialized_dir = serializer.deserialize(buffer)
+
+                extracted[n_workers] = {}
+                for root, _, files in os.walk(deserialized_dir):
+                    for name in files:
+                        with open(os.path.join(root, name)) as f:
+                            path = os.path.relpath(os.path.join(root, name), output_dir)
+                            extracted[n_workers][path] = f.read()
+
+            assert len(extracted[4]) == 50
+            assert extracted[1] == extracted[4]
+
+
+def test_deserialize_rejects_members_outside_of_the_output_directory():
+    import zipfile
+
+    for name in ["../evil", "dir/../../evil", "/tmp/evil"]:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, mode="w") as zip_:
+            zip_.writestr("dir/file", "content")
+            zip_.writestr(zipfile.ZipInfo(name), "evil")
+
+        for n_workers in [1, 4]:
+            with tempfile.TemporaryDirectory() as tmp:
+                output_dir = os.path.join(tmp, "output_dir")
+                os.mkdir(output_dir)
+                serializer = AsZip(output_dir=output_dir, n_workers=n_workers)
+
+                buffer.seek(0)
+                with pytest.raises(DeserializationError):
+                    serializer.deserialize(buffer)
+
+                assert os.listdir(tmp) == ["output_dir"]
+
+
+def test_deserialize_selected_members():
+    for n_workers in [1, 4]:
+        with tempfile.TemporaryDirectory() as tmp:
+            original_dir = os.path.join(tmp, "original_dir")
+            os.makedirs(os.path.join(original_dir, "logs"))
+            for name in ["part.0.parquet", "part.1.parquet", "logs/run.log"]:
+                with open(os.path.join(original_dir, name), "w") as f:
+                    f.write(name)
+
+            output_dir = os.path.join(tmp, "output_dir")
+            serializer = AsZip(
+                output_dir=output_dir,
+                n_workers=n_workers,
+                include=["*.parquet", "logs/*"],
+                exclude=["part.1.*"],
+            )
+            buffer = io.BytesIO()
+            serializer.serialize(original_dir, buffer)
+            buffer.seek(0)
+            deserialized_dir = serializer.deserialize(buffer)
+
+            structure = {
+                os.path.relpath(root, deserialized_dir): set(files)
+                for root, _, files in os.walk(deserialized_dir)
+            }
+            assert structure == {".": {"part.0.parquet"}, "logs": {"run.log"}}
+
+            # Narrowing keeps the files that match the patterns of the serializer as well
+            shutil.rmtree(output_dir)
+            buffer.seek(0)
+            deserialized_dir = serializer.narrow(["logs/*", "part.1.*"]).deserialize(
+                buffer
+            )
+            structure = {
+                os.path.relpath(root, deserialized_dir): set(files)
+                for root, _, files in os.walk(deserialized_dir)
+            }
+            assert structure == {".": set(), "logs": {"run.log"}}
+
+
+def test_dedup_stores_identical_files_once():
+    import zipfile
+
+    for n_workers in [1, 4]:
+        with tempfile.TemporaryDirectory() as tmp:
+            original_dir = os.path.join(tmp, "original_dir")
+            os.makedirs(os.path.join(original_dir, "sub"))
+            data = os.urandom(100_000)
+            contents = {"a": data, "sub/b": data, "sub/c": data[:-1] + b"!"}
+            for name, content in contents.items():
+                with open(os.path.join(original_dir, name), "wb") as f:
+                    f.write(content)
+
+            serializer = AsZip(
+                output_dir=os.path.join(tmp, "output_dir"),
+                n_workers=n_workers,
+                dedup=True,
+            )
+            buffer = io.BytesIO()
+            serializer.serialize(original_dir, buffer)
+
+            with zipfile.ZipFile(buffer) as zip_:
+                assert sorted(zip_.namelist()) == [
+                    AsZip.DEDUP_MANIFEST,
+                    "original_dir/a",
+                    "original_dir/sub/c",
+                ]
+
+            buffer.seek(0)
+            deserialized_dir = serializer.deserialize(buffer)
+            assert os.path.basename(deserialized_dir) == "original_dir"
+            assert not os.path.exists(
+                os.path.join(serializer._output_dir, AsZip.DEDUP_MANIFEST)
+            )
+
+            for name, content in contents.items():
+                with open(os.path.join(deserialized_dir, name), "rb") as f:
+                    assert f.read() == content
+
+            buffer.seek(0)
+            assert serializer.read_member(buffer, "sub/b") == data
+
+            buffer.seek(0)
+            summary = serializer.inspect(buffer)
+            members = {member.name: member.size for member in summary.members}
+            assert members["original_dir/sub/b"] == len(data)
+
+
+def test_dedup_extracts_copies_whose_original_is_not_selected():
+    with tempfile.TemporaryDirectory() as tmp:
+        original_dir = os.path.join(tmp, "original_dir")
+        os.makedirs(original_dir)
+        for name in ["a.log", "b.parquet"]:
+            with open(os.path.join(original_dir, name), "w") as f:
+                f.write("same contents")
+
+        serializer = AsZip(
+            output_dir=os.path.join(tmp, "output_dir"),
+            include=["*.parquet"],
+            dedup=True,
+        )
+        buffer = io.BytesIO()
+        serializer.serialize(original_dir, buffer)
+        buffer.seek(0)
+        deserialized_dir = serializer.deserialize(buffer)
+
+        assert os.listdir(deserialized_dir) == ["b.parquet"]
+        with open(os.path.join(deserialized_dir, "b.parquet")) as f:
+            assert f.read() == "same contents"
@@ -0,0 +1,178 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+from dagger import DeserializationError
+
+from dagger_contrib.serializer.path import AsTar, AsZip
+from dagger_contrib.serializer.path.extraction_space import ExtractionSpace
+
+
+def _archive(serializer, tmp: str, name: str, size: int) -> bytes:
+    original_dir = os.path.join(tmp, name)
+    os.makedirs(original_dir)
+    with open(os.path.join(original_dir, "data"), "wb") as f:
+        f.write(os.urandom(size))
+
+    buffer = io.BytesIO()
+    serializer.serialize(original_dir, buffer)
+    return buffer.getvalue()
+
+
+def _extractions(space: ExtractionSpace) -> int:
+    return len([name for name in os.listdir(space.root) if name != ".lock"])
+
+
+def test_each_archive_is_extracted_into_its_own_directory():
+    for cls in [AsTar, AsZip]:
+        with tempfile.TemporaryDirectory() as tmp:
+            space = ExtractionSpace(os.path.join(tmp, "space"), max_bytes=10**9)
+            serializer = cls(output_dir=space)
+            archive = _archive(serializer, tmp, "original_dir", 1000)
+
+            first = serializer.deserialize(io.BytesIO(archive))
+            second = serializer.deserialize(io.BytesIO(archive))
+
+            assert first != second
+            for path in [first, second]:
+                assert path.startswith(space.root)
+                assert os.path.basename(path) == "original_dir"
+                assert os.path.getsize(os.path.join(path, "data")) == 1000
+
+            assert space.usage() == 2000
+
+
+def test_least_recently_used_extractions_are_evicted_once_released():
+    with tempfile.TemporaryDirectory() as tmp:
+        space = ExtractionSpace(os.path.join(tmp, "space"), max_bytes=250_000)
+        serializer = AsTar(output_dir=space)
+        archives = [_archive(serializer, tmp, f"dir_{i}", 100_000) for i in range(3)]
+
+        paths = [serializer.deserialize(io.BytesIO(archive)) for archive in archives]
+
+        # Extractions in use are never evicted, even if the space goes over its cap
+        assert space.usage() == 300_000
+        assert space.collect() == 0
+
+        space.release(paths[1])
+        space.release(paths[0])
+        assert not os.path.exists(paths[1])
+        assert os.path.exists(paths[0])
+        assert space.usage() == 200_000
+
+        # Unused extractions stay around while the space is under its cap
+        space.release(paths[2])
+        assert _extractions(space) == 2
+
+        # Using an extraction again makes it the most recently used one
+        space.retain(paths[0])
+        space.release(paths[0])
+        path = serializer.deserialize(io.BytesIO(archives[1]))
+        assert os.path.exists(paths[0])
+        assert not os.path.exists(paths[2])
+        assert os.path.exists(path)
+
+
+def test_leases_are_reference_counted():
+    with tempfile.TemporaryDirectory() as tmp:
+        space = ExtractionSpace(os.path.join(tmp, "space"), max_bytes=1)
+        serializer = AsZip(output_dir=space)
+        path = serializer.deserialize(
+            io.BytesIO(_archive(serializer, tmp, "original_dir", 1000))
+        )
+
+        space.retain(path)
+        space.release(path)
+        assert os.path.exists(path)
+
+        space.release(path)
+        assert not os.path.exists(path)
+
+        with pytest.raises(FileNotFoundError):
+            space.retain(path)
+
+        # The lease was already given up
+        with pytest.raises(ValueError):
+            space.release(path)
+
+
+def test_leases_of_processes_that_exited_are_ignored():
+    with tempfile.TemporaryDirectory() as tmp:
+        space = ExtractionSpace(os.path.join(tmp, "space"), max_bytes=1)
+        serializer = AsTar(output_dir=space)
+        path = serializer.deserialize(
+            io.BytesIO(_archive(serializer, tmp, "original_dir", 1000))
+        )
+
+        # Another process shares the extraction, and exits without releasing it
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys; from dagger_contrib.serializer.path import ExtractionSpace; "
+                "ExtractionSpace(sys.argv[1], max_bytes=1).retain(sys.argv[2])",
+                space.root,
+                path,
+            ],
+            check=True,
+        )
+        assert len(os.listdir(os.path.join(path, "..", "..", "leases"))) == 2
+
+        space.release(path)
+        assert not os.path.exists(path)
+
+
+def test_leases_of_running_processes_are_honored():
+    with tempfile.TemporaryDirectory() as tmp:
+        space = ExtractionSpace(os.path.join(tmp, "space"), max_bytes=1)
+        serializer = AsTar(output_dir=space)
+        path = serializer.deserialize(
+            io.BytesIO(_archive(serializer, tmp, "original_dir", 1000))
+        )
+
+        # Another process shares the extraction until its standard input is closed
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                "import sys; from dagger_contrib.serializer.path import ExtractionSpace; "
+                "ExtractionSpace(sys.argv[1], max_bytes=1).retain(sys.argv[2]); "
+                "print('ready', flush=True); sys.stdin.read()",
+                space.root,
+                path,
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        try:
+            assert process.stdout.readline() == b"ready\n"  # type: ignore
+
+            space.release(path)
+            assert os.path.exists(path)
+        finally:
+            process.communicate()
+
+        space.collect()
+        assert not os.path.exists(path)
+
+
+def test_failed_extractions_are_removed():
+    with tempfile.TemporaryDirectory() as tmp:
+        space = ExtractionSpace(os.path.join(tmp, "space"), max_bytes=10**9)
+
+        with pytest.raises(DeserializationError):
+            AsTar(output_dir=space).deserialize(io.BytesIO(b"not a tarfile"))
+
+        assert _extractions(space) == 0
+        assert space.usage() == 0
+
+
+def test_paths_outside_of_the_space_are_rejected():
+    with tempfile.TemporaryDirectory() as tmp:
+        space = ExtractionSpace(os.path.join(tmp, "space"), max_bytes=10**9)
+
+        with pytest.raises(ValueError):
+            space.release(tmp)
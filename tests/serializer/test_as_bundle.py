@@ -0,0 +1,135 @@
+import io
+import json
+import os
+import tempfile
+import zipfile
+
+import pandas as pd
+import pytest
+from dagger import DeserializationError, SerializationError, Serializer
+
+from dagger_contrib.serializer.as_bundle import AsBundle, Bundle
+from dagger_contrib.serializer.as_json import AsJSON
+from dagger_contrib.serializer.as_yaml import AsYAML
+from dagger_contrib.serializer.pandas.dataframe.as_parquet import AsParquet
+
+
+class CountingSerializer:
+    """Serializer that counts how many values it has deserialized."""
+
+    extension = "txt"
+
+    def __init__(self):
+        self.deserialized = []
+
+    def serialize(self, value, writer):
+        writer.write(value.encode("utf-8"))
+
+    def deserialize(self, reader):
+        value = reader.read().decode("utf-8")
+        self.deserialized.append(value)
+        return value
+
+
+def test__conforms_to_protocol():
+    assert isinstance(AsBundle(AsYAML()), Serializer)
+
+
+def test_serialization_and_deserialization_are_symmetric():
+    values = {
+        "a": {"one": 1},
+        "b": [1, 2, 3],
+        "nested/name.yaml": "three",
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for compression in ["stored", "deflated"]:
+            serializer = AsBundle(AsYAML(), compression=compression)
+            filename = os.path.join(tmp, f"values.{serializer.extension}")
+
+            with open(filename, "wb") as writer:
+                serializer.serialize(values, writer)
+
+            with open(filename, "rb") as reader:
+                bundle = serializer.deserialize(reader)
+
+            # The bundle keeps working after the reader has been closed
+            with bundle:
+                assert isinstance(bundle, Bundle)
+                assert list(bundle) == list(values)
+                assert len(bundle) == len(values)
+                assert dict(bundle) == values
+
+
+def test_serialization_and_deserialization_of_dataframes():
+    values = {
+        f"partition-{i}": pd.DataFrame({"a": [i, i + 1], "b": ["x", "y"]})
+        for i in range(3)
+    }
+    serializer = AsBundle(AsParquet())
+    buffer = io.BytesIO()
+
+    serializer.serialize(values, buffer)
+    buffer.seek(0)
+
+    with serializer.deserialize(buffer) as bundle:
+        for name, df in values.items():
+            assert df.equals(bundle[name])
+
+
+def test_deserialize_only_decodes_the_entries_that_are_accessed():
+    inner = CountingSerializer()
+    serializer = AsBundle(inner)
+    buffer = io.BytesIO()
+    serializer.serialize({f"entry-{i}": f"value-{i}" for i in range(100)}, buffer)
+    buffer.seek(0)
+
+    bundle = serializer.deserialize(buffer)
+
+    assert len(bundle) == 100
+    assert bundle["entry-42"] == "value-42"
+    assert inner.deserialized == ["value-42"]
+
+
+def test_members_are_stored_uncompressed_by_default():
+    buffer = io.BytesIO()
+    AsBundle(AsJSON()).serialize({"a": [1] * 100}, buffer)
+
+    with zipfile.ZipFile(buffer) as zip_:
+        assert zip_.getinfo("a").compress_type == zipfile.ZIP_STORED
+        assert json.loads(zip_.read("a")) == [1] * 100
+
+
+def test_missing_entries_raise_key_error():
+    buffer = io.BytesIO()
+    AsBundle(AsJSON()).serialize({"a": 1}, buffer)
+    buffer.seek(0)
+
+    bundle = AsBundle(AsJSON()).deserialize(buffer)
+
+    with pytest.raises(KeyError):
+        bundle["b"]
+    assert "b" not in bundle
+    assert bundle.get("b") is None
+
+
+def test_serialize_invalid_values():
+    serializer = AsBundle(AsJSON())
+    invalid_values = [
+        None,
+        [1, 2],
+        {1: "one"},
+    ]
+
+    for value in invalid_values:
+        with pytest.raises(SerializationError):
+            serializer.serialize(value, io.BytesIO())
+
+
+def test_deserialize_invalid_values():
+    with pytest.raises(DeserializationError):
+        AsBundle(AsJSON()).deserialize(io.BytesIO(b"not a zip file"))
+
+
+def test_extension():
+    assert AsBundle(AsJSON()).extension == "bundle.zip"
@@ -0,0 +1,150 @@
+import io
+import os
+import tempfile
+from unittest import mock
+
+import pytest
+from dagger import DeserializationError, SerializationError, Serializer
+
+from dagger_contrib.serializer.as_json import AsJSON
+
+BACKENDS = ["orjson", "json"]
+
+
+def test__conforms_to_protocol():
+    assert isinstance(AsJSON(), Serializer)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_serialization_and_deserialization_are_symmetric(backend):
+    serializer = AsJSON(backend=backend)
+    valid_values = [
+        None,
+        1,
+        2.3,
+        True,
+        "string",
+        "ünïcödé",
+        [],
+        [1, "two", 3],
+        {},
+        {"one": 2, "three": [4, "five"], "six": {"seven": None}},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, f"value.{serializer.extension}")
+
+        for value in valid_values:
+            with open(filename, "wb") as writer:
+                serializer.serialize(value, writer)
+
+            with open(filename, "rb") as reader:
+                deserialized_value = serializer.deserialize(reader)
+
+            assert value == deserialized_value
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_serialization_is_compact_utf8(backend):
+    writer = io.BytesIO()
+    AsJSON(backend=backend).serialize({"a": [1, 2], "b": "ñ", 3: None}, writer)
+
+    assert writer.getvalue() == '{"a":[1,2],"b":"ñ","3":null}'.encode("utf-8")
+
+
+def test_auto_backend_falls_back_to_the_standard_library():
+    with mock.patch("importlib.util.find_spec", return_value=None):
+        serializer = AsJSON()
+        writer = io.BytesIO()
+        serializer.serialize({"a": 1}, writer)
+
+        assert not serializer._uses_orjson()
+        assert writer.getvalue() == b'{"a":1}'
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_serialization_and_deserialization_of_json_lines(backend):
+    serializer = AsJSON(lines=True, backend=backend)
+    records = [{"id": i, "name": f"record-{i}"} for i in range(10)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, f"value.{serializer.extension}")
+
+        with open(filename, "wb") as writer:
+            serializer.serialize((record for record in records), writer)
+
+        with open(filename, "rb") as f:
+            assert f.read().count(b"\n") == len(records)
+
+        with open(filename, "rb") as reader:
+            deserialized_value = serializer.deserialize(reader)
+
+        # The iterator keeps working after the reader has been closed
+        assert not isinstance(deserialized_value, list)
+        assert list(deserialized_value) == records
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_json_lines_are_decoded_lazily(backend):
+    serializer = AsJSON(lines=True, backend=backend)
+    reader = io.BytesIO(b'{"a":1}\n\n[2]\n{not json\n')
+
+    deserialized_value = serializer.deserialize(reader)
+
+    assert next(deserialized_value) == {"a": 1}
+    assert next(deserialized_value) == [2]
+    with pytest.raises(DeserializationError) as e:
+        next(deserialized_value)
+
+    assert "Line 4" in str(e.value)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_serialize_invalid_values(backend):
+    class CustomType:
+        pass
+
+    serializer = AsJSON(backend=backend)
+    invalid_values = [
+        CustomType(),
+        {"a": CustomType()},
+        [1, CustomType()],
+    ]
+
+    for value in invalid_values:
+        with pytest.raises(SerializationError):
+            serializer.serialize(value, io.BytesIO())
+
+
+def test_serialize_invalid_values_as_json_lines():
+    serializer = AsJSON(lines=True)
+    invalid_values = [
+        1,
+        "string",
+        {"a": 1},
+        [object()],
+    ]
+
+    for value in invalid_values:
+        with pytest.raises(SerializationError):
+            serializer.serialize(value, io.BytesIO())
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_deserialize_invalid_values(backend):
+    serializer = AsJSON(backend=backend)
+    invalid_values = [
+        b"",
+        b"{",
+        b"{'single': 'quotes'}",
+        b"\xff\xfe",
+    ]
+
+    for value in invalid_values:
+        with pytest.raises(DeserializationError):
+            serializer.deserialize(io.BytesIO(value))
+
+
+def test_extension():
+    assert AsJSON().extension == "json"
+    assert AsJSON(lines=True).extension == "jsonl"
@@ -86,3 +86,71 @@ def test_deserialize_invalid_values():
     for value in invalid_values:
         with pytest.raises(DeserializationError):
             serializer.deserialize(io.BytesIO(value))
+
+
+def test_lazy_deserialization_of_a_sequence():
+    serializer = AsYAML(lazy=True)
+    records = [{"id": i, "tags": ["a", "b"], "nested": {"x": i * 2}} for i in range(5)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "value.yaml")
+
+        with open(filename, "wb") as writer:
+            serializer.serialize(records, writer)
+
+        with open(filename, "rb") as reader:
+            deserialized_value = serializer.deserialize(reader)
+
+        # The iterator keeps working after the reader has been closed
+        assert not isinstance(deserialized_value, list)
+        assert list(deserialized_value) == records
+
+
+def test_lazy_deserialization_of_a_mapping():
+    serializer = AsYAML(lazy=True)
+    reader = io.BytesIO(b"one: 1\ntwo: [2, 2]\nthree:\n  '3': null\n")
+
+    assert list(serializer.deserialize(reader)) == [
+        ("one", 1),
+        ("two", [2, 2]),
+        ("three", {"3": None}),
+    ]
+
+
+def test_lazy_deserialization_constructs_items_one_at_a_time():
+    serializer = AsYAML(lazy=True)
+    reader = io.BytesIO(b"- 1\n- 2\n- [unterminated\n")
+
+    deserialized_value = serializer.deserialize(reader)
+
+    assert next(deserialized_value) == 1
+    assert next(deserialized_value) == 2
+    with pytest.raises(DeserializationError):
+        next(deserialized_value)
+
+
+def test_lazy_deserialization_resolves_aliases_across_items():
+    serializer = AsYAML(lazy=True)
+    reader = io.BytesIO(b"- &default {retries: 3}\n- *default\n")
+
+    assert list(serializer.deserialize(reader)) == [{"retries": 3}, {"retries": 3}]
+
+
+def test_lazy_deserialization_of_an_empty_document():
+    assert list(AsYAML(lazy=True).deserialize(io.BytesIO(b""))) == []
+
+
+def test_lazy_deserialization_of_invalid_values():
+    serializer = AsYAML(lazy=True)
+    invalid_values = [
+        b"1",
+        b"just a string",
+        b"{a: [1",
+    ]
+
+    for value in invalid_values:
+        with pytest.raises(DeserializationError):
+            list(serializer.deserialize(io.BytesIO(value)))
+
+    with pytest.raises(DeserializationError):
+        list(serializer.deserialize(io.BytesIO(b"- 1\n---\n- 2\n")))
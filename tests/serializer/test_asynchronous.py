@@ -0,0 +1,168 @@
+import asyncio
+import io
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from dagger import DeserializationError
+
+from dagger_contrib.serializer.as_json import AsJSON
+from dagger_contrib.serializer.asynchronous import AsyncSerializer, deserialize_many
+
+
+class SlowSerializer:
+    """Serializer that takes a while to deserialize values, recording how many of them run at the same time."""
+
+    extension = "txt"
+
+    def __init__(self, delay: float = 0.05):
+        self._delay = delay
+        self._lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def serialize(self, value, writer):
+        writer.write(str(value).encode("utf-8"))
+
+    def deserialize(self, reader):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        time.sleep(self._delay)
+
+        with self._lock:
+            self.running -= 1
+
+        return reader.read().decode("utf-8")
+
+
+class AsyncWriter:
+    def __init__(self):
+        self.chunks = []
+
+    async def write(self, data):
+        self.chunks.append(data)
+
+
+def test_serialization_and_deserialization_are_symmetric():
+    serializer = AsyncSerializer(AsJSON())
+    value = {"a": [1, 2, 3]}
+
+    async def roundtrip(filename):
+        with open(filename, "wb") as writer:
+            await serializer.serialize(value, writer)
+
+        with open(filename, "rb") as reader:
+            from_stream = await serializer.deserialize(reader)
+
+        from_path = await serializer.deserialize(filename)
+        return from_stream, from_path
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, f"value.{serializer.extension}")
+        assert asyncio.run(roundtrip(filename)) == (value, value)
+
+
+def test_serialize_to_a_path_name():
+    serializer = AsyncSerializer(AsJSON())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "value.json")
+        asyncio.run(serializer.serialize([1, 2], filename))
+
+        with open(filename, "rb") as f:
+            assert f.read() == b"[1,2]"
+
+
+def test_serialize_to_an_async_writer():
+    serializer = AsyncSerializer(AsJSON())
+    serializer.CHUNK_SIZE = 4
+    writer = AsyncWriter()
+
+    asyncio.run(serializer.serialize({"key": "value"}, writer))
+
+    assert len(writer.chunks) > 1
+    assert b"".join(writer.chunks) == b'{"key":"value"}'
+
+
+def test_deserialize_from_an_async_reader():
+    serializer = AsyncSerializer(AsJSON())
+
+    async def deserialize():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'{"key":')
+        reader.feed_data(b'"value"}')
+        reader.feed_eof()
+        return await serializer.deserialize(reader)
+
+    assert asyncio.run(deserialize()) == {"key": "value"}
+
+
+def test_deserialize_lazy_values_from_an_async_reader():
+    serializer = AsyncSerializer(AsJSON(lines=True))
+
+    async def deserialize():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"1\n2\n3\n")
+        reader.feed_eof()
+        return await serializer.deserialize(reader)
+
+    # The iterator keeps working after the temporary file has been removed
+    assert list(asyncio.run(deserialize())) == [1, 2, 3]
+
+
+def test_deserialize_many_preserves_order_and_limits_concurrency():
+    serializer = SlowSerializer()
+    sources = [(serializer, io.BytesIO(str(i).encode("utf-8"))) for i in range(10)]
+
+    values = asyncio.run(deserialize_many(sources, max_concurrency=3))
+
+    assert values == [str(i) for i in range(10)]
+    assert 1 < serializer.max_running <= 3
+
+
+def test_deserialize_many_overlaps_deserialization():
+    serializer = SlowSerializer(delay=0.1)
+    sources = [(serializer, io.BytesIO(b"x")) for _ in range(8)]
+
+    start = time.perf_counter()
+    asyncio.run(deserialize_many(sources, max_concurrency=8))
+
+    assert time.perf_counter() - start < 0.1 * 8 / 2
+
+
+def test_deserialize_many_in_a_process_pool():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(3):
+            paths.append(os.path.join(tmp, f"value-{i}.json"))
+            with open(paths[-1], "wb") as writer:
+                AsJSON().serialize({"i": i}, writer)
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            values = asyncio.run(
+                deserialize_many(
+                    [(AsJSON(), path) for path in paths],
+                    executor=executor,
+                )
+            )
+
+    assert values == [{"i": 0}, {"i": 1}, {"i": 2}]
+
+
+def test_deserialize_many_raises_errors():
+    sources = [
+        (AsJSON(), io.BytesIO(b"[1]")),
+        (AsJSON(), io.BytesIO(b"not json")),
+    ]
+
+    with pytest.raises(DeserializationError):
+        asyncio.run(deserialize_many(sources))
+
+
+def test_extension():
+    assert AsyncSerializer(AsJSON()).extension == "json"
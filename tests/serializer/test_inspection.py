@@ -0,0 +1,52 @@
+import io
+import os
+import tempfile
+
+import pytest
+
+from dagger_contrib.serializer.as_json import AsJSON
+from dagger_contrib.serializer.inspection import Inspectable, Summary, read_member
+from dagger_contrib.serializer.pandas.dataframe.as_csv import AsCSV
+from dagger_contrib.serializer.pandas.dataframe.as_parquet import AsParquet
+from dagger_contrib.serializer.path.as_tar import AsTar
+from dagger_contrib.serializer.path.as_zip import AsZip
+
+
+def test_serializers_that_support_inspection():
+    with tempfile.TemporaryDirectory() as tmp:
+        assert isinstance(AsParquet(), Inspectable)
+        assert isinstance(AsCSV(), Inspectable)
+        assert isinstance(AsTar(output_dir=tmp), Inspectable)
+        assert isinstance(AsZip(output_dir=tmp), Inspectable)
+        assert not isinstance(AsJSON(), Inspectable)
+
+
+def test_summary_fields_default_to_none():
+    summary = Summary(format="csv", rows=3)
+
+    assert summary.columns is None
+    assert summary.members is None
+
+
+def test_read_member_with_and_without_support_from_the_path_serializer(
+    extracting_path_serializer,
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        original_dir = os.path.join(tmp, "original_dir")
+        os.mkdir(original_dir)
+        with open(os.path.join(original_dir, "file"), "wb") as f:
+            f.write(b"content")
+
+        for path_serializer in [
+            AsTar(output_dir=tmp),
+            extracting_path_serializer(AsTar(output_dir=tmp)),
+        ]:
+            buffer = io.BytesIO()
+            path_serializer.serialize(original_dir, buffer)
+
+            buffer.seek(0)
+            assert read_member(path_serializer, buffer, "file") == b"content"
+
+            buffer.seek(0)
+            with pytest.raises(KeyError):
+                read_member(path_serializer, buffer, "missing")
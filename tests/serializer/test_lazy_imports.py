@@ -0,0 +1,100 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Generous enough for slow CI runners, yet an order of magnitude below what
+# importing any of the heavy optional dependencies costs.
+IMPORT_TIME_BUDGET_SECONDS = 0.25
+
+HEAVY_MODULES = [
+    "dask",
+    "numpy",
+    "orjson",
+    "pandas",
+    "pyarrow",
+    "yaml",
+]
+
+
+def _import_in_a_fresh_interpreter(statement: str) -> dict:
+    script = f"""
+import json
+import sys
+import time
+
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+
+print(json.dumps({{
+    "elapsed": elapsed,
+    "modules": sorted(
+        name for name in {HEAVY_MODULES!r}
+        if name in sys.modules
+    ),
+}}))
+"""
+    output = subprocess.check_output([sys.executable, "-c", script])
+    return json.loads(output)
+
+
+def test_importing_the_serializer_package_does_not_import_heavy_dependencies():
+    result = _import_in_a_fresh_interpreter("import dagger_contrib.serializer")
+    assert result["modules"] == []
+
+
+def test_importing_the_serializer_package_stays_within_the_time_budget():
+    result = _import_in_a_fresh_interpreter("import dagger_contrib.serializer")
+    assert result["elapsed"] < IMPORT_TIME_BUDGET_SECONDS
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "from dagger_contrib.serializer import AsYAML",
+        "from dagger_contrib.serializer import AsJSON",
+        "from dagger_contrib.serializer import AsBundle",
+        "from dagger_contrib.serializer import AsyncSerializer, deserialize_many",
+        "from dagger_contrib.serializer.path import AsTar, AsZip, ExtractionSpace",
+        "from dagger_contrib.serializer.pandas import DataFrameAsCSV, DataFrameAsParquet",
+        "from dagger_contrib.serializer.pandas.dataframe import AsCSV, AsParquet",
+        "from dagger_contrib.serializer.pandas.dataframe import AsAdaptive",
+        "from dagger_contrib.serializer.dask.dataframe import AsCSV, AsParquet, StagingMetrics",
+        "from dagger_contrib.serializer.numpy import AsNPY, AsNPZ",
+        "from dagger_contrib.serializer.arrow import AsIPCStream",
+    ],
+)
+def test_resolving_a_serializer_does_not_import_its_dependencies(statement):
+    result = _import_in_a_fresh_interpreter(statement)
+    assert result["modules"] == []
+
+
+def test_exports_resolve_to_the_original_implementations():
+    import dagger_contrib.serializer as serializer
+    from dagger_contrib.serializer.as_yaml import AsYAML
+    from dagger_contrib.serializer.dask.dataframe._staging import StagingMetrics
+    from dagger_contrib.serializer.dask.dataframe.as_csv import AsCSV as DaskAsCSV
+    from dagger_contrib.serializer.pandas.dataframe.as_parquet import AsParquet
+    from dagger_contrib.serializer.path.as_zip import AsZip
+
+    assert serializer.AsYAML is AsYAML
+    assert serializer.path.AsZip is AsZip
+    assert serializer.pandas.DataFrameAsParquet is AsParquet
+    assert serializer.pandas.dataframe.AsParquet is AsParquet
+    assert serializer.dask.dataframe.AsCSV is DaskAsCSV
+    assert serializer.dask.dataframe.StagingMetrics is StagingMetrics
+    assert "AsYAML" in dir(serializer)
+
+
+def test_unknown_attributes_raise_attribute_error():
+    import dagger_contrib.serializer as serializer
+
+    with pytest.raises(AttributeError) as e:
+        serializer.AsSomethingElse
+
+    assert (
+        str(e.value)
+        == "module 'dagger_contrib.serializer' has no attribute 'AsSomethingElse'"
+    )